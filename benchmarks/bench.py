@@ -0,0 +1,213 @@
+"""
+Benchmarks of the phases of the tool on synthetic x86 and ARM images, from 1 MiB to 1 GiB.
+The results are written as JSON, so that two revisions can be compared with --compare.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'swifitool'))
+
+from config import ExecConfig  # noqa: E402
+from faults_inject import ENABLED_FAULT_MODELS, check_fault_models, parse_fault_models  # noqa: E402
+from faults_inject import main as faults_inject_main  # noqa: E402
+from utils import apply_faults, parse_addr, Location  # noqa: E402
+
+# Blocks of 16 bytes repeated to fill the images, each one containing 3 branches :
+#   x86 : JMP rel8 (EB) at 0, Jcc rel8 (74) at 4, Jcc rel32 (0F 84) at 8, NOPs around them
+#   ARM : B at 0, BEQ at 4, MOV r0, r0 at 8, BL at 12
+BLOCKS = {
+    'x86': bytes([0xEB, 0x02, 0x90, 0x90, 0x74, 0x04, 0x90, 0x90, 0x0F, 0x84, 0x00, 0x00, 0x00, 0x00, 0x90, 0x90]),
+    'arm': bytes([0x00, 0x00, 0x00, 0xEA, 0x01, 0x00, 0x00, 0x0A, 0x00, 0x00, 0xA0, 0xE1, 0x02, 0x00, 0x00, 0xEB]),
+}
+# Address of each branch in a block, its fall-through (x86) or target (ARM) and the model changing it
+BRANCHES = {
+    'x86': [(0, 2, 'JMP'), (4, 6, 'JCC'), (8, 14, 'JCC')],
+    'arm': [(0, 8, 'JMP'), (4, 12, 'JCC'), (12, 20, 'JMP')],
+}
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(size):
+    """Parse a size such as 1M or 512K to a number of bytes."""
+    if size[-1].upper() in UNITS:
+        return int(size[:-1]) * UNITS[size[-1].upper()]
+    return int(size)
+
+
+def write_image(path, arch, size):
+    """Write a synthetic image made of the block of the architecture repeated."""
+    chunk = BLOCKS[arch] * (1 << 16)
+    with open(path, 'wb') as f:
+        for start in range(0, size, len(chunk)):
+            f.write(chunk[:min(len(chunk), size - start)])
+
+
+def fault_tokens(arch, model, size, count):
+    """Tokens of count faults of a model, spread over the image and never overlapping (one per block at most)."""
+    nb_blocks = size // 16
+    step = max(nb_blocks // count, 1)
+    tokens = []
+    for block in range(0, nb_blocks, step)[:count]:
+        base = block * 16
+        if model == 'FLP':
+            tokens.extend(['FLP', hex(base + 2), '3'])
+        elif model == 'Z1B':
+            tokens.extend(['Z1B', hex(base + 2)])
+        elif model == 'Z1W':
+            tokens.extend(['Z1W', hex(base + 8)])
+        elif model == 'NOP':
+            tokens.extend(['NOP', hex(base + 8) if arch == 'arm' else hex(base + 2) + '-' + hex(base + 3)])
+        else:
+            for offset, target, name in BRANCHES[arch]:
+                if name == model:
+                    tokens.extend([model, hex(base + offset), hex(base + target)])
+                    break
+    return tokens
+
+
+def measure(function, repeat):
+    """Run a function several times.
+
+    :return: (best wall time, best CPU time) in seconds
+    """
+    walls, cpus = [], []
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stderr(io.StringIO()):
+            function()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    return min(walls), min(cpus)
+
+
+def run_benchmarks(arch, size, image_path, work_dir, count, repeat, hex_limit):
+    """Time each phase on one image.
+
+    :return: a list of result dicts
+    """
+    results = []
+    names = dict([(i.name, i) for i in ENABLED_FAULT_MODELS])
+    config = ExecConfig(image_path, None, arch, 4)
+
+    def record(phase, items, function):
+        wall, cpu = measure(function, repeat)
+        results.append({'phase': phase, 'arch': arch, 'size': size, 'items': items, 'wall': wall, 'cpu': cpu})
+        sys.stderr.write("{:<20} {:<4} {:>12} {:>8} items {:>10.4f} s\n".format(phase, arch, size, items, wall))
+
+    addresses = [hex(i * 16) + '-' + hex(size - 1 - i * 16) for i in range(min(count, size // 32))]
+    record('parse_addr', len(addresses), lambda: [parse_addr(a) for a in addresses])
+
+    flp = parse_fault_models(config, fault_tokens(arch, 'FLP', size, count), names)
+    record('overlap_check', len(flp), lambda: check_fault_models(flp, config.file_size))
+
+    for model in ['JMP', 'JCC']:
+        tokens = fault_tokens(arch, model, size, count)
+        record('construct_' + model, len(tokens) // 3, lambda: parse_fault_models(config, tokens, names))
+
+    try:
+        import numpy  # noqa: F401
+        from scanner import fall_through_faults
+        record('scan_branches', size, lambda: fall_through_faults(config, Location(0, size)))
+    except ImportError:
+        pass  # the branches are scanned with NumPy
+
+    buffer = bytearray(config.image)
+    for model in ['FLP', 'Z1B', 'Z1W', 'NOP', 'JMP', 'JCC']:
+        fm_list = parse_fault_models(config, fault_tokens(arch, model, size, count), names)
+        record('apply_' + model, len(fm_list), lambda: apply_faults(buffer, fm_list))
+    del buffer
+
+    if size <= hex_limit:
+        try:
+            from diff_ui import file_to_hex_col
+        except ImportError:
+            file_to_hex_col = None  # Tk missing
+        if file_to_hex_col is not None:
+            record('file_to_hex_col', size, lambda: file_to_hex_col(image_path))
+
+    out = os.path.join(work_dir, 'out')
+    tokens = fault_tokens(arch, 'FLP', size, count)
+    record('inject', len(tokens) // 3,
+           lambda: faults_inject_main(['-i', image_path, '-o', out, '-a', arch, '-w', '4'] + tokens))
+    os.remove(out)
+    region = hex(0) + '-' + hex(min(max(count // 8, 1), size) - 1)
+    record('campaign_delta', min(max(count // 8, 1), size) * 8,
+           lambda: faults_inject_main(['-i', image_path, '-o', out, '-a', arch, '-d', '-e', 'FLP', region]))
+    os.remove(out)
+    return results
+
+
+def revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL) \
+            .decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, path):
+    """Print the ratio of each wall time to the one of the same phase in a previous results file."""
+    with open(path, 'r') as f:
+        previous = dict([((r['phase'], r['arch'], r['size']), r) for r in json.load(f)['results']])
+    for r in results:
+        old = previous.get((r['phase'], r['arch'], r['size']))
+        if old is not None and old['wall'] > 0:
+            sys.stdout.write("{:<20} {:<4} {:>12} {:>10.4f} s -> {:>10.4f} s  x{:.2f}\n".format(
+                r['phase'], r['arch'], r['size'], old['wall'], r['wall'], r['wall'] / old['wall']))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Benchmarks of the fault injection tool',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-s', '--sizes', type=str, metavar='SIZES', required=False, default='1M,16M',
+                        help='sizes of the images, separated by commas (default : 1M,16M, up to 1G)')
+    parser.add_argument('-a', '--arch', type=str, metavar='ARCHITECTURE', required=False, choices=['x86', 'arm'],
+                        help='only benchmark this architecture (x86 or arm)')
+    parser.add_argument('-n', '--count', type=int, metavar='COUNT', required=False, default=10000,
+                        help='number of faults or addresses of each phase (default : 10000)')
+    parser.add_argument('-r', '--repeat', type=int, metavar='REPEAT', required=False, default=3,
+                        help='runs of each phase, the best time being kept (default : 3)')
+    parser.add_argument('--hex-limit', type=str, metavar='SIZE', required=False, default='16M',
+                        help='largest image formatted by file_to_hex_col (default : 16M)')
+    parser.add_argument('-o', '--output', type=str, metavar='OUTPUT', required=False,
+                        help='path to the JSON results (default : bench_<revision>.json)')
+    parser.add_argument('--compare', type=str, metavar='PREVIOUS', required=False,
+                        help='JSON results of a previous run to compare with')
+    args = parser.parse_args(argv)
+
+    archs = ['x86', 'arm'] if args.arch is None else [args.arch]
+    work_dir = tempfile.mkdtemp()
+    results = []
+    try:
+        for size in [parse_size(s) for s in args.sizes.split(',')]:
+            for arch in archs:
+                image_path = os.path.join(work_dir, arch + '_' + str(size))
+                write_image(image_path, arch, size)
+                results.extend(run_benchmarks(arch, size, image_path, work_dir, args.count, args.repeat,
+                                              parse_size(args.hex_limit)))
+                os.remove(image_path)
+    finally:
+        shutil.rmtree(work_dir)
+
+    rev = revision()
+    output = args.output if args.output is not None else 'bench_' + (rev[:10] if rev is not None else 'unknown') + \
+        '.json'
+    with open(output, 'w') as f:
+        json.dump({'revision': rev, 'python': platform.python_version(), 'machine': platform.machine(),
+                   'count': args.count, 'repeat': args.repeat, 'results': results}, f, indent=1)
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
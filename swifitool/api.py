@@ -0,0 +1,92 @@
+import mmap
+
+from config import ExecConfig
+from faults_inject import ENABLED_FAULT_MODELS, check_fault_models, parse_fault_models
+from utils import apply_faults, check_or_fail, effective_patch, merge_edits, InjectionError
+
+
+class Injector:
+    """Fault injection in an input held in memory, for programs driving the tool without a process per mutant.
+    The errors raise an InjectionError instead of exiting.
+    """
+
+    def __init__(self, image, arch=None, word_length=None, virtual=False, stats=None):
+        """
+        :param image: the content of the input file (bytes, bytearray, mmap or memoryview), not modified
+        :param arch: architecture of the input (x86 or arm), required by some fault models
+        :param word_length: length of a word in bytes, required by some fault models
+        :param virtual: the addresses given to the fault models are virtual addresses (see config.ExecConfig)
+        :param stats: a stats.Stats recording the time of each phase and the work done, None to record nothing
+        :raises InjectionError: if the architecture, the word length or the input do not fit
+        """
+        super().__init__()
+        check_or_fail(arch in (None, 'x86', 'arm'), "Unknown architecture : " + str(arch))
+        check_or_fail(word_length is None or word_length > 0,
+                      "Word size must be positive")
+        if not isinstance(image, (bytes, bytearray, mmap.mmap)):
+            image = bytes(image)  # the headers are searched with find, missing from memoryview
+        self.config = ExecConfig(None, None, arch, word_length, image=image, virtual=virtual,
+                                 stats=stats)
+        check_or_fail(not virtual or self.config.sections is not None,
+                      "Virtual addresses require an ELF or PE input file")
+        self.names_fault_models = dict([(i.name, i) for i in ENABLED_FAULT_MODELS])
+
+    def faults(self, spec):
+        """Build and check the fault model objects of one mutant. They can be applied any number of times.
+
+        :param spec: the fault models as in a campaign line (e.g. "FLP 0x10 3 NOP 0x20") or as a list of tokens
+        :return: a list of fault model objects
+        :raises InjectionError: if the fault models are invalid, overlap or write outside the input
+        """
+        tokens = spec.split() if isinstance(spec, str) else [str(t) for t in spec]
+        if len(tokens) > 0:
+            check_or_fail(tokens[0] in self.names_fault_models, "Unknown fault model : " + tokens[0])
+        stats = self.config.stats
+        with stats.phase('construct'):
+            fm_list = parse_fault_models(self.config, tokens, self.names_fault_models)
+        with stats.phase('check'):
+            check_fault_models(fm_list, self.config.file_size, self.config.sections, stats)
+        return fm_list
+
+    def _fault_list(self, faults):
+        if isinstance(faults, str) or any(isinstance(f, str) for f in faults):
+            return self.faults(faults)
+        return faults
+
+    def inject(self, faults):
+        """Apply fault models to a copy of the input.
+
+        :param faults: a list of fault model objects returned by faults, or a spec accepted by faults
+        :return: the content of the mutant (bytes)
+        """
+        fm_list = self._fault_list(faults)
+        stats = self.config.stats
+        with stats.phase('apply'):
+            buffer = bytearray(self.config.image)
+            edits = apply_faults(buffer, fm_list)
+            mutant = bytes(buffer)
+        stats.count('bytes_patched', sum(len(data) for _, data in edits))
+        return mutant
+
+    def patch(self, faults):
+        """Compute the bytes of the input changed by fault models, without copying the input.
+
+        :param faults: a list of fault model objects returned by faults, or a spec accepted by faults
+        :return: a list of (offset, bytes) sorted by offset, each run of changed bytes being one item
+        """
+        return effective_patch(self.config.image, merge_edits(self.config.image, self._fault_list(faults)))
+
+
+def inject(image, faults, arch=None, word_length=None, virtual=False):
+    """Apply fault models to a copy of an input held in memory.
+
+    :param image: the content of the input file (bytes, bytearray, mmap or memoryview), not modified
+    :param faults: the fault models as in a campaign line (e.g. "FLP 0x10 3 NOP 0x20") or as a list of tokens
+    :param arch: architecture of the input (x86 or arm), required by some fault models
+    :param word_length: length of a word in bytes, required by some fault models
+    :param virtual: the addresses given to the fault models are virtual addresses
+    :return: the content of the mutant (bytes)
+    :raises InjectionError: if the fault models are invalid
+    """
+    return Injector(image, arch, word_length, virtual).inject(faults)
+
@@ -0,0 +1,148 @@
+from utils import check_or_fail, numpy_module
+
+BATCH_SIZE = 4096  # mutants generated at once, fixed so that a seed always gives the same campaign
+RANDOM_MODELS = ['MBF', 'BST']
+NUMPY_REQUIRED = "Random bit flips require numpy"
+
+
+def multi_bit_masks(np, rng, count, width, nb_bits):
+    """Draw masks of nb_bits distinct bits among the bits of width bytes, for count mutants at once.
+
+    :param np: the numpy module
+    :param rng: a numpy random Generator
+    :param count: number of masks
+    :param width: number of bytes of each mask
+    :param nb_bits: number of bits set in each mask
+    :return: array of count x width bytes
+    """
+    order = rng.random((count, width * 8)).argsort(axis=1)[:, :nb_bits]
+    bits = np.zeros((count, width * 8), dtype=bool)
+    np.put_along_axis(bits, order, True, axis=1)
+    return np.packbits(bits, axis=1, bitorder='little')
+
+
+def burst_masks(np, rng, count, size, nb_bits):
+    """Draw bursts of nb_bits contiguous bits inside size bytes, for count mutants at once. The bits of a byte are
+    numbered from the least significant one, the burst continuing in the following bytes.
+
+    :param np: the numpy module
+    :param rng: a numpy random Generator
+    :param count: number of bursts
+    :param size: number of bytes in which the bursts are drawn
+    :param nb_bits: number of bits of each burst
+    :return: (array of the offsets of the masks relative to the start of the bytes, array of count x width masks)
+    """
+    width = min((nb_bits + 7) // 8 + 1, size)
+    starts = rng.integers(0, size * 8 - nb_bits + 1, size=count)
+    offsets = np.minimum(starts // 8, size - width)
+    first = (starts - offsets * 8)[:, None]
+    positions = np.arange(width * 8)[None, :]
+    bits = (positions >= first) & (positions < first + nb_bits)
+    return offsets, np.packbits(bits, axis=1, bitorder='little')
+
+
+def random_masks(np, rng, model, size, count, nb_bits, unit=1):
+    """Draw the masks of count faults of a random model inside size bytes.
+
+    :param np: the numpy module
+    :param rng: a numpy random Generator
+    :param model: MBF (nb_bits distinct bits of one unit) or BST (a burst of nb_bits contiguous bits)
+    :param size: number of bytes in which the faults are drawn
+    :param count: number of faults
+    :param nb_bits: number of bits flipped by each fault
+    :param unit: number of bytes of the units of MBF (a byte or a word), aligned from the start of the bytes
+    :return: (array of the offsets of the masks relative to the start of the bytes, array of count x width masks)
+    """
+    if model == 'MBF':
+        check_or_fail(size >= unit, "Region smaller than one unit : " + str(size) + " bytes")
+        check_or_fail(1 <= nb_bits <= unit * 8,
+                      "Number of bits must be between 1 and " + str(unit * 8) + " : " + str(nb_bits))
+        offsets = rng.integers(0, size // unit, size=count) * unit
+        return offsets, multi_bit_masks(np, rng, count, unit, nb_bits)
+    check_or_fail(1 <= nb_bits <= size * 8,
+                  "Number of bits must be between 1 and " + str(size * 8) + " : " + str(nb_bits))
+    return burst_masks(np, rng, count, size, nb_bits)
+
+
+def xor_batch(image, offsets, masks):
+    """Flip the bits of the masks in the image, for a whole batch at once.
+
+    :param image: the original content
+    :param offsets: array of the file offsets of the masks
+    :param masks: array of count x width masks
+    :return: array of count x width bytes, the content of each mutant at its offset
+    """
+    np = numpy_module(NUMPY_REQUIRED)
+    view = np.frombuffer(image, dtype=np.uint8)
+    return view[offsets[:, None] + np.arange(masks.shape[1])[None, :]] ^ masks
+
+
+def trimmed(offset, data, mask):
+    """Remove the bytes not flipped at both ends of a mask.
+
+    :return: (offset, data, mask) of the bytes between the first and the last byte flipped
+    """
+    changed = [i for i, m in enumerate(mask) if m != 0]
+    return offset + changed[0], data[changed[0]:changed[-1] + 1], mask[changed[0]:changed[-1] + 1]
+
+
+def random_flips(config, model, region, count, nb_bits, seed):
+    """Draw the faults of a random campaign by batches, each fault flipping the bits of a mask in the region.
+
+    :param config: the execution configuration
+    :param model: MBF (nb_bits distinct bits of one byte, or one word if the word length is given) or BST (a burst
+                  of nb_bits contiguous bits)
+    :param region: location of the region, in file offsets
+    :param count: number of mutants
+    :param nb_bits: number of bits flipped in each mutant
+    :param seed: seed of the random generator
+    :return: a generator of (number of the first mutant of the batch, array of file offsets, array of masks)
+    """
+    np = numpy_module(NUMPY_REQUIRED)
+    check_or_fail(model in RANDOM_MODELS, "Unknown random fault model : " + model)
+    check_or_fail(0 <= region.start and region.stop <= config.file_size,
+                  "Region outside file content : " + hex(region.start) + "-" + hex(region.stop - 1))
+    rng = np.random.default_rng(seed)
+    unit = config.word_length if config.word_length is not None else 1
+    for first in range(0, count, BATCH_SIZE):
+        offsets, masks = random_masks(np, rng, model, len(region), min(BATCH_SIZE, count - first), nb_bits, unit)
+        yield first + 1, offsets + region.start, masks
+
+
+def random_campaign(config, model, region, count, nb_bits, seed):
+    """Draw a random campaign, each mutant being one XOR fault model with the mask drawn.
+
+    :param config: the execution configuration
+    :param model: MBF or BST (see random_flips)
+    :param region: location of the region, expressed like the parameters of the models (see config.virtual)
+    :param count: number of mutants
+    :param nb_bits: number of bits flipped in each mutant
+    :param seed: seed of the random generator
+    :return: a generator of (number of the mutant, list of tokens)
+    """
+    file_region = config.file_location(region)
+    shift = region.start - file_region.start  # from file offsets to the addresses of the parameters
+    for first, offsets, masks in random_flips(config, model, file_region, count, nb_bits, seed):
+        for i, (offset, mask) in enumerate(zip(offsets.tolist(), masks)):
+            offset, _, mask = trimmed(offset, b'', mask.tobytes())
+            yield first + i, ['XOR', hex(offset + shift) + ('-' + hex(offset + shift + len(mask) - 1)
+                                                            if len(mask) > 1 else ''), '0x' + mask.hex()]
+
+
+def random_deltas(config, model, region, count, nb_bits, seed):
+    """Draw a random campaign and compute the patch of each mutant, the bits being flipped for a whole batch at
+    once. The mutants are the same as the ones of random_campaign.
+
+    :param config: the execution configuration
+    :param model: MBF or BST (see random_flips)
+    :param region: location of the region, expressed like the parameters of the models (see config.virtual)
+    :param count: number of mutants
+    :param nb_bits: number of bits flipped in each mutant
+    :param seed: seed of the random generator
+    :return: a generator of (number of the mutant, list of (offset, bytes))
+    """
+    for first, offsets, masks in random_flips(config, model, config.file_location(region), count, nb_bits, seed):
+        flipped = xor_batch(config.image, offsets, masks)
+        for i, (offset, data, mask) in enumerate(zip(offsets.tolist(), flipped, masks)):
+            offset, data, _ = trimmed(offset, data.tobytes(), mask.tobytes())
+            yield first + i, [(offset, data)]
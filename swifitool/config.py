@@ -1,9 +1,76 @@
+from sections import load_sections
+from stats import Stats
+from utils import check_or_fail, map_file, Location
+
+
 class ExecConfig:
     """Keeps the configuration variables."""
 
-    def __init__(self, infile, outfile, arch, word_length):
+    def __init__(self, infile, outfile, arch, word_length, image=None, virtual=False, stats=None):
         super().__init__()
         self.infile = infile
         self.outfile = outfile
         self.arch = arch
-        self.word_length = word_length
\ No newline at end of file
+        self.word_length = word_length
+        self.virtual = virtual
+        self._image = image
+        self._sections = None
+        self._sections_loaded = False
+        self.stats = stats if stats is not None else Stats(enabled=False)
+
+    @property
+    def image(self):
+        """Read-only content of the input file, mapped on first use and shared by all the fault models."""
+        if self._image is None:
+            self._image = map_file(self.infile)
+        return self._image
+
+    @property
+    def file_size(self):
+        """Size of the input file in bytes."""
+        return len(self.image)
+
+    @property
+    def sections(self):
+        """Index of the sections of the input file, parsed once from its headers. None if not an ELF or PE file."""
+        if not self._sections_loaded:
+            with self.stats.phase('sections'):
+                self._sections = load_sections(self.image)
+            self._sections_loaded = True
+        return self._sections
+
+    def file_location(self, loc):
+        """Translate the location given to a fault model to a location in the file.
+        Only virtual addresses are translated, file offsets are kept as they are.
+
+        :param loc: the location parsed from the parameters
+        :return: a location
+        """
+        if not self.virtual:
+            return loc
+        start = self.sections.to_offset(loc.start)
+        check_or_fail(start is not None, "Virtual address not mapped from the file : " + hex(loc.start))
+        check_or_fail(self.sections.to_offset(loc.stop - 1) == start + len(loc) - 1,
+                      "Range of virtual addresses across several sections : " + hex(loc.start) + "-" + hex(loc.stop - 1))
+        return Location(start, start + len(loc), loc.mask)
+
+    def file_target(self, target, offset):
+        """Translate the target of a jump to the file offset it would have in the section of the jump, so that the
+        distance between them is the same as in memory. Only virtual addresses are translated.
+
+        :param target: the target parsed from the parameters
+        :param offset: the file offset of the jump
+        :return: an offset (possibly outside the file)
+        """
+        if not self.virtual:
+            return target
+        s = self.sections.at_offset(offset)
+        return target - s.vaddr + s.offset
+
+    def __getstate__(self):
+        # The content is not sent to other processes with the fault models, it is mapped again if needed
+        state = self.__dict__.copy()
+        state['_image'] = None
+        state['_sections'] = None
+        state['_sections_loaded'] = False
+        return state
@@ -0,0 +1,154 @@
+import argparse
+import hashlib
+import os
+import struct
+import sys
+
+from utils import check_or_fail, command_line, mutant_name
+
+# A delta file starts with a header identifying the input file, followed by one record per mutant :
+#   header : magic, version, size of the input file, SHA-256 of the input file
+#   record : number of the mutant, number of chunks, then for each chunk its offset, its length and its bytes
+MAGIC = b'SWIFIDLT'
+VERSION = 1
+HEADER = struct.Struct('<8sBQ32s')
+RECORD = struct.Struct('<QI')
+CHUNK = struct.Struct('<QI')
+
+
+class DeltaWriter:
+    """Write the mutants of an input file as patch records in a single delta file."""
+
+    def __init__(self, path, image):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(image), hashlib.sha256(image).digest()))
+
+    def write(self, n, chunks):
+        """Append the record of one mutant.
+
+        :param n: the number of the mutant
+        :param chunks: list of (offset, bytes) sorted by offset
+        """
+        self.file.write(RECORD.pack(n, len(chunks)))
+        for offset, data in chunks:
+            self.file.write(CHUNK.pack(offset, len(data)))
+            self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_header(file):
+    """Read the header of an opened delta file.
+
+    :param file: the IO stream of the delta file, positioned at its start
+    :return: (size, SHA-256 digest) of the input file
+    """
+    raw = file.read(HEADER.size)
+    check_or_fail(len(raw) == HEADER.size, "Not a delta file : " + file.name)
+    magic, version, size, digest = HEADER.unpack(raw)
+    check_or_fail(magic == MAGIC, "Not a delta file : " + file.name)
+    check_or_fail(version == VERSION, "Unsupported delta file version : " + str(version))
+    return size, digest
+
+
+def read_deltas(path, numbers=None):
+    """Read the records of a delta file lazily.
+
+    :param path: path of the delta file
+    :param numbers: set of the mutant numbers to read (the data of the others is skipped), None for all
+    :return: a generator of (number of the mutant, list of (offset, bytes))
+    """
+    with open(path, 'rb') as f:
+        read_header(f)
+        size = os.fstat(f.fileno()).st_size
+        while True:
+            raw = f.read(RECORD.size)
+            if len(raw) == 0:
+                return
+            check_or_fail(len(raw) == RECORD.size, "Truncated delta file : " + path)
+            n, nb_chunks = RECORD.unpack(raw)
+            chunks = []
+            for _ in range(nb_chunks):
+                raw = f.read(CHUNK.size)
+                check_or_fail(len(raw) == CHUNK.size, "Truncated delta file : " + path)
+                offset, length = CHUNK.unpack(raw)
+                if numbers is None or n in numbers:
+                    data = f.read(length)
+                    check_or_fail(len(data) == length, "Truncated delta file : " + path)
+                    chunks.append((offset, data))
+                else:
+                    check_or_fail(f.seek(length, os.SEEK_CUR) <= size, "Truncated delta file : " + path)
+            if numbers is None or n in numbers:
+                yield n, chunks
+
+
+def check_base(path, image):
+    """Check that a delta file was made from the given input content.
+
+    :param path: path of the delta file
+    :param image: the content of the input file
+    """
+    with open(path, 'rb') as f:
+        size, digest = read_header(f)
+    check_or_fail(size == len(image) and digest == hashlib.sha256(image).digest(),
+                  "The delta file was not made from this input file")
+
+
+def materialize(image, chunks):
+    """Apply the patch of a mutant to the input content, in memory.
+
+    :param image: the content of the input file
+    :param chunks: list of (offset, bytes)
+    :return: the content of the mutant as a bytearray
+    """
+    mutant = bytearray(image)
+    for offset, data in chunks:
+        mutant[offset:offset + len(data)] = data
+    return mutant
+
+
+@command_line
+def main(argv):
+    # Collect parameters
+    parser = argparse.ArgumentParser(description='Rebuild mutants from a delta file written by faults_inject.py',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-i', '--infile', type=str, metavar='INFILE', required=True,
+                        help='path to the source file the delta file was made from')
+    parser.add_argument('-d', '--delta', type=str, metavar='DELTA', required=True, help='path to the delta file')
+    parser.add_argument('-o', '--outfile', type=str, metavar='OUTFILE', required=True,
+                        help='path to the destination file\n' +
+                             'a pattern where {} is replaced by the mutant number when several mutants are rebuilt')
+    parser.add_argument('numbers', nargs='*', type=int, metavar='NUMBER',
+                        help='numbers of the mutants to rebuild (all of them if omitted)')
+    args = parser.parse_args(argv)
+
+    infile = os.path.expanduser(args.infile)
+    delta = os.path.expanduser(args.delta)
+    outfile = os.path.expanduser(args.outfile)
+    with open(infile, 'rb') as f:
+        image = f.read()
+    check_base(delta, image)
+    mode = os.stat(infile).st_mode & 0o7777
+
+    numbers = set(args.numbers) if len(args.numbers) > 0 else None
+    found = set()
+    for n, chunks in read_deltas(delta, numbers):
+        path = outfile if numbers is not None and len(numbers) == 1 else mutant_name(outfile, n)
+        with open(path, 'wb') as f:
+            f.write(materialize(image, chunks))
+        os.chmod(path, mode)
+        found.add(n)
+    if numbers is not None:
+        missing = sorted(numbers - found)
+        check_or_fail(len(missing) == 0, "Mutant not found in the delta file : " + ", ".join(map(str, missing)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
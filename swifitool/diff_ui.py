@@ -1,5 +1,7 @@
 from tkinter import *
-import os
+
+from hexdump import BYTES_PER_ROW, Highlights, hex_rows
+from utils import map_file
 
 
 def file_to_hex_col(file):
@@ -8,22 +10,36 @@ def file_to_hex_col(file):
     :param file: path of the file
     :return: a formatted string
     """
-    with open(file, 'rb') as f:
-        values = f.read()
-        space = 0
-        res_str = ''
-        for n in range(len(values)):
-            value = values[n]
-            space += 1
-            if space % 16 != 0:
-                res_str += "{:02X} ".format(value)
-            else:
-                res_str += "{:02X}".format(value)
-        return res_str
+    content = map_file(file)
+    return "".join(hex_rows(content, 0, (len(content) + BYTES_PER_ROW - 1) // BYTES_PER_ROW))
+
+
+def visible_spans(highlights, first_row, nb_rows):
+    """Cut the highlighted byte ranges to the rows displayed.
+
+    :param highlights: the Highlights of the faults
+    :param first_row: number of the first row displayed
+    :param nb_rows: number of rows displayed
+    :return: a list of (Tk start index, Tk stop index, tag), one per row and range
+    """
+    first = first_row * BYTES_PER_ROW
+    last = (first_row + nb_rows) * BYTES_PER_ROW
+    res = []
+    for start, stop, tag in highlights.between(first, last):
+        start = max(start, first)
+        stop = min(stop, last)
+        while start < stop:
+            line = start // BYTES_PER_ROW - first_row + 1
+            row_stop = min(stop, (start // BYTES_PER_ROW + 1) * BYTES_PER_ROW)
+            res.append((str(line) + "." + str(3 * (start % BYTES_PER_ROW)),
+                        str(line) + "." + str(3 * ((row_stop - 1) % BYTES_PER_ROW) + 2), tag))
+            start = row_stop
+    return res
 
 
 def diff_ui(infile, outfile, fm_list, colors):
     """Open a window comparing the input and output file and highlighting the faults generated.
+    Only the rows visible are rendered, read from the files mapped in memory.
 
     :param infile: path of the input file
     :param outfile: path of the output file
@@ -31,17 +47,52 @@ def diff_ui(infile, outfile, fm_list, colors):
     :param colors: color highlighting rules
     :return: nothing (infinite loop until the window is closed)
     """
+    content_in = map_file(infile)
+    content_out = map_file(outfile)
+    nb_total = (max(len(content_in), len(content_out)) + BYTES_PER_ROW - 1) // BYTES_PER_ROW
+    highlights = Highlights(fm_list)
+    view = {'top': 0, 'rows': 24, 'fault': -1}  # first row and number of rows displayed, offset of the current fault
+
+    def nb_visible():
+        return view['rows']
+
+    def render(top):
+        top = max(min(top, nb_total - nb_visible()), 0)
+        view['top'] = top
+        for text, lines in [(text_offset, ["0x{:08X}".format(r * BYTES_PER_ROW)
+                                           for r in range(top, min(top + nb_visible(), nb_total))]),
+                            (text_infile, hex_rows(content_in, top, nb_visible())),
+                            (text_outfile, hex_rows(content_out, top, nb_visible()))]:
+            text.config(state=NORMAL)
+            text.delete('1.0', END)
+            text.insert(END, "\n".join(lines))
+            text.config(state=DISABLED)
+        for start, stop, tag in visible_spans(highlights, top, nb_visible()):
+            text_infile.tag_add(tag, start, stop)
+            text_outfile.tag_add(tag, start, stop)
+        if nb_total > 0:
+            scrollbar.set(top / nb_total, min(top + nb_visible(), nb_total) / nb_total)
 
     def yview(*args):
-        text_offset.yview_moveto(args[1])
-        text_infile.yview_moveto(args[1])
-        text_outfile.yview_moveto(args[1])
-
-    def set_scroll(*args):
-        text_offset.yview_moveto(args[0])
-        text_infile.yview_moveto(args[0])
-        text_outfile.yview_moveto(args[0])
-        return scrollbar.set(args[0], args[1])
+        if args[0] == 'moveto':
+            render(int(float(args[1]) * nb_total))
+        elif args[0] == 'scroll':
+            step = nb_visible() if args[2] == 'pages' else 1
+            render(view['top'] + int(args[1]) * step)
+
+    def jump(offset):
+        # The row of the fault is displayed a few rows below the top of the window
+        if offset is not None:
+            view['fault'] = offset
+            render(offset // BYTES_PER_ROW - min(3, nb_visible() // 4))
+        return 'break'
+
+    def wheel(event):
+        if event.num == 4 or event.delta > 0:
+            render(view['top'] - 3)
+        else:
+            render(view['top'] + 3)
+        return 'break'
 
     # Contents of the window
     root = Tk()
@@ -54,48 +105,50 @@ def diff_ui(infile, outfile, fm_list, colors):
         Label(frame1, text=" ").pack(side=LEFT)
     frame1.pack(anchor=N, fill=Y, expand=False)
 
+    Button(frame1, text="< Previous fault", command=lambda: jump(highlights.previous(view['fault']))).pack(side=LEFT)
+    Button(frame1, text="Next fault >", command=lambda: jump(highlights.next(view['fault']))).pack(side=LEFT)
+    root.bind('n', lambda event: jump(highlights.next(view['fault'])))
+    root.bind('p', lambda event: jump(highlights.previous(view['fault'])))
+
     Label(frame2, text='Byte offset' + ' ' * 10 + 'Input file' + ' ' * 83 + 'Output file' + ' ' * 77).pack(side=LEFT)
     frame2.pack(anchor=N, fill=Y, expand=False)
 
     scrollbar = Scrollbar(frame3)
     Label(frame3, width=1).pack(side=LEFT)
-    text_offset = Text(frame3, width=10)
+    text_offset = Text(frame3, width=10, wrap=NONE)
     text_offset.pack(side=LEFT, fill=Y)
     Label(frame3, width=1).pack(side=LEFT)
-    text_infile = Text(frame3, width=47)
+    text_infile = Text(frame3, width=47, wrap=NONE)
     text_infile.pack(side=LEFT, fill=Y)
     Label(frame3, width=1).pack(side=LEFT)
-    text_outfile = Text(frame3, width=47)
+    text_outfile = Text(frame3, width=47, wrap=NONE)
     text_outfile.pack(side=LEFT, fill=Y)
-    text_offset.insert(END, '\n'.join("0x{:08X}".format(i) for i in range(0, os.stat(infile).st_size, 16)))
-    text_offset['yscrollcommand'] = set_scroll
-    text_infile['yscrollcommand'] = set_scroll
-    text_outfile['yscrollcommand'] = set_scroll
     Label(frame3, width=1).pack(side=LEFT)
     scrollbar.pack(side=LEFT, fill=Y)
     scrollbar['command'] = yview
     frame3.pack(anchor=N, fill=Y, expand=True)
 
-    text_infile.insert(END, file_to_hex_col(infile))
-    text_outfile.insert(END, file_to_hex_col(outfile))
+    for text in [text_offset, text_infile, text_outfile]:
+        for event in ['<MouseWheel>', '<Button-4>', '<Button-5>']:
+            text.bind(event, wheel)
 
     # Setting the colors
-    for f in fm_list:
-        for m in f.edited_file_locations():
-            b_start = m // 8
-            start = "1." + str(2 * b_start + b_start - b_start // 16)
-            stop = "1." + str(2 * b_start + b_start - b_start // 16 + 2)
-            text_infile.tag_add(f.name, start, stop)
-            text_outfile.tag_add(f.name, start, stop)
-
     for k, v in colors.items():
         text_infile.tag_config(k, foreground="white", background=v)
         text_outfile.tag_config(k, foreground="white", background=v)
 
-    # Disable edits and configure window
-    text_offset.config(state=DISABLED)
-    text_infile.config(state=DISABLED)
-    text_outfile.config(state=DISABLED)
+    # The number of visible rows changes with the height of the window
+    def resize(event):
+        linespace = int(text_infile.tk.call('font', 'metrics', text_infile.cget('font'), '-linespace'))
+        rows = max(event.height // max(linespace, 1), 1)
+        if rows != view['rows']:
+            view['rows'] = rows
+            render(view['top'])
+
+    text_infile.bind('<Configure>', resize)
+    render(0)
+
+    # Configure window
     root.title('SWIFI Tool')
     root.resizable(False, True)
     root.mainloop()
@@ -0,0 +1,204 @@
+import argparse
+import collections
+import concurrent.futures
+import hashlib
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import time
+
+from utils import check_or_fail, command_line
+
+# Outcomes of a mutant execution compared to the golden run
+CRASH = 'crash'  # terminated by a signal or not loadable
+HANG = 'hang'  # still running at the timeout
+SDC = 'sdc'  # silent data corruption : exited but with another exit code or other outputs
+NO_EFFECT = 'no_effect'  # same exit code and outputs
+OUTCOMES = [CRASH, HANG, SDC, NO_EFFECT]
+
+
+class RunResult:
+    """Result of one execution of a program."""
+
+    def __init__(self, returncode, stdout_digest, stderr_digest, wall_time, timed_out):
+        super().__init__()
+        self.returncode = returncode
+        self.stdout_digest = stdout_digest
+        self.stderr_digest = stderr_digest
+        self.wall_time = wall_time
+        self.timed_out = timed_out
+
+    @property
+    def signal(self):
+        """Number of the signal that terminated the program, None if it exited."""
+        return -self.returncode if self.returncode is not None and self.returncode < 0 else None
+
+
+def run(command, timeout=None, stdin=None, pass_fds=()):
+    """Execute a program and wait for it (and the processes it started) at most timeout seconds.
+
+    :param command: the program followed by its arguments
+    :param timeout: maximum duration in seconds, None for no limit
+    :param stdin: bytes given on the standard input
+    :param pass_fds: file descriptors kept open in the program
+    :return: a RunResult, with no exit code if the program could not be started (e.g. corrupted headers)
+    """
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   start_new_session=True, pass_fds=pass_fds)
+    except OSError:
+        empty = hashlib.sha256(b'').hexdigest()
+        return RunResult(None, empty, empty, time.perf_counter() - start, False)
+    timed_out = False
+    try:
+        stdout, stderr = process.communicate(stdin, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+        stdout, stderr = process.communicate()
+    wall_time = time.perf_counter() - start
+    return RunResult(process.returncode, hashlib.sha256(stdout).hexdigest(), hashlib.sha256(stderr).hexdigest(),
+                     wall_time, timed_out)
+
+
+def run_image(image, args, timeout=None, stdin=None, edits=()):
+    """Execute a program from its content in memory, in an anonymous file (Linux memfd) : nothing is written
+    on the filesystem.
+
+    :param image: the content of the program
+    :param args: list of arguments given to the program
+    :param timeout: maximum duration in seconds, None for no limit
+    :param stdin: bytes given on the standard input
+    :param edits: list of (offset, bytes) written over the content, to run a mutant without copying the content
+    :return: a RunResult
+    """
+    check_or_fail(hasattr(os, 'memfd_create'), "Executing from memory requires Linux and Python 3.8 or later")
+    fd = os.memfd_create('swifi')
+    try:
+        view = memoryview(image)
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+        for offset, data in edits:
+            os.pwrite(fd, data, offset)
+        # Executed through a read-only descriptor : a file opened for writing cannot always be executed
+        program = os.open('/proc/self/fd/' + str(fd), os.O_RDONLY)
+    finally:
+        os.close(fd)
+    try:
+        return run(['/proc/self/fd/' + str(program)] + args, timeout, stdin, pass_fds=(program,))
+    finally:
+        os.close(program)
+
+
+def classify(result, golden):
+    """Compare the execution of a mutant with the golden run.
+
+    :param result: RunResult of the mutant
+    :param golden: RunResult of the original program
+    :return: one of OUTCOMES
+    """
+    if result.timed_out:
+        return HANG
+    if result.signal is not None or result.returncode is None:
+        return CRASH
+    if result.returncode != golden.returncode or result.stdout_digest != golden.stdout_digest or \
+            result.stderr_digest != golden.stderr_digest:
+        return SDC
+    return NO_EFFECT
+
+
+def bounded_map(function, items, jobs):
+    """Call a function on every item with a pool of threads, keeping a bounded number of items in progress.
+
+    :param function: function of one item
+    :param items: iterable, consumed lazily
+    :param jobs: number of threads
+    :return: a generator of (item, result) in the order of the items
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = collections.deque()
+        for item in items:
+            pending.append((item, pool.submit(function, item)))
+            if len(pending) >= 2 * jobs:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while len(pending) > 0:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+
+def run_mutants(mutants, args, golden, timeout=None, stdin=None, jobs=1):
+    """Execute mutant files in parallel and classify their outcome.
+
+    :param mutants: iterable of paths of executable mutants
+    :param args: list of arguments given to each mutant
+    :param golden: RunResult of the original program
+    :param timeout: maximum duration of each run in seconds
+    :param stdin: bytes given on the standard input of each run
+    :param jobs: number of mutants running at the same time
+    :return: a generator of (path, RunResult, outcome) in the order of the mutants
+    """
+    def execute(path):
+        return run([os.path.abspath(path)] + args, timeout, stdin)
+
+    for path, result in bounded_map(execute, mutants, jobs):
+        yield path, result, classify(result, golden)
+
+
+def format_result(name, result, outcome):
+    """Format one result as a tab separated line : name, outcome, exit code, wall time, stdout and stderr digests."""
+    return "\t".join([str(name), outcome, str(result.returncode), "{:.6f}".format(result.wall_time),
+                      result.stdout_digest, result.stderr_digest])
+
+
+@command_line
+def main(argv):
+    # Collect parameters
+    parser = argparse.ArgumentParser(description='Execute mutants and compare them with the original program',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-g', '--golden', type=str, metavar='GOLDEN', required=True,
+                        help='path to the original program')
+    parser.add_argument('-a', '--args', type=str, metavar='ARGS', required=False, default='',
+                        help='arguments given to each execution (split like a shell command)')
+    parser.add_argument('--stdin', type=str, metavar='STDIN', required=False,
+                        help='file given on the standard input of each execution')
+    parser.add_argument('-t', '--timeout', type=float, metavar='TIMEOUT', required=False,
+                        help='seconds after which a mutant is killed and considered hanging\n' +
+                             '(default : ten times the duration of the golden run, at least one second)')
+    parser.add_argument('-j', '--jobs', type=int, metavar='JOBS', required=False, default=0,
+                        help='number of mutants running at the same time (default : number of cores)')
+    parser.add_argument('mutants', nargs='+', metavar='MUTANT', help='paths to the mutants')
+    args = parser.parse_args(argv)
+    check_or_fail(args.jobs >= 0, "Number of jobs must be positive")
+    check_or_fail(args.timeout is None or args.timeout > 0, "Timeout must be positive")
+
+    stdin = None
+    if args.stdin is not None:
+        with open(os.path.expanduser(args.stdin), 'rb') as f:
+            stdin = f.read()
+    program_args = shlex.split(args.args)
+    golden = run([os.path.abspath(os.path.expanduser(args.golden))] + program_args, args.timeout, stdin)
+    check_or_fail(golden.returncode is not None, "The golden program could not be executed")
+    check_or_fail(not golden.timed_out, "The golden run did not finish before the timeout")
+    timeout = args.timeout if args.timeout is not None else max(10 * golden.wall_time, 1.0)
+
+    counts = dict([(o, 0) for o in OUTCOMES])
+    for path, result, outcome in run_mutants(args.mutants, program_args, golden, timeout, stdin,
+                                             args.jobs or os.cpu_count() or 1):
+        sys.stdout.write(format_result(path, result, outcome) + "\n")
+        counts[outcome] += 1
+    sys.stderr.write(", ".join(o + " : " + str(counts[o]) for o in OUTCOMES) + "\n")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,124 @@
+import csv
+import json
+
+from utils import check_or_fail
+
+# Structured fault lists, read as a stream with one record per line :
+#   JSONL : {"model": "FLP", "args": ["0x10", "3"]} for one fault,
+#           {"faults": [{"model": "NOP", "args": ["0x20"]}, ...]} for all the faults of a mutant,
+#           both with an optional "mutant" number
+#   CSV   : [mutant number,] model, parameters... (e.g. 2,FLP,0x10,3), lines starting with # are comments
+STRUCTURED_FORMATS = ['.jsonl', '.csv']
+
+
+def is_structured(path):
+    """Check whether a fault list is in a structured format, from its extension."""
+    return any(path.endswith(ext) for ext in STRUCTURED_FORMATS)
+
+
+def record_origin(path, n):
+    """Describe the place of a record in the errors, e.g. 'line 3 of faults.csv'."""
+    return "line " + str(n) + " of " + path
+
+
+def _fail(path, n, msg):
+    check_or_fail(False, msg + " (" + record_origin(path, n) + ")")
+
+
+def _json_fault(path, n, fault):
+    if not isinstance(fault, dict) or not isinstance(fault.get('model'), str) or \
+            not isinstance(fault.get('args', []), list):
+        _fail(path, n, "Invalid fault : " + json.dumps(fault))
+    return [fault['model']] + [str(a) for a in fault.get('args', [])]
+
+
+def _json_records(path, f):
+    for n, line in enumerate(f, 1):
+        if len(line.strip()) == 0:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            _fail(path, n, "Invalid JSON record : " + str(e))
+        if not isinstance(record, dict):
+            _fail(path, n, "Invalid record : " + line.strip())
+        mutant = record.get('mutant')
+        if mutant is not None and (not isinstance(mutant, int) or isinstance(mutant, bool)):
+            _fail(path, n, "Invalid mutant number : " + json.dumps(mutant))
+        if 'faults' in record:
+            if not isinstance(record['faults'], list):
+                _fail(path, n, "Invalid record : " + line.strip())
+            tokens = [t for fault in record['faults'] for t in _json_fault(path, n, fault)]
+        else:
+            tokens = _json_fault(path, n, record)
+        yield n, mutant, tokens
+
+
+def _csv_records(f):
+    reader = csv.reader(f)
+    for row in reader:
+        row = [field.strip() for field in row]
+        if len(row) == 0 or all(len(field) == 0 for field in row) or row[0].startswith('#'):
+            continue
+        mutant = None
+        if row[0].isdigit():
+            mutant = int(row[0])
+            row = row[1:]
+        while len(row) > 0 and len(row[-1]) == 0:
+            row.pop()  # empty trailing fields of the models with fewer parameters
+        yield reader.line_num, mutant, row
+
+
+def read_records(path, names_fault_models):
+    """Read a structured fault list lazily, each record being checked as it is read : known model names and right
+    number of parameters. The errors give the line of the record.
+
+    :param path: path of the fault list (JSONL or CSV)
+    :param names_fault_models: dict mapping the model names to their class
+    :return: a generator of (line number, mutant number or None, list of tokens)
+    """
+    with open(path, 'r', newline='') as f:
+        records = _json_records(path, f) if path.endswith('.jsonl') else _csv_records(f)
+        for n, mutant, tokens in records:
+            if len(tokens) == 0:
+                _fail(path, n, "No fault models provided")
+            i = 0
+            while i < len(tokens):
+                fm_type = names_fault_models.get(tokens[i])
+                if fm_type is None:
+                    _fail(path, n, "Unknown fault model : " + tokens[i])
+                params = 0
+                while i + 1 + params < len(tokens) and tokens[i + 1 + params] not in names_fault_models:
+                    params += 1
+                if params != fm_type.nb_args:
+                    _fail(path, n, "Wrong number of parameters for " + tokens[i])
+                i += 1 + params
+            yield n, mutant, tokens
+
+
+def read_mutants(path, names_fault_models):
+    """Read the mutants of a structured campaign lazily, consecutive records with the same mutant number forming one
+    mutant : the records of a mutant must be contiguous. A record without mutant number is a mutant on its own,
+    numbered after its line.
+
+    :param path: path of the fault list (JSONL or CSV)
+    :param names_fault_models: dict mapping the model names to their class
+    :return: a generator of (number of the mutant, list of tokens)
+    """
+    current, tokens = None, []
+    emitted = set()  # numbers of the mutants already started
+    for n, mutant, record in read_records(path, names_fault_models):
+        if mutant is None or mutant != current:
+            if current is not None:
+                yield current, tokens
+            current, tokens = (n if mutant is None else mutant), []
+            if current in emitted:
+                _fail(path, n, "Mutant number already used by non-contiguous records : " + str(current))
+            emitted.add(current)
+        tokens.extend(record)
+        if mutant is None:
+            yield current, tokens
+            current, tokens = None, []
+    if current is not None:
+        yield current, tokens
+
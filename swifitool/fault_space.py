@@ -0,0 +1,134 @@
+from scanner import fall_through_faults
+from utils import check_or_fail, parse_addr, Location
+
+
+class FaultSpace:
+    """All the single faults of one fault model over a region, enumerated lazily.
+    The i-th fault is computed from i, so the space can be indexed and sliced without being materialised.
+    """
+    name = ""
+    step = 1  # number of bytes between two consecutive addresses
+
+    def __init__(self, config, region):
+        super().__init__()
+        self.config = config
+        self.region = region
+
+    def __len__(self):
+        return len(self.region) // self.step
+
+    def __getitem__(self, i):
+        """Returns the parameters of the i-th fault, as they would be given on the command line."""
+        return [self.name, hex(self.region.start + i * self.step)]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def items(self, shard=0, nb_shards=1):
+        """Enumerate one shard of the space, the shards being disjoint and interleaved.
+
+        :param shard: number of the shard (0 to nb_shards - 1)
+        :param nb_shards: number of shards
+        :return: a generator of (number of the fault starting at 1, list of tokens)
+        """
+        for i in range(shard, len(self), nb_shards):
+            yield i + 1, self[i]
+
+
+class FLPSpace(FaultSpace):
+    name = 'FLP'
+
+    def __len__(self):
+        return len(self.region) * 8
+
+    def __getitem__(self, i):
+        return [self.name, hex(self.region.start + i // 8), str(i % 8)]
+
+
+class Z1BSpace(FaultSpace):
+    name = 'Z1B'
+
+
+class Z1WSpace(FaultSpace):
+    name = 'Z1W'
+
+    def __init__(self, config, region):
+        super().__init__(config, region)
+        check_or_fail(config.word_length is not None, "Word size required when using Z1W")
+        self.step = config.word_length
+
+
+class NOPSpace(FaultSpace):
+    name = 'NOP'
+
+    def __init__(self, config, region):
+        super().__init__(config, region)
+        check_or_fail(config.arch is not None, "Architecture required when using NOP")
+        self.step = 2 if config.arch == 'arm' else 1
+
+
+class BranchSpace(FaultSpace):
+    """Every candidate branch of the region redirected to its fall-through, the branches being found by scanning."""
+
+    def __init__(self, config, region):
+        super().__init__(config, region)
+        self.addresses, self.targets, _ = fall_through_faults(config, region, (self.name,))
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __getitem__(self, i):
+        return [self.name, hex(int(self.addresses[i])), hex(int(self.targets[i]))]
+
+
+class JMPSpace(BranchSpace):
+    name = 'JMP'
+
+
+class JCCSpace(BranchSpace):
+    name = 'JCC'
+
+
+def parse_region(config, region):
+    """Parse a region given either as a section name or as an address range.
+    The region is expressed in the same addressing as the fault models parameters (virtual addresses or offsets).
+
+    :param config: the execution configuration
+    :param region: the string to parse
+    :return: a location
+    """
+    if config.sections is not None and config.sections.get(region) is not None:
+        s = config.sections.get(region)
+        start = s.vaddr if config.virtual else s.offset
+        return Location(start, start + s.size)
+    return parse_addr(region)
+
+
+def parse_shard(shard):
+    """Parse a shard given as 'i/N'.
+
+    :param shard: the string to parse
+    :return: (i, N)
+    """
+    parts = shard.split('/')
+    try:
+        check_or_fail(len(parts) == 2, "Wrong shard format : " + shard)
+        index, count = int(parts[0]), int(parts[1])
+    except ValueError:
+        check_or_fail(False, "Wrong shard format : " + shard)
+    check_or_fail(0 <= index < count, "Shard number must be between 0 and " + str(count - 1) + " : " + shard)
+    return index, count
+
+
+def fault_space(config, model, region):
+    """Build the space of all the single faults of a model over a region.
+
+    :param config: the execution configuration
+    :param model: name of the fault model
+    :param region: section name or address range
+    :return: a fault space
+    """
+    spaces = dict([(s.name, s) for s in [FLPSpace, Z1BSpace, Z1WSpace, NOPSpace, JMPSpace, JCCSpace]])
+    check_or_fail(model in spaces, "Fault model cannot be enumerated : " + model)
+    return spaces[model](config, parse_region(config, region))
@@ -0,0 +1,17 @@
+from bitflips import NUMPY_REQUIRED, random_masks, trimmed
+from faults.mbf import parse_random_args
+from faults.xor import XOR
+from utils import *
+
+
+class BST(XOR):
+    name = 'BST'
+    docs = '    BST addr bits seed \t flip a burst of contiguous bits at a random place of addr, drawn from the seed'
+    nb_args = 3
+
+    def draw_mask(self, args):
+        nb_bits, seed = parse_random_args(self.name, args)
+        np = numpy_module(NUMPY_REQUIRED)
+        offsets, masks = random_masks(np, np.random.default_rng(seed), 'BST', len(self.addr), 1, nb_bits)
+        offset, _, mask = trimmed(int(offsets[0]), b'', masks[0].tobytes())
+        return offset, mask
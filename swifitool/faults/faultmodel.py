@@ -3,6 +3,8 @@ class FaultModel:
     name = ""
     docs = ""
     nb_args = 0
+    code_only = False  # the model edits instructions, it makes no sense outside executable sections
+    origin = None  # record of a structured fault list giving the model (see fault_list.record_origin), for the errors
 
     def __init__(self, config, args):
         super().__init__()
@@ -10,7 +12,12 @@ class FaultModel:
         self.args = args
 
     def edited_file_locations(self):
-        """Returns the locations of the bits edited by the fault model."""
+        """Returns the list of locations (byte ranges and bit masks) edited by the fault model."""
 
-    def apply(self, opened_file):
-        """Apply the fault model to the given file."""
+    def edits(self, image):
+        """Returns the bytes written by the fault model as a list of (offset, bytes), given the original content."""
+
+    def apply(self, buffer):
+        """Apply the fault model to the given writable buffer (bytearray or mmap)."""
+        for offset, data in self.edits(buffer):
+            buffer[offset:offset + len(data)] = data
@@ -9,7 +9,7 @@ class FLP(FaultModel):
 
     def __init__(self, config, args):
         super().__init__(config, args)
-        self.addr = parse_addr(args[0])
+        self.addr = config.file_location(parse_addr(args[0]))
         check_or_fail(len(self.addr) == 1, "FLP does not support address range")
         try:
             self.significance = int(args[1], 0)
@@ -19,10 +19,7 @@ class FLP(FaultModel):
             check_or_fail(False, "Wrong significance format : " + args[1])
 
     def edited_file_locations(self):
-        return [self.addr[0] * 8 + self.significance]
+        return [Location(self.addr[0], self.addr[0] + 1, 1 << self.significance)]
 
-    def apply(self, opened_file):
-        opened_file.seek(self.addr[0])
-        prev_value = ord(opened_file.read(1))
-        prev_value ^= (1 << self.significance)
-        set_bytes(opened_file, self.addr[0], prev_value)
+    def edits(self, image):
+        return [(self.addr[0], bytes([image[self.addr[0]] ^ (1 << self.significance)]))]
@@ -1,5 +1,3 @@
-import os
-
 from faults.faultmodel import FaultModel
 from utils import *
 
@@ -8,87 +6,75 @@ class JMP(FaultModel):
     name = 'JMP'
     docs = '    JMP addr target \t\t change the jump to point on the target (relative near JMP on x86; B and BL on ARM)'
     nb_args = 2
+    code_only = True
 
     def __init__(self, config, args):
         super().__init__(config, args)
-        self.addr = parse_addr(args[0])
+        self.addr = config.file_location(parse_addr(args[0]))
         check_or_fail(len(self.addr) == 1, "Range of addresses not supported with JMP")
         check_or_fail(config.arch is not None, "Architecture required when using JMP")
         absolute_target = None
         try:
-            absolute_target = int(args[1], 0)
+            absolute_target = config.file_target(int(args[1], 0), self.addr[0])
         except ValueError:
             check_or_fail(False, "Invalid target for JMP : " + args[1])
-        if not (0 <= absolute_target < os.stat(config.infile).st_size):
+        if not (0 <= absolute_target < config.file_size):
             sys.stderr.write("Warning: Target outside the file" + "\n")
-        with open(self.config.infile, 'rb') as f:
-            f.seek(self.addr[0])
-            if self.config.arch == 'x86':
-                b0 = ord(f.read(1))
-                b1 = ord(f.read(1))
-                if b0 == 0xEB:
-                    self.target = absolute_target - (self.addr[0] + 1 + 1)
-                    check_or_fail(-2 ** 7 <= self.target < 2 ** 7, "Target value out of range : " + str(self.target))
-                    self.type = 0  # opcode EB
-                elif b0 == 0xE9:
-                    if self.addr[0] - 1 >= 0:
-                        f.seek(self.addr[0] - 1)
-                        b_prev = ord(f.read(1))
-                    else:
-                        b_prev = 0
-                    if b_prev == 0x66:
-                        self.addr = [self.addr[0] - 1]
-                        self.target = absolute_target - (self.addr[0] + 2 + 2)
-                        check_or_fail(-2 ** 15 <= self.target < 2 ** 15, "Target value out of range : " + str(self.target))
-                        self.type = 2  # opcode 66 E9
-                    else:
-                        self.target = absolute_target - (self.addr[0] + 1 + 4)
-                        check_or_fail(-2 ** 31 <= self.target < 2 ** 31, "Target value out of range : " + str(self.target))
-                        self.type = 1  # opcode E9
-                elif b0 == 0x66 and b1 == 0xE9:
+        image = self.config.image
+        if self.config.arch == 'x86':
+            # The following byte is only read when the opcode needs it, a short JMP can end the file
+            b0 = read_byte(image, self.addr[0])
+            if b0 == 0xEB:
+                self.target = absolute_target - (self.addr[0] + 1 + 1)
+                check_or_fail(-2 ** 7 <= self.target < 2 ** 7, "Target value out of range : " + str(self.target))
+                self.type = 0  # opcode EB
+            elif b0 == 0xE9:
+                if self.addr[0] - 1 >= 0:
+                    b_prev = read_byte(image, self.addr[0] - 1)
+                else:
+                    b_prev = 0
+                if b_prev == 0x66:
+                    self.addr = Location(self.addr[0] - 1, self.addr[0])
                     self.target = absolute_target - (self.addr[0] + 2 + 2)
                     check_or_fail(-2 ** 15 <= self.target < 2 ** 15, "Target value out of range : " + str(self.target))
                     self.type = 2  # opcode 66 E9
-                elif b0 == 0x66:
-                    check_or_fail(False, "Unknow opcode at JMP address : " + hex(b1))
-                else:
-                    check_or_fail(False, "Unknow opcode at JMP address : " + hex(b0))
-            elif self.config.arch == 'arm':
-                f.seek(self.addr[0] + 3)
-                b3 = ord(f.read(1))
-                if (b3 == 0xEA or b3 == 0xEB):
-                    self.target = absolute_target - (self.addr[0] + 8)
-                    check_or_fail(-2 ** 25 <= self.target < 2 ** 25, "Target value out of range : " + str(self.target))
-                    self.type = 3  # unconditional B or unconditional BL
                 else:
-                    check_or_fail(False, "Unknow opcode at JMP address : " + hex(b3))
+                    self.target = absolute_target - (self.addr[0] + 1 + 4)
+                    check_or_fail(-2 ** 31 <= self.target < 2 ** 31, "Target value out of range : " + str(self.target))
+                    self.type = 1  # opcode E9
+            elif b0 == 0x66 and read_byte(image, self.addr[0] + 1) == 0xE9:
+                self.target = absolute_target - (self.addr[0] + 2 + 2)
+                check_or_fail(-2 ** 15 <= self.target < 2 ** 15, "Target value out of range : " + str(self.target))
+                self.type = 2  # opcode 66 E9
+            elif b0 == 0x66:
+                check_or_fail(False, "Unknow opcode at JMP address : " + hex(read_byte(image, self.addr[0] + 1)))
+            else:
+                check_or_fail(False, "Unknow opcode at JMP address : " + hex(b0))
+        elif self.config.arch == 'arm':
+            b3 = read_byte(image, self.addr[0] + 3)
+            if (b3 == 0xEA or b3 == 0xEB):
+                self.target = absolute_target - (self.addr[0] + 8)
+                check_or_fail(-2 ** 25 <= self.target < 2 ** 25, "Target value out of range : " + str(self.target))
+                self.type = 3  # unconditional B or unconditional BL
+            else:
+                check_or_fail(False, "Unknow opcode at JMP address : " + hex(b3))
 
     def edited_file_locations(self):
         if self.type == 0:
-            return bits_list(range(self.addr[0] + 1, self.addr[0] + 2))
+            return [Location(self.addr[0] + 1, self.addr[0] + 2)]
         elif self.type == 1:
-            return bits_list(range(self.addr[0] + 1, self.addr[0] + 5))
+            return [Location(self.addr[0] + 1, self.addr[0] + 5)]
         elif self.type == 2:
-            return bits_list(range(self.addr[0] + 2, self.addr[0] + 4))
+            return [Location(self.addr[0] + 2, self.addr[0] + 4)]
         elif self.type == 3:
-            return bits_list(range(self.addr[0], self.addr[0] + 3))
+            return [Location(self.addr[0], self.addr[0] + 3)]
 
-    def apply(self, opened_file):
+    def edits(self, image):
         if self.type == 0:
-            opened_file.seek(self.addr[0] + 1)
-            opened_file.write(bytes([self.target & 0xFF]))
+            return [(self.addr[0] + 1, (self.target & 0xFF).to_bytes(1, 'little'))]
         elif self.type == 1:
-            opened_file.seek(self.addr[0] + 1)
-            opened_file.write(bytes([self.target & 0xFF]))
-            opened_file.write(bytes([self.target >> 8 & 0xFF]))
-            opened_file.write(bytes([self.target >> 16 & 0xFF]))
-            opened_file.write(bytes([self.target >> 24 & 0xFF]))
+            return [(self.addr[0] + 1, (self.target & 0xFFFFFFFF).to_bytes(4, 'little'))]
         elif self.type == 2:
-            opened_file.seek(self.addr[0] + 2)
-            opened_file.write(bytes([self.target & 0xFF]))
-            opened_file.write(bytes([self.target >> 8 & 0xFF]))
+            return [(self.addr[0] + 2, (self.target & 0xFFFF).to_bytes(2, 'little'))]
         elif self.type == 3:
-            opened_file.seek(self.addr[0])
-            opened_file.write(bytes([self.target >> 2 & 0xFF]))
-            opened_file.write(bytes([self.target >> 10 & 0xFF]))
-            opened_file.write(bytes([self.target >> 18 & 0xFF]))
+            return [(self.addr[0], (self.target >> 2 & 0xFFFFFF).to_bytes(3, 'little'))]
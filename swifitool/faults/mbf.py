@@ -0,0 +1,30 @@
+from bitflips import NUMPY_REQUIRED, random_masks
+from faults.xor import XOR
+from utils import *
+
+
+class MBF(XOR):
+    name = 'MBF'
+    docs = '    MBF addr bits seed \t flip random distinct bits of a byte or a word (addr range), drawn from the seed'
+    nb_args = 3
+
+    def draw_mask(self, args):
+        nb_bits, seed = parse_random_args(self.name, args)
+        np = numpy_module(NUMPY_REQUIRED)
+        _, masks = random_masks(np, np.random.default_rng(seed), 'MBF', len(self.addr), 1, nb_bits, len(self.addr))
+        return 0, masks[0].tobytes()
+
+
+def parse_random_args(name, args):
+    """Parse the number of bits and the seed of a random model.
+
+    :param name: name of the model
+    :param args: the parameters of the model
+    :return: (number of bits, seed)
+    """
+    try:
+        nb_bits, seed = int(args[1], 0), int(args[2], 0)
+    except ValueError:
+        check_or_fail(False, "Wrong parameters format for " + name + " : " + args[1] + " " + args[2])
+    check_or_fail(seed >= 0, "Seed must be positive : " + args[2])
+    return nb_bits, seed
@@ -0,0 +1,32 @@
+from faults.faultmodel import FaultModel
+from utils import *
+
+
+class XOR(FaultModel):
+    name = 'XOR'
+    docs = '    XOR addr mask \t\t flip the bits of a mask (hex bytes in file order, one per address)'
+    nb_args = 2
+
+    def __init__(self, config, args):
+        super().__init__(config, args)
+        self.addr = config.file_location(parse_addr(args[0]))
+        offset, self.mask = self.draw_mask(args)
+        self.addr = Location(self.addr[0] + offset, self.addr[0] + offset + len(self.mask))
+
+    def draw_mask(self, args):
+        """Returns the offset of the mask in the range of addresses and the mask (one byte per address)."""
+        digits = args[1][2:] if args[1].lower().startswith('0x') else args[1]
+        try:
+            mask = bytes.fromhex(digits)
+        except ValueError:
+            check_or_fail(False, "Wrong mask format : " + args[1])
+        check_or_fail(len(mask) == len(self.addr),
+                      "Mask of " + str(len(mask)) + " bytes for " + str(len(self.addr)) + " addresses")
+        return 0, mask
+
+    def edited_file_locations(self):
+        return [Location(self.addr[0] + i, self.addr[0] + i + 1, m) for i, m in enumerate(self.mask) if m != 0]
+
+    def edits(self, image):
+        data = image[self.addr[0]:self.addr[0] + len(self.mask)]
+        return [(self.addr[0], bytes(d ^ m for d, m in zip(data, self.mask)))]
@@ -9,10 +9,10 @@ class Z1B(FaultModel):
 
     def __init__(self, config, args):
         super().__init__(config, args)
-        self.addr = parse_addr(args[0])
+        self.addr = config.file_location(parse_addr(args[0]))
 
     def edited_file_locations(self):
-        return bits_list(self.addr)
+        return [self.addr]
 
-    def apply(self, opened_file):
-        set_bytes(opened_file, self.addr[0], nb_repeat=len(self.addr))
+    def edits(self, image):
+        return [(self.addr[0], bytes(len(self.addr)))]
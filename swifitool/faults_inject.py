@@ -1,21 +1,380 @@
 import argparse
+import heapq
+import itertools
+import mmap
+import multiprocessing
+import shlex
 import shutil
 import sys
 import os
+import time
 
 from config import ExecConfig
+from faults.bst import BST
 from faults.flp import FLP
 from faults.jcc import JCC
 from faults.jmp import JMP
+from faults.mbf import MBF
 from faults.nop import NOP
+from faults.xor import XOR
 from faults.z1b import Z1B
 from faults.z1w import Z1W
-from utils import check_or_fail
+import executor
+from bitflips import RANDOM_MODELS, random_campaign, random_deltas
+from delta import DeltaWriter
+from fault_list import is_structured, read_mutants, read_records, record_origin
+from fault_space import fault_space, parse_region, parse_shard
+from report import write_report
+from results import ResultStore
+from sampler import STRATA, Sampler, strata
+from stats import Stats
+from utils import apply_faults, check_or_fail, command_line, effective_patch, merge_edits, mutant_name, patch_digest, \
+    InjectionError
 
+ENABLED_FAULT_MODELS = [FLP, Z1B, Z1W, NOP, JMP, JCC, XOR, MBF, BST]
 
+
+def parse_fault_models(config, tokens, names_fault_models):
+    """Build the fault model objects from a list of tokens (model names each followed by its parameters).
+
+    :param config: the execution configuration
+    :param tokens: list of strings
+    :param names_fault_models: dict mapping the model names to their class
+    :return: a list of fault model objects
+    """
+    check_or_fail(len(tokens) >= 1, "No fault models provided")
+    fm_list = []
+    indices = [i for i, x in enumerate(tokens) if names_fault_models.get(x) is not None]
+    indices.append(len(tokens))
+
+    for i in range(len(indices) - 1):
+        n = indices[i]
+        fm_name = tokens[n]
+        fm_type = names_fault_models.get(fm_name)
+        if fm_type is not None:
+            check_or_fail(indices[i + 1] - n - 1 == fm_type.nb_args, "Wrong number of parameters for " + fm_name)
+            ar = []
+            for j in range(fm_type.nb_args):
+                ar.append(tokens[n + 1 + j])
+            fm_list.append(fm_type(config, ar))
+    config.stats.count('models', len(fm_list))
+    return fm_list
+
+
+def _located(msg, fm_list):
+    """Add the records of the fault models read from a structured fault list to an error message."""
+    origins = []
+    for f in fm_list:
+        if f.origin is not None and f.origin not in origins:
+            origins.append(f.origin)
+    return msg if len(origins) == 0 else msg + " (" + ", ".join(origins) + ")"
+
+
+def check_fault_models(fm_list, file_size, sections=None, stats=None):
+    """Check that the faults do not overlap and do not write outside the end of the file.
+    The locations are sorted by start offset and compared only with the ones still covering that offset.
+    The errors give the records of the fault models read from a structured fault list.
+
+    :param fm_list: list of fault model objects
+    :param file_size: size of the input file in bytes
+    :param sections: index of the sections of the input file, to warn about instructions edited outside the code
+    :param stats: the Stats counting the locations and the bits checked
+    """
+    locations = []  # list of (location, fault model)
+    for f in fm_list:
+        for loc in f.edited_file_locations():
+            if loc.start < 0 or loc.stop > file_size:
+                check_or_fail(False, _located("Address outside file content : byte " +
+                                              hex(loc.start if loc.start < 0 else max(loc.start, file_size)), [f]))
+            if f.code_only and sections is not None and not sections.is_executable(loc.start, loc.stop):
+                sys.stderr.write("Warning: " + f.name + " outside executable sections : byte " + hex(loc.start) + "\n")
+            locations.append((loc, f))
+    locations.sort(key=lambda l: l[0].start)
+    active = []  # heap of (stop, index) of the locations covering the current offset, at most 8 of them
+    for i, (loc, f) in enumerate(locations):
+        while len(active) > 0 and active[0][0] <= loc.start:
+            heapq.heappop(active)
+        for _, j in active:
+            if loc.overlaps(locations[j][0]):
+                check_or_fail(False, _located("Applying two fault models at the same place : byte " + hex(loc.start),
+                                              [locations[j][1], f]))
+        heapq.heappush(active, (loc.stop, i))
+    if stats is not None and stats.enabled:
+        stats.count('locations_checked', len(locations))
+        stats.count('bits_checked', sum(len(loc) * bin(loc.mask).count('1') for loc, _ in locations))
+
+
+def read_campaign(path):
+    """Read a campaign file lazily, one set of fault models per line. Empty lines are skipped.
+
+    :param path: path of the campaign file
+    :return: a generator of (line number, list of tokens)
+    """
+    with open(path, 'r') as cf:
+        for n, line in enumerate(cf, 1):
+            tokens = line.split()
+            if len(tokens) > 0:
+                yield n, tokens
+
+
+def read_fault_models(config, path, names_fault_models):
+    """Build the fault model objects of a structured fault list (JSONL or CSV) as a stream, all the records forming
+    one mutant. The errors of a model give the line of its record, which is also kept in its origin for the errors
+    of check_fault_models.
+
+    :param config: the execution configuration
+    :param path: path of the fault list
+    :param names_fault_models: dict mapping the model names to their class
+    :return: a list of fault model objects
+    """
+    fm_list = []
+    for n, _, tokens in read_records(path, names_fault_models):
+        origin = record_origin(path, n)
+        try:
+            models = parse_fault_models(config, tokens, names_fault_models)
+        except InjectionError as e:
+            raise InjectionError(str(e) + " (" + origin + ")")
+        for f in models:
+            f.origin = origin
+        fm_list.extend(models)
+    return fm_list
+
+
+def write_mutant(image, fm_list, outfile, mode):
+    """Write a copy of the input content with the faults applied.
+
+    :param image: the content of the input file
+    :param fm_list: list of fault model objects
+    :param outfile: path of the destination file
+    :param mode: permission bits given to the destination file
+    """
+    buffer = bytearray(image)
+    apply_faults(buffer, fm_list)
+    with open(outfile, 'wb') as file:
+        file.write(buffer)
+    os.chmod(outfile, mode)
+
+
+def mutant_delta(image, fm_list):
+    """Compute the patch of a mutant : the bytes written by the faults, contiguous ones merged.
+
+    :param image: the content of the input file
+    :param fm_list: list of fault model objects
+    :return: a list of (offset, bytes) sorted by offset
+    """
+    return merge_edits(image, fm_list)
+
+
+def checked_mutants(config, campaign, names_fault_models):
+    """Parse and check the fault models of each mutant of a campaign, lazily and in order.
+
+    :param config: the execution configuration
+    :param campaign: iterable of (number of the mutant, list of tokens)
+    :param names_fault_models: dict mapping the model names to their class
+    :return: a generator of (number of the mutant, list of tokens, list of fault model objects)
+    """
+    for n, tokens in campaign:
+        fm_list = parse_fault_models(config, tokens, names_fault_models)
+        check_fault_models(fm_list, config.file_size, config.sections, config.stats)
+        yield n, tokens, fm_list
+
+
+def identified_mutants(image, mutants, dedup=False):
+    """Compute the effective patch of each mutant and find the mutants identical to a previous one.
+
+    :param image: the content of the input file
+    :param mutants: iterable of (number of the mutant, list of tokens, list of fault model objects)
+    :param dedup: look for identical mutants (the hashes of the previous mutants are kept in memory)
+    :return: a generator of (number, tokens, fault models, effective patch, hash of the patch, alias) where alias is
+             the number of the first identical mutant, 0 if the mutant is identical to the input file, None otherwise
+    """
+    first = {}
+    for n, tokens, fm_list in mutants:
+        patch = effective_patch(image, merge_edits(image, fm_list))
+        digest = patch_digest(patch)
+        alias = None
+        if dedup:
+            if len(patch) == 0:
+                alias = 0
+            else:
+                alias = first.setdefault(digest, n)
+                alias = None if alias == n else alias
+        yield n, tokens, fm_list, patch, digest, alias
+
+
+def unique_mutants(image, mutants):
+    """Skip the mutants identical to the input file or to a previous mutant, with a warning.
+
+    :param image: the content of the input file
+    :param mutants: iterable of (number of the mutant, list of tokens, list of fault model objects)
+    :return: a generator of (number of the mutant, list of tokens, list of fault model objects)
+    """
+    for n, tokens, fm_list, _, _, alias in identified_mutants(image, mutants, True):
+        if alias is None:
+            yield n, tokens, fm_list
+        elif alias == 0:
+            sys.stderr.write("Warning: mutant " + str(n) + " is identical to the input file, skipped\n")
+        else:
+            sys.stderr.write("Warning: mutant " + str(n) + " is identical to mutant " + str(alias) + ", skipped\n")
+
+
+# Settings of the campaign in a worker process : content of the input file, permission bits and naming pattern
+# of the mutants (None when the mutants are returned as patches)
+_worker_image = None
+_worker_mode = None
+_worker_pattern = None
+
+
+def _init_worker(image, mode, pattern):
+    global _worker_image, _worker_mode, _worker_pattern
+    _worker_image = image
+    _worker_mode = mode
+    _worker_pattern = pattern
+
+
+def _mutant_job(job):
+    n, fm_list = job
+    if _worker_pattern is None:
+        return mutant_delta(_worker_image, fm_list)
+    write_mutant(_worker_image, fm_list, mutant_name(_worker_pattern, n), _worker_mode)
+
+
+def run_campaign(config, campaign, names_fault_models, jobs=1, delta=False, batch_size=256, dedup=False):
+    """Write one mutant per set of fault models of the campaign, reading the input file only once.
+
+    The fault models are always parsed and checked in the main process, in the order of the campaign, so the
+    errors reported do not depend on the number of jobs. Only the building of the mutants is done in parallel,
+    the input content being inherited by the workers (fork) or sent once to each of them.
+
+    :param config: the execution configuration, its outfile is the naming pattern of the mutants
+    :param campaign: iterable of (number of the mutant, list of tokens)
+    :param names_fault_models: dict mapping the model names to their class
+    :param jobs: number of processes building the mutants
+    :param delta: write all the mutants as patch records in the delta file config.outfile
+    :param batch_size: number of mutants checked before being dispatched to the processes
+    :param dedup: skip the mutants identical to the input file or to a previous mutant
+    """
+    image = config.image
+    mode = os.stat(config.infile).st_mode & 0o7777
+    writer = DeltaWriter(config.outfile, image) if delta else None
+    mutants = checked_mutants(config, campaign, names_fault_models)
+    if dedup:
+        mutants = unique_mutants(image, mutants)
+
+    def process(batch, results):
+        if writer is not None:
+            for (n, _), chunks in zip(batch, results):
+                writer.write(n, chunks)
+
+    try:
+        if jobs == 1:
+            for n, _, fm_list in mutants:
+                if writer is not None:
+                    writer.write(n, mutant_delta(image, fm_list))
+                else:
+                    write_mutant(image, fm_list, mutant_name(config.outfile, n), mode)
+            return
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing.get_context()
+            image = bytes(image)  # a mapping cannot be sent to a spawned process
+        pattern = None if delta else config.outfile
+        with context.Pool(jobs, initializer=_init_worker, initargs=(image, mode, pattern)) as pool:
+            batch = []
+            try:
+                for n, _, fm_list in mutants:
+                    batch.append((n, fm_list))
+                    if len(batch) == batch_size:
+                        process(batch, pool.map(_mutant_job, batch))
+                        batch = []
+            finally:
+                # Mutants checked before an error are written, as when using a single job
+                process(batch, pool.map(_mutant_job, batch))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def execute_campaign(config, campaign, names_fault_models, args, timeout=None, stdin=None, jobs=1, store=None,
+                     append=False, dedup=False, observer=None):
+    """Execute every mutant of the campaign from memory and write its outcome compared to the input program.
+    The mutants are never written on the filesystem.
+
+    :param config: the execution configuration, the results are written in config.outfile
+    :param campaign: iterable of (number of the mutant, list of tokens)
+    :param names_fault_models: dict mapping the model names to their class
+    :param args: list of arguments given to each execution
+    :param timeout: maximum duration of a run in seconds (by default ten times the original one, at least 1 second)
+    :param stdin: bytes given on the standard input of each execution
+    :param jobs: number of mutants running at the same time
+    :param store: ResultStore also recording the outcomes, None for none
+    :param append: append the results to config.outfile instead of overwriting it
+    :param dedup: do not execute the mutants identical to the input file or to a previous mutant, their outcome is
+                  the one of the identical program
+    :param observer: function called with the number and the outcome of each mutant, None for none
+    """
+    image = config.image
+    golden = executor.run_image(image, args, timeout, stdin)
+    check_or_fail(golden.returncode is not None, "The input program could not be executed")
+    check_or_fail(not golden.timed_out, "The golden run did not finish before the timeout")
+    if timeout is None:
+        timeout = max(10 * golden.wall_time, 1.0)
+
+    def execute(mutant):
+        if mutant[5] is not None:
+            return None  # identical to a program already executed
+        return executor.run_image(image, args, timeout, stdin, mutant[3])
+
+    mutants = identified_mutants(image, checked_mutants(config, campaign, names_fault_models), dedup)
+    counts = dict([(o, 0) for o in executor.OUTCOMES])
+    executed = {}  # results of the mutants executed by hash of their patch, to be copied by the identical ones
+    nb_duplicates = 0
+    with open(config.outfile, 'a' if append else 'w') as results:
+        for (n, tokens, fm_list, _, digest, alias), result in executor.bounded_map(execute, mutants, jobs):
+            if alias is not None:
+                # The first identical mutant was yielded (and executed) before this one
+                result = golden if alias == 0 else executed[digest]
+                nb_duplicates += 1
+            elif dedup:
+                executed[digest] = result
+            outcome = executor.classify(result, golden)
+            results.write(executor.format_result(n, result, outcome) + "\n")
+            if store is not None:
+                store.add(n, tokens, fm_list, digest, result, outcome)
+            if observer is not None:
+                observer(n, outcome)
+            counts[outcome] += 1
+    sys.stderr.write(", ".join(o + " : " + str(counts[o]) for o in executor.OUTCOMES) + "\n")
+    if dedup:
+        sys.stderr.write("Identical mutants not executed : " + str(nb_duplicates) + "\n")
+
+
+def keep_results(path, numbers):
+    """Rewrite a results file keeping only one complete line for each of some mutants. When a campaign is resumed,
+    the lines of the mutants written after the last transaction of the database are removed, as they are executed
+    again.
+
+    :param path: path of the results file, nothing is done if it does not exist
+    :param numbers: set of the numbers of the mutants kept
+    """
+    if not os.path.isfile(path):
+        return
+    kept = set()
+    with open(path, 'r') as src, open(path + '.tmp', 'w') as dst:
+        for line in src:
+            n = line.split('\t', 1)[0]
+            if line.endswith('\n') and n.isdigit() and int(n) in numbers and int(n) not in kept:
+                kept.add(int(n))
+                dst.write(line)
+    os.replace(path + '.tmp', path)
+
+
+@command_line
 def main(argv):
-    enabled_fault_models = [FLP, Z1B, Z1W, NOP, JMP, JCC]
-    names_fault_models = dict([(i.name, i) for i in enabled_fault_models])
+    wall, cpu = time.perf_counter(), time.process_time()
+    names_fault_models = dict([(i.name, i) for i in ENABLED_FAULT_MODELS])
 
     # Collect parameters
     parser = argparse.ArgumentParser(description='Software implemented fault injection tool',
@@ -27,60 +386,244 @@ def main(argv):
                         help='number of bytes in a word')
     parser.add_argument('-a', '--arch', type=str, metavar='ARCHITECTURE', required=False, choices=['x86', 'arm'],
                         help='architecture of the executable (x86 or arm) (x86 is for both 32 and 64 bits)')
+    parser.add_argument('-v', '--vaddr', action='store_true', required=False,
+                        help='addresses and targets are virtual addresses, translated using the ELF or PE headers')
     parser.add_argument('-g', '--graphical', action='store_true', required=False,
                         help='open a window comparing the input and the output')
+    parser.add_argument('-r', '--report', type=str, metavar='REPORT', required=False,
+                        help='write a report comparing the regions changed in the input and the output\n' +
+                             '(an HTML page if REPORT ends with .html, plain text otherwise)')
+    parser.add_argument('--context', type=int, metavar='ROWS', required=False, default=3,
+                        help='number of rows displayed in the report around each row changed (default : 3)')
     parser.add_argument('-f', '--fromfile', type=str, metavar='FILE_MODELS', required=False,
-                        help='read the faults models from a file instead of command line')
+                        help='read the faults models from a file instead of command line\n' +
+                             '(one record per fault if the file ends with .jsonl or .csv, see fault_list.py)')
+    parser.add_argument('-c', '--campaign', type=str, metavar='CAMPAIGN', required=False,
+                        help='write one mutant for each line of the file, a line containing a set of fault models\n' +
+                             '(or for each mutant number of a .jsonl or .csv file)\n' +
+                             'OUTFILE is then a pattern where {} is replaced by the line number')
+    parser.add_argument('-e', '--enumerate', type=str, nargs=2, metavar=('MODEL', 'REGION'), required=False,
+                        help='write one mutant for each single fault of MODEL (FLP, Z1B, Z1W, NOP, JMP or JCC)\n' +
+                             'in REGION (a section name or an address range), enumerated lazily\n' +
+                             'OUTFILE is then a pattern where {} is replaced by the number of the fault')
+    parser.add_argument('--random', type=str, nargs=2, metavar=('MODEL', 'REGION'), required=False,
+                        help='write one mutant for each fault of MODEL drawn at random in REGION (with NumPy) :\n' +
+                             'MBF flips BITS distinct bits of a byte (of a word with -w), BST a burst of BITS\n' +
+                             'contiguous bits; each mutant is written as an XOR fault model\n' +
+                             'OUTFILE is then a pattern where {} is replaced by the number of the fault')
+    parser.add_argument('--sample', type=str, nargs=2, metavar=('MODEL', 'REGION'), required=False,
+                        help='write one mutant for each single fault of MODEL in REGION drawn at random without\n' +
+                             'replacement, in proportion to the size of each stratum (see --strata)\n' +
+                             'OUTFILE is then a pattern where {} is replaced by the number of the fault')
+    parser.add_argument('--strata', type=str, metavar='STRATA', required=False, default='section', choices=STRATA,
+                        help='strata of the faults sampled : section (default), function or none')
+    parser.add_argument('--margin', type=float, metavar='MARGIN', required=False,
+                        help='stop sampling the executed mutants when the confidence interval of the rate of\n' +
+                             'each outcome is within +/- MARGIN (e.g. 0.01)')
+    parser.add_argument('--confidence', type=float, metavar='LEVEL', required=False, default=0.95,
+                        help='confidence level of the intervals of --margin (default : 0.95)')
+    parser.add_argument('--count', type=int, metavar='COUNT', required=False, default=1000,
+                        help='number of faults drawn with --random, at most with --sample (default : 1000)')
+    parser.add_argument('--bits', type=int, metavar='BITS', required=False, default=2,
+                        help='number of bits flipped by each fault drawn with --random (default : 2)')
+    parser.add_argument('--seed', type=int, metavar='SEED', required=False, default=0,
+                        help='seed of the faults drawn with --random or --sample (default : 0)')
+    parser.add_argument('--shard', type=str, metavar='SHARD', required=False,
+                        help='only handle the shard i/N of the campaign or of the enumeration (e.g. 0/4)')
+    parser.add_argument('-d', '--delta', action='store_true', required=False,
+                        help='write the mutants as patch records in the delta file OUTFILE instead of full copies\n' +
+                             '(rebuild them with delta.py)')
+    parser.add_argument('--dedup', action='store_true', required=False,
+                        help='skip the mutants of a campaign identical to the input file or to a previous mutant\n' +
+                             '(when executed, their outcome is copied from the identical program)')
+    parser.add_argument('-x', '--execute', action='store_true', required=False,
+                        help='execute each mutant of the campaign from memory instead of writing it,\n' +
+                             'the outcome of each execution is written in OUTFILE (see executor.py)')
+    parser.add_argument('--args', type=str, metavar='ARGS', required=False, default='',
+                        help='arguments given to each execution (split like a shell command)')
+    parser.add_argument('--stdin', type=str, metavar='STDIN', required=False,
+                        help='file given on the standard input of each execution')
+    parser.add_argument('-t', '--timeout', type=float, metavar='TIMEOUT', required=False,
+                        help='seconds after which an execution is killed and considered hanging\n' +
+                             '(default : ten times the duration of the original program, at least one second)')
+    parser.add_argument('--db', type=str, metavar='DATABASE', required=False,
+                        help='also record the faults and the outcome of each mutant executed in an SQLite database\n' +
+                             '(query it with results.py)')
+    parser.add_argument('--resume', action='store_true', required=False,
+                        help='skip the mutants already recorded in the database and append to OUTFILE')
+    parser.add_argument('-j', '--jobs', type=int, metavar='JOBS', required=False, default=1,
+                        help='number of processes building (or executing) the mutants of a campaign\n' +
+                             '(0 for all the cores)')
+    parser.add_argument('--stats', type=str, metavar='STATS', required=False,
+                        help='write the wall and CPU time of each phase and counters of the work done as JSON\n' +
+                             'in the file STATS (- for stderr)')
     parser.add_argument('fault_models', nargs='*', metavar='FAULT_MODEL',
                         help='one fault model followed by its parameters\n' +
-                             'The possible models are :\n' + "\n".join([s.docs for s in enabled_fault_models]) +
+                             'The possible models are :\n' + "\n".join([s.docs for s in ENABLED_FAULT_MODELS]) +
                              '\naddr can be a number or a range (number-number)')
     args = parser.parse_args(argv)
+    stats = Stats(enabled=args.stats is not None)
+    stats.add('parse_args', time.perf_counter() - wall, time.process_time() - cpu)
+    try:
+        run(args, names_fault_models, stats)
+    finally:
+        if args.stats is not None:
+            stats.write(os.path.expanduser(args.stats) if args.stats != '-' else None)
+
+
+def run(args, names_fault_models, stats):
+    """Inject the faults asked on the command line.
+
+    :param args: the parsed arguments
+    :param names_fault_models: dict mapping the model names to their class
+    :param stats: the Stats of the phases
+    """
     check_or_fail(args.wordsize is None or args.wordsize > 0, "Word size must be positive")
+    check_or_fail(args.jobs >= 0, "Number of jobs must be positive")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
 
     # General configuration
-    config = ExecConfig(os.path.expanduser(args.infile), os.path.expanduser(args.outfile), args.arch, args.wordsize)
+    config = ExecConfig(os.path.expanduser(args.infile), os.path.expanduser(args.outfile), args.arch, args.wordsize,
+                        virtual=args.vaddr, stats=stats)
+    check_or_fail(not args.vaddr or config.sections is not None,
+                  "Virtual addresses require an ELF or PE input file")
 
-    # Fault models asked
-    if args.fromfile is not None:
-        with open(args.fromfile, 'r') as ff:
-            args.fault_models.extend(ff.read().split())
-    check_or_fail(len(args.fault_models) >= 1, "No fault models provided")
-    fm_list = []
-    indices = [i for i, x in enumerate(args.fault_models) if names_fault_models.get(x) is not None]
-    indices.append(len(args.fault_models))
+    # Campaign : one mutant per line of the campaign file, per fault enumerated or per fault drawn
+    check_or_fail(args.sample is not None or args.margin is None, "A margin requires sampling the faults")
+    if args.campaign is not None or args.enumerate is not None or args.random is not None or args.sample is not None:
+        check_or_fail(args.campaign is None or args.enumerate is None, "Cannot enumerate faults for a campaign file")
+        check_or_fail(args.random is None or (args.campaign is None and args.enumerate is None),
+                      "Cannot draw random faults for a campaign file or an enumeration")
+        check_or_fail(args.sample is None or (args.campaign is None and args.enumerate is None and
+                                              args.random is None),
+                      "Cannot sample faults for a campaign file, an enumeration or random faults")
+        check_or_fail(len(args.fault_models) == 0 and args.fromfile is None,
+                      "Fault models must be given in the campaign file")
+        check_or_fail(not args.graphical, "Graphical mode is not available for a campaign")
+        check_or_fail(args.report is None, "Reports are not available for a campaign (see report.py)")
+        shard, nb_shards = (0, 1) if args.shard is None else parse_shard(args.shard)
+        sampler = None
+        if args.sample is not None:
+            check_or_fail(args.shard is None, "Shards are not available when sampling")
+            check_or_fail(not args.resume, "Resuming is not available when sampling")
+            check_or_fail(args.count > 0, "Number of faults must be positive")
+            check_or_fail(args.seed >= 0, "Seed must be positive")
+            check_or_fail(args.margin is None or args.execute, "A margin requires executing the mutants")
+            check_or_fail(args.margin is None or 0 < args.margin < 0.5, "Margin must be between 0 and 0.5")
+            check_or_fail(0 < args.confidence < 1, "Confidence level must be between 0 and 1")
+            space = fault_space(config, args.sample[0], args.sample[1])
+            sampler = Sampler(space, strata(config, space, args.strata), args.seed, args.count, args.margin,
+                              args.confidence)
+            campaign = sampler.items()
+        elif args.random is not None:
+            check_or_fail(args.random[0] in RANDOM_MODELS, "Fault model cannot be drawn at random : " + args.random[0])
+            check_or_fail(args.count > 0, "Number of faults must be positive")
+            check_or_fail(args.seed >= 0, "Seed must be positive")
+            region = parse_region(config, args.random[1])
+            if args.delta and not args.execute and not args.dedup:
+                # The bits of a whole batch of mutants are flipped at once, without fault model objects
+                deltas = random_deltas(config, args.random[0], region, args.count, args.bits, args.seed)
+                with stats.phase('campaign'):
+                    with DeltaWriter(config.outfile, config.image) as writer:
+                        for n, chunks in itertools.islice(deltas, shard, None, nb_shards):
+                            writer.write(n, chunks)
+                return
+            campaign = itertools.islice(random_campaign(config, args.random[0], region, args.count, args.bits,
+                                                        args.seed), shard, None, nb_shards)
+        elif args.enumerate is not None:
+            campaign = fault_space(config, args.enumerate[0], args.enumerate[1]).items(shard, nb_shards)
+        else:
+            path = os.path.expanduser(args.campaign)
+            if is_structured(path):
+                campaign = itertools.islice(read_mutants(path, names_fault_models), shard, None, nb_shards)
+            else:
+                campaign = itertools.islice(read_campaign(path), shard, None, nb_shards)
+        if args.execute:
+            check_or_fail(not args.delta, "Mutants executed are not written in a delta file")
+            check_or_fail(args.timeout is None or args.timeout > 0, "Timeout must be positive")
+            stdin = None
+            if args.stdin is not None:
+                with open(os.path.expanduser(args.stdin), 'rb') as f:
+                    stdin = f.read()
+            store = None
+            if args.db is not None:
+                store = ResultStore(os.path.expanduser(args.db), config.image)
+            check_or_fail(not args.resume or store is not None, "Resuming requires a results database")
+            try:
+                if args.resume:
+                    completed = store.completed()
+                    keep_results(config.outfile, completed)
+                    campaign = (c for c in campaign if c[0] not in completed)
+                with stats.phase('campaign'):
+                    execute_campaign(config, campaign, names_fault_models, shlex.split(args.args), args.timeout,
+                                     stdin, args.jobs, store, args.resume, args.dedup,
+                                     sampler.record if sampler is not None else None)
+            finally:
+                if store is not None:
+                    store.close()
+        else:
+            check_or_fail(args.db is None and not args.resume, "A results database requires executing the mutants")
+            with stats.phase('campaign'):
+                run_campaign(config, campaign, names_fault_models, args.jobs, args.delta, dedup=args.dedup)
+        if sampler is not None:
+            sys.stderr.write("\n".join(sampler.summary()) + "\n")
+        return
+    check_or_fail(not args.execute, "Execution is only available for a campaign")
+    check_or_fail(args.db is None and not args.resume, "A results database requires executing the mutants")
+    check_or_fail(args.jobs == 1, "Several jobs are only available for a campaign")
+    check_or_fail(not args.dedup, "Identical mutants can only be skipped in a campaign")
+    check_or_fail(args.shard is None, "Shards are only available for a campaign")
+    check_or_fail(not (args.graphical and args.delta), "Graphical mode is not available with a delta output")
+    check_or_fail(args.report is None or not args.delta, "Reports are not available with a delta output")
+    check_or_fail(args.context >= 0, "Number of context rows must be positive")
 
-    for i in range(len(indices) - 1):
-        n = indices[i]
-        fm_name = args.fault_models[n]
-        fm_type = names_fault_models.get(fm_name)
-        if fm_type is not None:
-            check_or_fail(indices[i + 1] - n - 1 == fm_type.nb_args, "Wrong number of parameters for " + fm_name)
-            ar = []
-            for j in range(fm_type.nb_args):
-                ar.append(args.fault_models[n + 1 + j])
-            fm_list.append(fm_type(config, ar))
+    # Fault models asked
+    with stats.phase('construct'):
+        if args.fromfile is not None and is_structured(args.fromfile):
+            fm_list = []
+            if len(args.fault_models) > 0:
+                fm_list = parse_fault_models(config, args.fault_models, names_fault_models)
+            fm_list.extend(read_fault_models(config, os.path.expanduser(args.fromfile), names_fault_models))
+            check_or_fail(len(fm_list) >= 1, "No fault models provided")
+        else:
+            if args.fromfile is not None:
+                with open(args.fromfile, 'r') as ff:
+                    args.fault_models.extend(ff.read().split())
+            fm_list = parse_fault_models(config, args.fault_models, names_fault_models)
+    with stats.phase('check'):
+        check_fault_models(fm_list, config.file_size, config.sections, stats)
 
-    # Check that the faults do not overlap and do not write outside the end of the file
-    mem = {}
-    max_bits = os.stat(config.infile).st_size * 8
-    for f in fm_list:
-        for m in f.edited_file_locations():
-            check_or_fail(0 <= m < max_bits, "Address outside file content : byte " + hex(m // 8))
-            check_or_fail(mem.get(m) is None, "Applying two fault models at the same place : byte " + hex(m // 8))
-            mem[m] = f.name
+    # Write the patch of the single mutant, numbered 0
+    if args.delta:
+        with stats.phase('delta'):
+            edits = mutant_delta(config.image, fm_list)
+            with DeltaWriter(config.outfile, config.image) as writer:
+                writer.write(0, edits)
+        stats.count('bytes_patched', sum(len(data) for _, data in edits))
+        return
 
     # Duplicate the input and then apply the faults
-    shutil.copy(config.infile, config.outfile)
-    with open(config.outfile, "r+b") as file:
-        for f in fm_list:
-            f.apply(file)
+    with stats.phase('copy'):
+        shutil.copy(config.infile, config.outfile)
+    with stats.phase('apply'):
+        with open(config.outfile, "r+b") as file:
+            with mmap.mmap(file.fileno(), 0) as buffer:
+                edits = apply_faults(buffer, fm_list)
+    stats.count('bytes_patched', sum(len(data) for _, data in edits))
 
-    # Open a window for comparing the Input/Output with the faults highlighted
+    # Compare the Input/Output with the faults highlighted, in a report or in a window
+    colors = {'FLP': 'turquoise', 'Z1B': 'green', 'Z1W': 'green2', 'NOP': 'red', 'JMP': 'orange', 'JCC': 'tomato',
+              'XOR': 'purple', 'MBF': 'magenta', 'BST': 'blue'}
+    if args.report is not None:
+        report = os.path.expanduser(args.report)
+        with stats.phase('report'):
+            write_report(config.infile, config.outfile, fm_list, colors, report, args.context,
+                         report.endswith('.html'))
     if args.graphical:
-        colors = {'FLP': 'turquoise', 'Z1B': 'green', 'Z1W': 'green2', 'NOP': 'red', 'JMP': 'orange', 'JCC': 'tomato'}
         import diff_ui
-        diff_ui.diff_ui(config.infile, config.outfile, fm_list, colors)
+        with stats.phase('ui'):
+            diff_ui.diff_ui(config.infile, config.outfile, fm_list, colors)
 
 
 if __name__ == '__main__':
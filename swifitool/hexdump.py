@@ -0,0 +1,77 @@
+import bisect
+import itertools
+
+BYTES_PER_ROW = 16
+
+
+def hex_rows(content, first_row, nb_rows):
+    """Format some rows of a content as hex numbers (16 per row).
+
+    :param content: the content (bytes, bytearray or mmap)
+    :param first_row: number of the first row
+    :param nb_rows: maximum number of rows
+    :return: a list of strings, one per row
+    """
+    start = first_row * BYTES_PER_ROW
+    chunk = content[start:start + nb_rows * BYTES_PER_ROW]
+    digits = bytes(chunk).hex().upper()
+    return [" ".join(digits[i:i + 2] for i in range(row, min(row + 2 * BYTES_PER_ROW, len(digits)), 2))
+            for row in range(0, len(digits), 2 * BYTES_PER_ROW)]
+
+
+class Highlights:
+    """The byte ranges edited by the faults, contiguous ranges of the same model being coalesced, sorted by offset and
+    searched by bisection. Ranges of different models can overlap when they edit different bits of the same bytes
+    (e.g. an XOR mask over a FLP).
+    """
+
+    def __init__(self, fm_list):
+        super().__init__()
+        by_model = {}
+        for f in fm_list:
+            by_model.setdefault(f.name, []).extend((loc.start, loc.stop) for loc in f.edited_file_locations())
+        spans = []
+        for name, ranges in by_model.items():
+            ranges.sort()
+            merged = []
+            for start, stop in ranges:
+                if len(merged) > 0 and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], stop)
+                else:
+                    merged.append([start, stop])
+            spans.extend((start, stop, name) for start, stop in merged)
+        self.spans = sorted(spans)
+        self._starts = [s[0] for s in self.spans]
+        self._reach = list(itertools.accumulate((s[1] for s in self.spans), max))  # furthest stop up to each range
+
+    def __len__(self):
+        return len(self.spans)
+
+    def between(self, first, last):
+        """Find the ranges overlapping some bytes.
+
+        :param first: first offset
+        :param last: offset after the last one
+        :return: a list of (start offset, stop offset, tag)
+        """
+        # The ranges before the first one reaching beyond first all stop before it, the ones after are filtered
+        return [s for s in self.spans[bisect.bisect_right(self._reach, first):bisect.bisect_left(self._starts, last)]
+                if s[1] > first]
+
+    def next(self, offset):
+        """Find the first range starting after an offset.
+
+        :param offset: the offset
+        :return: the start offset of the range or None
+        """
+        i = bisect.bisect_right(self._starts, offset)
+        return self._starts[i] if i < len(self._starts) else None
+
+    def previous(self, offset):
+        """Find the last range starting before an offset.
+
+        :param offset: the offset
+        :return: the start offset of the range or None
+        """
+        i = bisect.bisect_left(self._starts, offset)
+        return self._starts[i - 1] if i > 0 else None
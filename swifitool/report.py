@@ -0,0 +1,205 @@
+import argparse
+import heapq
+import html
+import os
+import sys
+
+from hexdump import BYTES_PER_ROW, Highlights
+from utils import check_or_fail, command_line, map_file
+
+CHUNK_SIZE = 1 << 20
+CHANGED_COLOR = 'gold'  # bytes changed outside the ranges of the fault models
+
+
+def changed_rows(content_in, content_out, chunk_size=CHUNK_SIZE):
+    """Find the rows that differ between two contents, comparing them by chunks : identical chunks are skipped at
+    once and the others are split in halves until the rows that differ are found.
+
+    :param content_in: the first content (bytes or mmap)
+    :param content_out: the second content
+    :param chunk_size: number of bytes compared at once, a multiple of the row size
+    :return: a generator of row numbers, in increasing order
+    """
+    size = max(len(content_in), len(content_out))
+
+    def search(start, stop):
+        if content_in[start:stop] == content_out[start:stop]:
+            return
+        if stop - start <= BYTES_PER_ROW:
+            yield start // BYTES_PER_ROW
+            return
+        middle = start + max((stop - start) // 2 // BYTES_PER_ROW, 1) * BYTES_PER_ROW
+        yield from search(start, middle)
+        yield from search(middle, stop)
+
+    for start in range(0, size, chunk_size):
+        yield from search(start, min(start + chunk_size, size))
+
+
+def fault_rows(highlights):
+    """Rows containing the ranges edited by the faults.
+
+    :param highlights: the Highlights of the faults
+    :return: a generator of row numbers, in increasing order
+    """
+    for start, stop, _ in highlights.spans:
+        yield from range(start // BYTES_PER_ROW, (stop - 1) // BYTES_PER_ROW + 1)
+
+
+def hunks(rows, context, nb_rows):
+    """Group the rows to display with their context, the overlapping groups being merged.
+
+    :param rows: iterable of row numbers in increasing order (duplicates allowed)
+    :param context: number of rows displayed before and after each row
+    :param nb_rows: total number of rows
+    :return: a generator of (first row, row after the last one)
+    """
+    current = None
+    for row in rows:
+        first, stop = max(row - context, 0), min(row + context + 1, nb_rows)
+        if current is not None and first <= current[1]:
+            current[1] = max(current[1], stop)
+        else:
+            if current is not None:
+                yield tuple(current)
+            current = [first, stop]
+    if current is not None:
+        yield tuple(current)
+
+
+def byte_tags(highlights, row, content_in, content_out):
+    """Tag of each byte of a row : the model editing it, CHANGED_COLOR if it differs without a model, None otherwise.
+
+    :param highlights: the Highlights of the faults
+    :param row: the row number
+    :param content_in: the input content
+    :param content_out: the output content
+    :return: a list of BYTES_PER_ROW tags
+    """
+    first = row * BYTES_PER_ROW
+    data_in = content_in[first:first + BYTES_PER_ROW]
+    data_out = content_out[first:first + BYTES_PER_ROW]
+    tags = [None if i >= min(len(data_in), len(data_out)) or data_in[i] == data_out[i] else CHANGED_COLOR
+            for i in range(BYTES_PER_ROW)]
+    if len(data_in) != len(data_out):
+        tags[min(len(data_in), len(data_out)):max(len(data_in), len(data_out))] = \
+            [CHANGED_COLOR] * abs(len(data_in) - len(data_out))
+    for start, stop, name in highlights.between(first, first + BYTES_PER_ROW):
+        for i in range(max(start, first), min(stop, first + BYTES_PER_ROW)):
+            tags[i - first] = name
+    return tags
+
+
+def hex_cells(content, row):
+    """Hex numbers of a row, blanks after the end of the content."""
+    first = row * BYTES_PER_ROW
+    data = content[first:first + BYTES_PER_ROW]
+    return ["{:02X}".format(b) for b in data] + ['  '] * (BYTES_PER_ROW - len(data))
+
+
+class TextReport:
+    """Side by side comparison as plain text, the bytes changed being marked on the line below."""
+
+    def __init__(self, file):
+        super().__init__()
+        self.file = file
+
+    def hunk(self, first_hunk):
+        if not first_hunk:
+            self.file.write("...\n")
+
+    def row(self, row, cells_in, cells_out, tags):
+        names = sorted(set(t for t in tags if t is not None and t != CHANGED_COLOR))
+        self.file.write(("0x{:08X}  ".format(row * BYTES_PER_ROW) + " ".join(cells_in) + "   " + " ".join(cells_out) +
+                         "   " + ", ".join(names)).rstrip() + "\n")
+        if any(t is not None for t in tags):
+            marks = " ".join("^^" if t is not None else "  " for t in tags)
+            self.file.write((" " * 12 + marks + "   " + marks).rstrip() + "\n")
+
+    def close(self):
+        pass
+
+
+class HTMLReport:
+    """Side by side comparison as an HTML page, the bytes highlighted with the colors of their fault model."""
+
+    def __init__(self, file, colors):
+        super().__init__()
+        self.file = file
+        self.colors = colors
+        file.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>SWIFI Tool</title>\n" +
+                   "<style>table { font-family: monospace; white-space: pre; border-collapse: collapse; }\n" +
+                   "td { padding: 0 1em; } span { color: white; }</style></head><body>\n<p>")
+        for name, color in list(colors.items()) + [('changed', CHANGED_COLOR)]:
+            file.write("<span style=\"background: " + color + "\">" + html.escape(name) + "</span> ")
+        file.write("</p>\n<table>\n<tr><th>Byte offset</th><th>Input file</th><th>Output file</th></tr>\n")
+
+    def hunk(self, first_hunk):
+        if not first_hunk:
+            self.file.write("<tr><td>...</td><td></td><td></td></tr>\n")
+
+    def cells(self, cells, tags):
+        res = []
+        for cell, tag in zip(cells, tags):
+            color = self.colors.get(tag, CHANGED_COLOR) if tag is not None else None
+            res.append(cell if color is None else "<span style=\"background: " + color + "\">" + cell + "</span>")
+        return " ".join(res)
+
+    def row(self, row, cells_in, cells_out, tags):
+        self.file.write("<tr><td>0x{:08X}</td><td>".format(row * BYTES_PER_ROW) + self.cells(cells_in, tags) +
+                        "</td><td>" + self.cells(cells_out, tags) + "</td></tr>\n")
+
+    def close(self):
+        self.file.write("</table>\n</body></html>\n")
+
+
+def write_report(infile, outfile, fm_list, colors, report, context=3, as_html=False):
+    """Write a side by side comparison of the regions changed between the input and the output file, streamed from
+    the files mapped in memory : only the rows changed or edited by the faults are displayed, with their context.
+
+    :param infile: path of the input file
+    :param outfile: path of the output file
+    :param fm_list: list of fault models objects applied
+    :param colors: color of each fault model, used by the HTML report
+    :param report: path of the report
+    :param context: number of rows displayed before and after each row changed
+    :param as_html: write an HTML page instead of plain text
+    """
+    content_in = map_file(infile)
+    content_out = map_file(outfile)
+    highlights = Highlights(fm_list)
+    nb_rows = (max(len(content_in), len(content_out)) + BYTES_PER_ROW - 1) // BYTES_PER_ROW
+    rows = heapq.merge(changed_rows(content_in, content_out), fault_rows(highlights))
+    with open(report, 'w') as f:
+        writer = HTMLReport(f, colors) if as_html else TextReport(f)
+        first_hunk = True
+        for first, stop in hunks(rows, context, nb_rows):
+            writer.hunk(first_hunk)
+            first_hunk = False
+            for row in range(first, stop):
+                writer.row(row, hex_cells(content_in, row), hex_cells(content_out, row),
+                           byte_tags(highlights, row, content_in, content_out))
+        writer.close()
+
+
+@command_line
+def main(argv):
+    # Collect parameters
+    parser = argparse.ArgumentParser(description='Write a report comparing a file and one of its mutants',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-i', '--infile', type=str, metavar='INFILE', required=True, help='path to the source file')
+    parser.add_argument('-m', '--mutant', type=str, metavar='MUTANT', required=True, help='path to the mutant')
+    parser.add_argument('-o', '--report', type=str, metavar='REPORT', required=True,
+                        help='path to the report, an HTML page if it ends with .html, plain text otherwise')
+    parser.add_argument('-C', '--context', type=int, metavar='ROWS', required=False, default=3,
+                        help='number of rows displayed around each row changed (default : 3)')
+    args = parser.parse_args(argv)
+    check_or_fail(args.context >= 0, "Number of context rows must be positive")
+
+    report = os.path.expanduser(args.report)
+    write_report(os.path.expanduser(args.infile), os.path.expanduser(args.mutant), [], {}, report, args.context,
+                 report.endswith('.html'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,138 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+
+from utils import check_or_fail, command_line, parse_addr
+
+# One row per mutant executed and one row per fault model applied in it, the faults being located by file offsets
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS input (digest TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS mutants (
+    number INTEGER PRIMARY KEY,
+    faults TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    returncode INTEGER,
+    wall_time REAL NOT NULL,
+    stdout TEXT NOT NULL,
+    stderr TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS faults (
+    number INTEGER NOT NULL REFERENCES mutants(number),
+    model TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mutants_outcome ON mutants(outcome);
+CREATE INDEX IF NOT EXISTS faults_number ON faults(number);
+CREATE INDEX IF NOT EXISTS faults_model ON faults(model);
+CREATE INDEX IF NOT EXISTS faults_start ON faults(start);
+"""
+
+
+class ResultStore:
+    """Outcomes of the mutants of a campaign recorded in an SQLite database, written by batches in transactions."""
+
+    def __init__(self, path, image, batch_size=1000):
+        super().__init__()
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.mutants = []
+        self.faults = []
+        digest = hashlib.sha256(image).hexdigest()
+        row = self.connection.execute("SELECT digest FROM input").fetchone()
+        if row is None:
+            with self.connection:
+                self.connection.execute("INSERT INTO input VALUES (?)", (digest,))
+        else:
+            check_or_fail(row[0] == digest, "The results database was made from another input file")
+
+    def completed(self):
+        """Numbers of the mutants already recorded.
+
+        :return: a set of numbers
+        """
+        return set(row[0] for row in self.connection.execute("SELECT number FROM mutants"))
+
+    def add(self, n, tokens, fm_list, digest, result, outcome):
+        """Record the outcome of one mutant, written with the next batch.
+
+        :param n: the number of the mutant
+        :param tokens: the fault models of the mutant as given in the campaign
+        :param fm_list: list of fault model objects
+        :param digest: the hash of the effective patch of the mutant (see utils.patch_digest)
+        :param result: the RunResult of the mutant
+        :param outcome: one of executor.OUTCOMES
+        """
+        self.mutants.append((n, " ".join(tokens), digest, outcome, result.returncode, result.wall_time,
+                             result.stdout_digest, result.stderr_digest))
+        self.faults.extend((n, f.name, f.addr.start, f.addr.stop) for f in fm_list)
+        if len(self.mutants) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the pending records in one transaction."""
+        with self.connection:
+            # A mutant executed again replaces its previous record
+            self.connection.executemany("DELETE FROM faults WHERE number = ?", [(m[0],) for m in self.mutants])
+            self.connection.executemany("INSERT OR REPLACE INTO mutants VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.mutants)
+            self.connection.executemany("INSERT INTO faults VALUES (?, ?, ?, ?)", self.faults)
+        self.mutants = []
+        self.faults = []
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@command_line
+def main(argv):
+    # Collect parameters
+    parser = argparse.ArgumentParser(description='Query the results database written by faults_inject.py',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('database', type=str, metavar='DATABASE', help='path to the results database')
+    parser.add_argument('-m', '--model', type=str, metavar='MODEL', required=False,
+                        help='only the mutants containing a fault of this model')
+    parser.add_argument('-r', '--range', type=str, metavar='RANGE', required=False,
+                        help='only the mutants containing a fault starting in this range of file offsets\n' +
+                             '(number or number-number)')
+    parser.add_argument('--outcome', type=str, metavar='OUTCOME', required=False,
+                        help='only the mutants with this outcome')
+    args = parser.parse_args(argv)
+
+    conditions = []
+    parameters = []
+    if args.model is not None:
+        conditions.append("number IN (SELECT number FROM faults WHERE model = ?)")
+        parameters.append(args.model)
+    if args.range is not None:
+        loc = parse_addr(args.range)
+        conditions.append("number IN (SELECT number FROM faults WHERE start >= ? AND start < ?)")
+        parameters.extend([loc.start, loc.stop])
+    if args.outcome is not None:
+        conditions.append("outcome = ?")
+        parameters.append(args.outcome)
+    query = "SELECT number, outcome, returncode, wall_time, stdout, stderr, faults FROM mutants" + \
+            ("" if len(conditions) == 0 else " WHERE " + " AND ".join(conditions)) + " ORDER BY number"
+
+    check_or_fail(os.path.isfile(args.database), "No results database : " + args.database)
+    connection = sqlite3.connect(args.database)
+    try:
+        for n, outcome, returncode, wall_time, stdout, stderr, faults in connection.execute(query, parameters):
+            sys.stdout.write("\t".join([str(n), outcome, str(returncode), "{:.6f}".format(wall_time), stdout, stderr,
+                                        faults]) + "\n")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,206 @@
+import math
+import random
+
+from executor import OUTCOMES
+from sections import load_functions
+from utils import check_or_fail
+
+STRATA = ['none', 'section', 'function']
+
+
+class Stratum:
+    """The faults of a fault space located in one part of the region (a section, a function or the rest of it),
+    as ranges of indices in the space."""
+
+    def __init__(self, name, ranges):
+        super().__init__()
+        self.name = name
+        self.ranges = ranges  # list of (first index, index after the last one)
+        self.size = sum(stop - start for start, stop in ranges)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, k):
+        """Returns the index in the fault space of the k-th fault of the stratum."""
+        for start, stop in self.ranges:
+            if k < stop - start:
+                return start + k
+            k -= stop - start
+        raise IndexError("Stratum index out of range")
+
+
+def _fault_address(space, i):
+    return int(space[i][1].split('-')[0], 0)
+
+
+def _first_fault(space, address):
+    """Index of the first fault of the space at or after an address, the faults being sorted by address."""
+    low, high = 0, len(space)
+    while low < high:
+        middle = (low + high) // 2
+        if _fault_address(space, middle) < address:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def strata(config, space, by='section'):
+    """Split a fault space in strata : one per section or per function of the input file met in the region, the
+    faults outside of them forming the stratum 'other'.
+
+    :param config: the execution configuration
+    :param space: the fault space
+    :param by: 'section', 'function' or 'none' (a single stratum)
+    :return: a list of strata, without the empty ones
+    """
+    parts = []
+    if by == 'section' and config.sections is not None:
+        parts = config.sections.by_offset
+    elif by == 'function':
+        parts = load_functions(config.image, config.sections) if config.sections is not None else []
+        check_or_fail(len(parts) > 0, "No functions in the symbol table of the input file")
+    bounds = sorted((p.vaddr if config.virtual else p.offset, p.size, p.name) for p in parts)
+
+    res = []
+    others = []
+    previous = 0
+    for start, size, name in bounds:
+        first = max(_first_fault(space, start), previous)
+        stop = max(_first_fault(space, start + size), first)
+        if first > previous:
+            others.append((previous, first))
+        if stop > first:
+            res.append(Stratum(name, [(first, stop)]))
+        previous = stop
+    if previous < len(space):
+        others.append((previous, len(space)))
+    if len(others) > 0:
+        res.append(Stratum('other' if len(res) > 0 else 'region', others))
+    return res
+
+
+class _Draws:
+    """Indices drawn at random without replacement, without listing them while less than half are drawn."""
+
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.drawn = set()
+        self.rest = None
+
+    def __len__(self):
+        return self.size - len(self.drawn) if self.rest is None else len(self.rest)
+
+    def next(self):
+        if self.rest is None and 2 * len(self.drawn) < self.size:
+            while True:
+                k = self.rng.randrange(self.size)
+                if k not in self.drawn:
+                    self.drawn.add(k)
+                    return k
+        if self.rest is None:
+            self.rest = [k for k in range(self.size) if k not in self.drawn]
+            self.rng.shuffle(self.rest)
+        return self.rest.pop()
+
+
+def normal_quantile(confidence):
+    """The z such that a standard normal variable is in [-z, z] with the given probability."""
+    low, high = 0.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if math.erf(middle / math.sqrt(2)) < confidence:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def wilson_interval(successes, n, z):
+    """Wilson score interval of a proportion.
+
+    :param successes: number of successes
+    :param n: number of trials
+    :param z: quantile of the standard normal distribution for the confidence level
+    :return: (low, high)
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half = z / denominator * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+class Sampler:
+    """Faults drawn at random without replacement from the strata of a fault space, reproducibly from a seed.
+    The allocation is proportional to the size of the strata, so the proportion of each outcome in the sample is
+    the stratified estimate of its rate. The sampling stops after count faults or, when a margin is given, as soon
+    as the Wilson interval of the rate of every outcome is narrower than twice the margin.
+    """
+
+    def __init__(self, space, strata_list, seed=0, count=1000, margin=None, confidence=0.95):
+        super().__init__()
+        self.space = space
+        self.strata = strata_list
+        self.count = count
+        self.margin = margin
+        self.z = normal_quantile(confidence)
+        self.total = sum(len(s) for s in strata_list)
+        rng = random.Random(seed)
+        self.draws = [_Draws(len(s), rng) for s in strata_list]
+        self.drawn = [0] * len(strata_list)
+        self.outcomes = dict([(o, 0) for o in OUTCOMES])
+        self.nb_outcomes = 0
+
+    def record(self, n, outcome):
+        """Count the outcome of a mutant drawn.
+
+        :param n: the number of the mutant
+        :param outcome: one of executor.OUTCOMES
+        """
+        self.outcomes[outcome] += 1
+        self.nb_outcomes += 1
+
+    def interval(self, outcome):
+        """Wilson interval of the rate of an outcome, from the outcomes recorded."""
+        return wilson_interval(self.outcomes[outcome], self.nb_outcomes, self.z)
+
+    def precise_enough(self):
+        """Check whether the interval of every outcome is narrower than twice the margin."""
+        if self.margin is None or self.nb_outcomes == 0:
+            return False
+        return all(high - low <= 2 * self.margin for low, high in (self.interval(o) for o in OUTCOMES))
+
+    def items(self):
+        """Draw the faults.
+
+        :return: a generator of (number of the fault in the space starting at 1, list of tokens)
+        """
+        nb_drawn = 0
+        while nb_drawn < min(self.count, self.total) and not self.precise_enough():
+            # The stratum the most behind its share of the sample
+            h = max((h for h in range(len(self.strata)) if len(self.draws[h]) > 0),
+                    key=lambda h: len(self.strata[h]) * (nb_drawn + 1) / self.total - self.drawn[h])
+            i = self.strata[h][self.draws[h].next()]
+            self.drawn[h] += 1
+            nb_drawn += 1
+            yield i + 1, self.space[i]
+
+    def summary(self):
+        """Describe the sample and, if outcomes were recorded, the estimated rate of each outcome.
+
+        :return: a list of lines
+        """
+        lines = ["Faults sampled : " + str(sum(self.drawn)) + " of " + str(self.total) + " in " +
+                 str(len(self.strata)) + " strata (" +
+                 ", ".join(s.name + " : " + str(d) for s, d in zip(self.strata, self.drawn)) + ")"]
+        if self.nb_outcomes > 0:
+            for o in OUTCOMES:
+                low, high = self.interval(o)
+                lines.append("Rate of " + o + " : {:.4f} ({:.4f}-{:.4f})".format(
+                    self.outcomes[o] / self.nb_outcomes, low, high))
+        return lines
@@ -0,0 +1,191 @@
+import argparse
+import os
+import sys
+
+from config import ExecConfig
+from utils import check_or_fail, command_line, numpy_module
+
+NUMPY_REQUIRED = "Scanning the branches requires numpy"
+
+
+class BranchSites:
+    """Candidate branch instructions found in a region, as parallel arrays : the address given to the JMP or JCC
+    model, the length of the instruction, its current target, whether it is conditional (JCC) or not (JMP), the
+    origin of its displacement (the target being origin + displacement) and the number of bits of its displacement.
+    The addresses are file offsets.
+    """
+
+    def __init__(self, offsets, lengths, targets, conditional, origins, bits):
+        super().__init__()
+        self.offsets = offsets
+        self.lengths = lengths
+        self.targets = targets
+        self.conditional = conditional
+        self.origins = origins
+        self.bits = bits
+
+    def in_range(self, targets):
+        """Check for each site whether a new target can be encoded in its displacement.
+
+        :param targets: array of the new targets, one per site
+        :return: array of booleans
+        """
+        displacements = targets - self.origins
+        limits = 1 << (self.bits - 1)
+        return (-limits <= displacements) & (displacements < limits)
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+def _signed(np, values, bits):
+    """Interpret unsigned integers as two's complement integers of the given number of bits."""
+    values = values.astype(np.int64)
+    return values - ((values >> (bits - 1)) & 1) * (1 << bits)
+
+
+def _read_le(np, view, positions, size):
+    """Gather the little endian unsigned integers of size bytes starting at each of the positions of the view."""
+    value = np.zeros(len(positions), dtype=np.int64)
+    for i in range(size):
+        value |= view[positions + i].astype(np.int64) << (8 * i)
+    return value
+
+
+def scan_x86(image, region):
+    """Find every byte sequence of a region decoded as a relative branch by the JMP and JCC models, all the offsets
+    being tested at once (the code is not disassembled : any matching sequence is a candidate).
+
+    :param image: the content of the file
+    :param region: location of the region, in file offsets
+    :return: the branch sites whose instruction is entirely in the region
+    """
+    np = numpy_module(NUMPY_REQUIRED)
+    # One byte before the region is read for the operand size prefix 0x66
+    base = max(region.start - 1, 0)
+    stop = min(region.stop, len(image))
+    view = np.frombuffer(image, dtype=np.uint8, count=max(stop - base, 0), offset=base)
+    first = region.start - base
+    opcodes = view[first:]
+    following = np.zeros(len(opcodes), dtype=np.uint8)
+    following[:-1] = opcodes[1:]
+    prefixed = np.zeros(len(opcodes), dtype=bool)
+    if first > 0:
+        prefixed[0] = view[0] == 0x66
+    prefixed[1:] = opcodes[:-1] == 0x66
+
+    offsets, lengths, targets, conditional, bits = [], [], [], [], []
+
+    def add(mask, start, length, operand, size, jcc):
+        # start : position of the site relative to the opcode, operand : position of the displacement
+        sites = np.flatnonzero(mask).astype(np.int64) + first + start
+        valid = (sites >= first) & (sites + length <= len(view))
+        sites = sites[valid]
+        displacement = _signed(np, _read_le(np, view, sites + operand, size), 8 * size)
+        offsets.append(sites + base)
+        lengths.append(np.full(len(sites), length, dtype=np.int64))
+        targets.append(sites + base + length + displacement)
+        conditional.append(np.full(len(sites), jcc, dtype=bool))
+        bits.append(np.full(len(sites), 8 * size, dtype=np.int64))
+
+    add(opcodes == 0xEB, 0, 2, 1, 1, False)  # JMP rel8
+    add((opcodes == 0xE9) & ~prefixed, 0, 5, 1, 4, False)  # JMP rel32
+    add((opcodes == 0xE9) & prefixed, -1, 4, 2, 2, False)  # JMP rel16 (66 E9)
+    add(((opcodes & 0xF0) == 0x70) | (opcodes == 0xE3), 0, 2, 1, 1, True)  # Jcc rel8 and JCXZ
+    near = (opcodes == 0x0F) & ((following & 0xF0) == 0x80)
+    add(near & ~prefixed, 0, 6, 2, 4, True)  # Jcc rel32 (0F 8x)
+    add(near & prefixed, -1, 5, 3, 2, True)  # Jcc rel16 (66 0F 8x)
+
+    offsets = np.concatenate(offsets)
+    order = np.argsort(offsets, kind='stable')
+    lengths = np.concatenate(lengths)[order]
+    return BranchSites(offsets[order], lengths, np.concatenate(targets)[order], np.concatenate(conditional)[order],
+                       offsets[order] + lengths, np.concatenate(bits)[order])
+
+
+def scan_arm(image, region):
+    """Find every word of a region decoded as a B or BL instruction by the JMP and JCC models, the aligned region
+    being viewed as an array of little endian 32-bit words classified at once.
+
+    :param image: the content of the file
+    :param region: location of the region, in file offsets (the words are aligned on 4 bytes)
+    :return: the branch sites whose instruction is entirely in the region
+    """
+    np = numpy_module(NUMPY_REQUIRED)
+    start = (region.start + 3) // 4 * 4
+    count = max((min(region.stop, len(image)) - start) // 4, 0)
+    words = np.frombuffer(image, dtype='<u4', count=count, offset=start) if count > 0 else np.zeros(0, dtype='<u4')
+    top = words >> 24
+    unconditional = (top == 0xEA) | (top == 0xEB)  # B and BL always executed
+    conditional = ((top & 0x0E) == 0x0A) & ((top & 0xF0) != 0xE0)  # B and BL with a condition
+    indices = np.flatnonzero(unconditional | conditional)
+    offsets = indices.astype(np.int64) * 4 + start
+    displacements = _signed(np, words[indices] & 0xFFFFFF, 24) * 4
+    # The displacement is relative to the address of the instruction + 8 (the PC is two instructions ahead)
+    return BranchSites(offsets, np.full(len(indices), 4, dtype=np.int64), offsets + 8 + displacements,
+                       conditional[indices], offsets + 8, np.full(len(indices), 26, dtype=np.int64))
+
+
+def scan_branches(config, region):
+    """Find the candidate branch sites of a region for the architecture of the configuration.
+
+    :param config: the execution configuration
+    :param region: location of the region, in file offsets
+    :return: the branch sites
+    """
+    check_or_fail(config.arch is not None, "Architecture required when scanning the branches")
+    if config.arch == 'arm':
+        return scan_arm(config.image, region)
+    return scan_x86(config.image, region)
+
+
+def fall_through_faults(config, region, models=('JMP', 'JCC')):
+    """Find the faults redirecting each branch of a region to its fall-through (the next instruction), so that
+    the branch is never taken. Branches already targeting their fall-through, or too far from it to be redirected,
+    are omitted.
+
+    :param config: the execution configuration
+    :param region: location of the region, expressed like the parameters of the models (see config.virtual)
+    :param models: names of the models generated (JMP for the unconditional branches, JCC for the conditional ones)
+    :return: (addresses, targets, conditional) arrays sorted by address, expressed like the parameters of the models
+    """
+    file_region = config.file_location(region)
+    shift = region.start - file_region.start  # from file offsets to the addresses of the parameters
+    sites = scan_branches(config, file_region)
+    fall_through = sites.offsets + sites.lengths
+    keep = (sites.targets != fall_through) & sites.in_range(fall_through)
+    if 'JMP' not in models:
+        keep &= sites.conditional
+    if 'JCC' not in models:
+        keep &= ~sites.conditional
+    return sites.offsets[keep] + shift, fall_through[keep] + shift, sites.conditional[keep]
+
+
+@command_line
+def main(argv):
+    # Collect parameters
+    parser = argparse.ArgumentParser(description='Write a campaign redirecting each branch of a region to its ' +
+                                                 'fall-through',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-i', '--infile', type=str, metavar='INFILE', required=True, help='path to the source file')
+    parser.add_argument('-a', '--arch', type=str, metavar='ARCHITECTURE', required=True, choices=['x86', 'arm'],
+                        help='architecture of the executable (x86 or arm)')
+    parser.add_argument('-v', '--vaddr', action='store_true', required=False,
+                        help='the region and the faults are virtual addresses, translated using the ELF or PE headers')
+    parser.add_argument('-m', '--model', type=str, metavar='MODEL', required=False, choices=['JMP', 'JCC'],
+                        help='only generate the faults of this model (JMP or JCC)')
+    parser.add_argument('region', type=str, metavar='REGION', help='a section name or an address range')
+    args = parser.parse_args(argv)
+
+    config = ExecConfig(os.path.expanduser(args.infile), None, args.arch, None, virtual=args.vaddr)
+    check_or_fail(not args.vaddr or config.sections is not None,
+                  "Virtual addresses require an ELF or PE input file")
+    from fault_space import parse_region
+    models = ('JMP', 'JCC') if args.model is None else (args.model,)
+    addresses, targets, conditional = fall_through_faults(config, parse_region(config, args.region), models)
+    for address, target, jcc in zip(addresses.tolist(), targets.tolist(), conditional.tolist()):
+        sys.stdout.write(('JCC ' if jcc else 'JMP ') + hex(address) + " " + hex(target) + "\n")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
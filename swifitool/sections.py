@@ -0,0 +1,222 @@
+import bisect
+import struct
+
+
+class Section:
+    """A part of the file mapped in memory : a section (or a segment) of an ELF file or a section of a PE file."""
+
+    def __init__(self, name, vaddr, offset, size, executable):
+        super().__init__()
+        self.name = name
+        self.vaddr = vaddr
+        self.offset = offset
+        self.size = size
+        self.executable = executable
+
+    def __repr__(self):
+        return "Section(" + self.name + ", vaddr " + hex(self.vaddr) + ", offset " + hex(self.offset) + \
+               ", size " + hex(self.size) + (", executable" if self.executable else "") + ")"
+
+
+class SectionIndex:
+    """The sections of an executable file sorted by virtual address and by file offset, searched by bisection."""
+
+    def __init__(self, sections):
+        super().__init__()
+        self.by_vaddr = sorted(sections, key=lambda s: s.vaddr)
+        self.by_offset = sorted(sections, key=lambda s: s.offset)
+        self._vaddrs = [s.vaddr for s in self.by_vaddr]
+        self._offsets = [s.offset for s in self.by_offset]
+
+    def at_vaddr(self, vaddr):
+        """Find the section containing a virtual address.
+
+        :param vaddr: the virtual address
+        :return: a section or None
+        """
+        i = bisect.bisect_right(self._vaddrs, vaddr) - 1
+        if i >= 0 and vaddr < self.by_vaddr[i].vaddr + self.by_vaddr[i].size:
+            return self.by_vaddr[i]
+        return None
+
+    def at_offset(self, offset):
+        """Find the section containing a file offset.
+
+        :param offset: the file offset
+        :return: a section or None
+        """
+        i = bisect.bisect_right(self._offsets, offset) - 1
+        if i >= 0 and offset < self.by_offset[i].offset + self.by_offset[i].size:
+            return self.by_offset[i]
+        return None
+
+    def get(self, name):
+        """Find a section by its name.
+
+        :param name: the name of the section (e.g. '.text')
+        :return: a section or None
+        """
+        for s in self.by_offset:
+            if s.name == name:
+                return s
+        return None
+
+    def to_offset(self, vaddr):
+        """Translate a virtual address to a file offset.
+
+        :param vaddr: the virtual address
+        :return: the file offset or None if the address is not mapped from the file
+        """
+        s = self.at_vaddr(vaddr)
+        return None if s is None else vaddr - s.vaddr + s.offset
+
+    def is_executable(self, start, stop):
+        """Check whether a range of file offsets lies in an executable section.
+
+        :param start: first offset
+        :param stop: offset after the last one
+        :return: a boolean
+        """
+        s = self.at_offset(start)
+        return s is not None and s.executable and stop <= s.offset + s.size
+
+
+def _parse_elf(image):
+    bits = {1: 32, 2: 64}.get(image[4])
+    endian = {1: '<', 2: '>'}.get(image[5])
+    if bits is None or endian is None:
+        return None
+    if bits == 32:
+        e_phoff, e_shoff = struct.unpack_from(endian + 'II', image, 28)
+        e_phentsize, e_phnum, e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(endian + 'HHHHH', image, 42)
+        sh_format = endian + 'IIIIII'
+    else:
+        e_phoff, e_shoff = struct.unpack_from(endian + 'QQ', image, 32)
+        e_phentsize, e_phnum, e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(endian + 'HHHHH', image, 54)
+        sh_format = endian + 'IIQQQQ'
+
+    sections = []
+    if e_shnum > 0 and e_shoff + e_shnum * e_shentsize <= len(image):
+        headers = [struct.unpack_from(sh_format, image, e_shoff + i * e_shentsize) for i in range(e_shnum)]
+        names_offset = headers[e_shstrndx][4] if e_shstrndx < e_shnum else None
+        for sh_name, sh_type, sh_flags, sh_addr, sh_offset, sh_size in headers:
+            # Only the sections allocated in memory (SHF_ALLOC) and with a content in the file (not SHT_NOBITS)
+            if sh_flags & 0x2 and sh_type != 8 and sh_size > 0:
+                name = ''
+                if names_offset is not None:
+                    end = image.find(b'\x00', names_offset + sh_name)
+                    name = bytes(image[names_offset + sh_name:end]).decode('ascii', 'replace')
+                sections.append(Section(name, sh_addr, sh_offset, sh_size, sh_flags & 0x4 != 0))
+    elif e_phnum > 0:
+        # Stripped of its section headers : use the loadable segments (PT_LOAD)
+        for i in range(e_phnum):
+            if bits == 32:
+                p_type, p_offset, p_vaddr, _, p_filesz, _, p_flags = \
+                    struct.unpack_from(endian + 'IIIIIII', image, e_phoff + i * e_phentsize)
+            else:
+                p_type, p_flags, p_offset, p_vaddr, _, p_filesz = \
+                    struct.unpack_from(endian + 'IIQQQQ', image, e_phoff + i * e_phentsize)
+            if p_type == 1 and p_filesz > 0:
+                sections.append(Section('segment' + str(i), p_vaddr, p_offset, p_filesz, p_flags & 0x1 != 0))
+    return SectionIndex(sections)
+
+
+def _parse_pe(image):
+    e_lfanew = struct.unpack_from('<I', image, 0x3C)[0]
+    if image[e_lfanew:e_lfanew + 4] != b'PE\x00\x00':
+        return None
+    nb_sections, = struct.unpack_from('<H', image, e_lfanew + 6)
+    optional_size, = struct.unpack_from('<H', image, e_lfanew + 20)
+    optional = e_lfanew + 24
+    magic, = struct.unpack_from('<H', image, optional)
+    if magic == 0x10B:
+        image_base, = struct.unpack_from('<I', image, optional + 28)
+    elif magic == 0x20B:
+        image_base, = struct.unpack_from('<Q', image, optional + 24)
+    else:
+        return None
+
+    sections = []
+    for i in range(nb_sections):
+        header = optional + optional_size + 40 * i
+        name = bytes(image[header:header + 8]).rstrip(b'\x00').decode('ascii', 'replace')
+        virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from('<IIII', image, header + 8)
+        characteristics, = struct.unpack_from('<I', image, header + 36)
+        size = min(virtual_size, raw_size) if virtual_size > 0 else raw_size
+        if size > 0:
+            # IMAGE_SCN_CNT_CODE or IMAGE_SCN_MEM_EXECUTE
+            sections.append(Section(name, image_base + virtual_address, raw_pointer, size,
+                                    characteristics & 0x20000020 != 0))
+    return SectionIndex(sections)
+
+
+def _elf_functions(image, index):
+    bits = {1: 32, 2: 64}.get(image[4])
+    endian = {1: '<', 2: '>'}.get(image[5])
+    if bits is None or endian is None or index is None:
+        return []
+    if bits == 32:
+        e_shoff, = struct.unpack_from(endian + 'I', image, 32)
+        e_shentsize, e_shnum = struct.unpack_from(endian + 'HH', image, 46)
+        sh_format, sym_format = endian + 'IIIIIIIIII', endian + 'IIIBBH'
+    else:
+        e_shoff, = struct.unpack_from(endian + 'Q', image, 40)
+        e_shentsize, e_shnum = struct.unpack_from(endian + 'HH', image, 58)
+        sh_format, sym_format = endian + 'IIQQQQIIQQ', endian + 'IBBHQQ'
+    if e_shnum == 0 or e_shoff + e_shnum * e_shentsize > len(image):
+        return []
+    headers = [struct.unpack_from(sh_format, image, e_shoff + i * e_shentsize) for i in range(e_shnum)]
+
+    functions = {}
+    # The static symbol table (SHT_SYMTAB) if present, the dynamic one (SHT_DYNSYM) otherwise
+    tables = [h for h in headers if h[1] == 2] or [h for h in headers if h[1] == 11]
+    for _, _, _, _, sh_offset, sh_size, sh_link, _, _, sh_entsize in tables:
+        strings = headers[sh_link][4] if sh_link < e_shnum else None
+        for entry in range(sh_offset, sh_offset + sh_size - sh_entsize + 1, max(sh_entsize, 1)):
+            if bits == 32:
+                st_name, st_value, st_size, st_info, _, st_shndx = struct.unpack_from(sym_format, image, entry)
+            else:
+                st_name, st_info, _, st_shndx, st_value, st_size = struct.unpack_from(sym_format, image, entry)
+            # Functions (STT_FUNC) defined in a section of the file
+            if st_info & 0xF != 2 or st_size == 0 or st_shndx == 0 or st_shndx >= 0xFF00:
+                continue
+            offset = index.to_offset(st_value)
+            if offset is None or (offset, st_size) in functions:
+                continue
+            name = hex(st_value)
+            if strings is not None:
+                end = image.find(b'\x00', strings + st_name)
+                name = bytes(image[strings + st_name:end]).decode('ascii', 'replace')
+            functions[(offset, st_size)] = Section(name, st_value, offset, st_size, True)
+    return sorted(functions.values(), key=lambda f: f.offset)
+
+
+def load_functions(image, index):
+    """Find the functions of an ELF file in its symbol table.
+
+    :param image: the content of the file
+    :param index: the index of its sections, to translate the addresses of the functions
+    :return: a list of sections, one per function, sorted by offset (empty if there is no symbol table)
+    """
+    try:
+        if image[:4] == b'\x7fELF':
+            return _elf_functions(image, index)
+    except (struct.error, IndexError):
+        pass  # truncated or corrupted headers
+    return []
+
+
+def load_sections(image):
+    """Build the index of the sections of an ELF or PE file from its headers.
+
+    :param image: the content of the file
+    :return: a section index or None if the format is not recognized
+    """
+    try:
+        if image[:4] == b'\x7fELF':
+            return _parse_elf(image)
+        if image[:2] == b'MZ':
+            return _parse_pe(image)
+    except (struct.error, IndexError):
+        pass  # truncated or corrupted headers
+    return None
@@ -0,0 +1,188 @@
+import argparse
+import collections
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+from api import Injector
+from faults_inject import write_mutant
+from utils import check_or_fail, command_line, InjectionError
+
+# Protocol : each request is one line of JSON, for instance
+#   {"infile": "gcd", "faults": "FLP 0x610 5", "arch": "x86", "word_length": null, "vaddr": false, "outfile": null}
+# and each response is one line of JSON, followed by the bytes of the mutant if no outfile was given :
+#   {"ok": true, "size": 1024}, {"ok": true, "outfile": "gcd_1"} or {"ok": false, "error": "message"}
+# Several requests can be sent on the same connection.
+DEFAULT_CACHE_SIZE = 256  # MiB
+
+
+class ImageCache:
+    """Contents of the input files recently used, the least recently used ones being evicted when their total size
+    exceeds the limit. An entry is read again when the file is modified."""
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+        self.size = 0
+        self.entries = collections.OrderedDict()  # path -> (stat key, image, injectors by configuration)
+        self.lock = threading.Lock()
+
+    def injector(self, path, arch=None, word_length=None, virtual=False):
+        """Get the injector of an input file for a configuration, reading the file if it is not cached.
+
+        :param path: path of the input file
+        :param arch: architecture of the input (x86 or arm)
+        :param word_length: length of a word in bytes
+        :param virtual: the addresses given to the fault models are virtual addresses
+        :return: an api.Injector
+        """
+        path = os.path.abspath(path)
+        check_or_fail(os.path.isfile(path), "No input file : " + path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] != key:
+                self._remove(path)
+                entry = None
+            if entry is None:
+                with open(path, 'rb') as f:
+                    entry = (key, f.read(), {})
+                self.entries[path] = entry
+                self.size += len(entry[1])
+                while self.size > self.max_size and len(self.entries) > 1:
+                    self._remove(next(iter(self.entries)))
+            self.entries.move_to_end(path)
+            injectors = entry[2]
+            if (arch, word_length, virtual) not in injectors:
+                injectors[(arch, word_length, virtual)] = Injector(entry[1], arch, word_length, virtual)
+            return injectors[(arch, word_length, virtual)]
+
+    def _remove(self, path):
+        self.size -= len(self.entries.pop(path)[1])
+
+
+class InjectionHandler(socketserver.StreamRequestHandler):
+    """Answer the injection requests of one connection."""
+
+    def handle(self):
+        for line in self.rfile:
+            if len(line.strip()) == 0:
+                continue
+            try:
+                header, data = self.server.inject(json.loads(line.decode('utf-8')))
+            except InjectionError as e:
+                header, data = {'ok': False, 'error': str(e)}, b''
+            except (ValueError, TypeError, KeyError, OSError) as e:
+                header, data = {'ok': False, 'error': "Invalid request : " + str(e)}, b''
+            except Exception as e:
+                # An unexpected error only fails its request, the connection and the daemon go on
+                traceback.print_exc()
+                header, data = {'ok': False, 'error': "Internal error : " + type(e).__name__ + " " + str(e)}, b''
+            self.wfile.write(json.dumps(header).encode('utf-8') + b'\n' + data)
+            self.wfile.flush()
+
+
+class InjectionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Injection daemon listening on a Unix socket : the fault models are loaded once and the inputs are cached."""
+
+    daemon_threads = True
+
+    def __init__(self, path, cache_size=DEFAULT_CACHE_SIZE << 20):
+        self.cache = ImageCache(cache_size)
+        super().__init__(path, InjectionHandler)
+
+    def inject(self, request):
+        """Build the mutant of one request.
+
+        :param request: dict decoded from the JSON request
+        :return: (header of the response, bytes following it)
+        """
+        infile = os.path.expanduser(request['infile'])
+        injector = self.cache.injector(infile, request.get('arch'), request.get('word_length'),
+                                       bool(request.get('vaddr', False)))
+        fm_list = injector.faults(request['faults'])
+        outfile = request.get('outfile')
+        if outfile is not None:
+            outfile = os.path.expanduser(outfile)
+            write_mutant(injector.config.image, fm_list, outfile, os.stat(infile).st_mode & 0o7777)
+            return {'ok': True, 'outfile': outfile}, b''
+        mutant = injector.inject(fm_list)
+        return {'ok': True, 'size': len(mutant)}, mutant
+
+
+class Client:
+    """Connection to an injection daemon, sending one request at a time."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.file = self.socket.makefile('rwb')
+
+    def inject(self, infile, faults, arch=None, word_length=None, virtual=False, outfile=None):
+        """Ask the daemon for a mutant.
+
+        :param infile: path of the input file, as seen by the daemon
+        :param faults: the fault models as in a campaign line or as a list of tokens
+        :param arch: architecture of the input (x86 or arm)
+        :param word_length: length of a word in bytes
+        :param virtual: the addresses given to the fault models are virtual addresses
+        :param outfile: path where the daemon writes the mutant, None to receive its content
+        :return: the content of the mutant (bytes), or None if it was written in outfile
+        :raises InjectionError: if the daemon reports an error
+        """
+        request = {'infile': infile, 'faults': faults, 'arch': arch, 'word_length': word_length, 'vaddr': virtual,
+                   'outfile': outfile}
+        self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.file.flush()
+        header = json.loads(self.file.readline().decode('utf-8'))
+        if not header['ok']:
+            raise InjectionError(header['error'])
+        if outfile is not None:
+            return None
+        return self.file.read(header['size'])
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@command_line
+def main(argv):
+    # Collect parameters
+    parser = argparse.ArgumentParser(description='Injection daemon answering requests on a Unix socket',
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('socket', type=str, metavar='SOCKET', help='path to the Unix socket created')
+    parser.add_argument('--cache', type=int, metavar='MIB', required=False, default=DEFAULT_CACHE_SIZE,
+                        help='size of the input files kept in memory, in MiB (default : ' +
+                             str(DEFAULT_CACHE_SIZE) + ')')
+    args = parser.parse_args(argv)
+    check_or_fail(args.cache > 0, "Cache size must be positive")
+
+    path = os.path.expanduser(args.socket)
+    check_or_fail(not os.path.exists(path), "The socket already exists : " + path)
+    server = InjectionServer(path, args.cache << 20)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,108 @@
+import json
+import sys
+import time
+
+PROC_IO = '/proc/self/io'  # I/O counters of the process (Linux only)
+
+
+def _io_counters():
+    try:
+        with open(PROC_IO, 'r') as f:
+            return dict((k, int(v)) for k, v in (line.split(':') for line in f if ':' in line))
+    except (OSError, ValueError):
+        return None
+
+
+class _Phase:
+    """Context manager adding its wall and CPU time to a phase."""
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *args):
+        self.stats.add(self.name, time.perf_counter() - self.wall, time.process_time() - self.cpu)
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+class Stats:
+    """Wall and CPU time of the phases of a run and counters of the work done (models built, bytes patched, ...).
+    A disabled instance records nothing, so that the instrumented code does not check whether it is enabled.
+    """
+
+    def __init__(self, enabled=True):
+        super().__init__()
+        self.enabled = enabled
+        self.phases = {}  # name -> [wall, cpu, calls], in order of first use
+        self.counters = {}
+        self._io = _io_counters() if enabled else None
+
+    def phase(self, name):
+        """Time a block of code, the times of all the blocks with the same name being added.
+
+        :param name: name of the phase
+        :return: a context manager
+        """
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def add(self, name, wall, cpu):
+        """Add a duration measured elsewhere to a phase.
+
+        :param name: name of the phase
+        :param wall: wall time in seconds
+        :param cpu: CPU time in seconds
+        """
+        if self.enabled:
+            phase = self.phases.setdefault(name, [0.0, 0.0, 0])
+            phase[0] += wall
+            phase[1] += cpu
+            phase[2] += 1
+
+    def count(self, name, n=1):
+        """Increase a counter.
+
+        :param name: name of the counter
+        :param n: amount added
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        """The phases and the counters, with the write system calls and the bytes written since the creation of
+        the instance (when the system reports them).
+
+        :return: a dict serializable as JSON
+        """
+        counters = dict(self.counters)
+        io = _io_counters() if self._io is not None else None
+        if io is not None:
+            counters['write_syscalls'] = io.get('syscw', 0) - self._io.get('syscw', 0)
+            counters['bytes_written'] = io.get('wchar', 0) - self._io.get('wchar', 0)
+        return {'phases': dict((name, {'wall': p[0], 'cpu': p[1], 'calls': p[2]}) for name, p in self.phases.items()),
+                'counters': counters}
+
+    def write(self, path=None):
+        """Write the statistics as JSON.
+
+        :param path: path of the file, None or '-' for stderr
+        """
+        text = json.dumps(self.as_dict(), indent=1) + "\n"
+        if path is None or path == '-':
+            sys.stderr.write(text)
+        else:
+            with open(path, 'w') as f:
+                f.write(text)
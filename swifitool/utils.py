@@ -1,67 +1,223 @@
+import functools
+import hashlib
+import mmap
 import sys
 
 
+class InjectionError(Exception):
+    """Invalid parameters, fault models or files : the message explains the problem to the user."""
+
+
 def check_or_fail(condition, msg):
-    """Assert that the condition holds and if not exit with the error message.
+    """Assert that the condition holds and if not raise an error with the message.
 
     :param condition: the boolean condition
-    :param msg: the message printed on stderr
+    :param msg: the message of the error
+    :raises InjectionError: if the condition does not hold
     """
     if not condition:
-        sys.stderr.write(msg + "\n")
-        sys.exit(-1)
+        raise InjectionError(msg)
 
 
-def set_bytes(outfile, start_addr, value=0, nb_repeat=1):
-    """Write a 8-bit value several times in a file starting at a specified offset.
+def command_line(main):
+    """Decorate the main function of a script : an InjectionError is printed on stderr and exits with -1.
 
-    :param outfile: the IO stream of the file
-    :param start_addr: the offset in the file
-    :param value: the byte value as an integer 0-255
-    :param nb_repeat: number of repetitions
+    :param main: function of the list of arguments
+    :return: the decorated function
     """
-    outfile.seek(start_addr)
-    outfile.write(bytes([value] * nb_repeat))
+    @functools.wraps(main)
+    def wrapper(argv):
+        try:
+            return main(argv)
+        except InjectionError as e:
+            sys.stderr.write(str(e) + "\n")
+            sys.exit(-1)
+    return wrapper
 
 
-# def set_bit(outfile, addr, significance, value):
-#     check_or_fail(0 <= significance < 8, "The significance of the bit must be between 0 and 7 : " + str(significance))
-#     check_or_fail(value == 0 or value == 1, "The value is not binary : " + str(value))
-#     outfile.seek(addr)
-#     prev_value = ord(outfile.read(1))
-#     if value == 0:
-#         prev_value &= ~(1 << significance)
-#     else:
-#         prev_value |= (1 << significance)
-#     set_bytes(outfile, addr, prev_value)
+def map_file(file):
+    """Map the content of a file in memory, read-only.
+
+    :param file: path of the file
+    :return: the mapped content (or b'' for an empty file)
+    """
+    with open(file, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return b''  # an empty file cannot be mapped
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 
-def bits_list(bytes_l):
-    """Transform a list of byte offsets to a list of bit offsets.
+def numpy_module(msg):
+    """Import NumPy, only needed by some features.
 
-    :param bytes_l: list of offsets (integer)
-    :return: a list
+    :param msg: the message of the error if NumPy is missing, naming the feature
+    :return: the numpy module
+    :raises InjectionError: if NumPy is not installed
     """
-    bits_l = []
-    for i in bytes_l:
-        bits_l.extend(range(i * 8, i * 8 + 8))
-    return bits_l
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    check_or_fail(numpy is not None, msg)
+    return numpy
+
+
+def read_byte(image, offset):
+    """Read one byte of a content, unlike indexing a negative offset does not count from the end.
+
+    :param image: the content
+    :param offset: the offset of the byte
+    :return: the byte value as an integer 0-255
+    :raises InjectionError: if the offset is outside the content
+    """
+    check_or_fail(0 <= offset < len(image), "Address outside file content : byte " + hex(offset))
+    return image[offset]
+
+
+def merge_edits(image, fm_list):
+    """Collect the edits of several fault models, sorted by offset, contiguous ones being merged.
+    A byte edited by several models (on different bits) receives the changes of all of them.
+
+    :param image: the original content
+    :param fm_list: list of fault model objects
+    :return: a list of (offset, bytes)
+    """
+    edits = sorted((e for f in fm_list for e in f.edits(image)), key=lambda e: e[0])
+    merged = []  # list of [offset, length, list of the parts]
+    for offset, data in edits:
+        if len(merged) > 0 and offset <= merged[-1][0] + merged[-1][1]:
+            run = merged[-1]
+            common = min(run[0] + run[1] - offset, len(data))
+            if common > 0:
+                content = bytearray(b''.join(run[2]))
+                for i in range(common):
+                    content[offset - run[0] + i] ^= image[offset + i] ^ data[i]
+                run[2] = [content]
+            if common < len(data):
+                run[2].append(data[common:] if common > 0 else data)
+                run[1] += len(data) - common
+        else:
+            merged.append([offset, len(data), [data]])
+    return [(offset, parts[0] if len(parts) == 1 else b''.join(parts)) for offset, _, parts in merged]
+
+
+def apply_faults(buffer, fm_list):
+    """Apply several fault models to a writable buffer (bytearray or mmap) in one pass,
+    with a single slice assignment per contiguous edited range.
+
+    :param buffer: the original content, edited in place
+    :param fm_list: list of fault model objects
+    :return: the merged edits as a list of (offset, bytes)
+    """
+    edits = merge_edits(buffer, fm_list)
+    for offset, data in edits:
+        buffer[offset:offset + len(data)] = data
+    return edits
+
+
+def effective_patch(image, chunks):
+    """Keep only the bytes of a patch that actually change the content, e.g. a Z1B on a byte already 0x00 or a NOP
+    on a 0x90 byte (x86) edits nothing. Two mutants with the same effective patch are identical.
+
+    :param image: the original content
+    :param chunks: list of (offset, bytes) sorted by offset, as returned by merge_edits
+    :return: a list of (offset, bytes), each run of changed bytes being one item
+    """
+    patch = []
+    for offset, data in chunks:
+        original = image[offset:offset + len(data)]
+        if original == data:
+            continue
+        i = 0
+        while i < len(data):
+            if data[i] == original[i]:
+                i += 1
+                continue
+            j = i + 1
+            while j < len(data) and data[j] != original[j]:
+                j += 1
+            patch.append((offset + i, data[i:j]))
+            i = j
+    return patch
+
+
+def patch_digest(chunks):
+    """Hash of a patch, the effective patches of identical mutants having the same hash.
+
+    :param chunks: list of (offset, bytes) sorted by offset
+    :return: the SHA-256 as an hexadecimal string
+    """
+    h = hashlib.sha256()
+    for offset, data in chunks:
+        h.update(offset.to_bytes(8, 'little') + len(data).to_bytes(4, 'little'))
+        h.update(data)
+    return h.hexdigest()
+
+
+def mutant_name(pattern, n):
+    """Name of the n-th mutant of a campaign.
+
+    :param pattern: the OUTFILE argument, '{}' is replaced by the number (appended with '_' if absent)
+    :param n: the number of the mutant
+    :return: a path
+    """
+    if '{}' in pattern:
+        return pattern.replace('{}', str(n))
+    return pattern + '_' + str(n)
+
+
+class Location:
+    """A contiguous range of byte offsets (stop excluded) with the mask of the bits concerned in each byte.
+    It behaves like the sequence of its byte offsets without storing them.
+    """
+
+    def __init__(self, start, stop, mask=0xFF):
+        self.start = start
+        self.stop = stop
+        self.mask = mask
+
+    def __len__(self):
+        return max(self.stop - self.start, 0)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("Location index out of range")
+        return self.start + i if i >= 0 else self.stop + i
+
+    def __iter__(self):
+        return iter(range(self.start, self.stop))
+
+    def __eq__(self, other):
+        return isinstance(other, Location) and \
+            (self.start, self.stop, self.mask) == (other.start, other.stop, other.mask)
+
+    def __repr__(self):
+        return "Location(" + hex(self.start) + ", " + hex(self.stop) + ", " + hex(self.mask) + ")"
+
+    def overlaps(self, other):
+        """Check whether the two locations have at least one bit in common.
+
+        :param other: another location
+        :return: a boolean
+        """
+        return self.start < other.stop and other.start < self.stop and self.mask & other.mask != 0
 
 
 def parse_addr(addr):
-    """Parse a string representing an address or a range of addresses to an list of integer address(es).
+    """Parse a string representing an address or a range of addresses to a location.
     Exit with error if format is wrong.
 
     :param addr: the string to parse
-    :return: a list of adresses
+    :return: a location
     """
     try:
-        return [int(addr, 0)]
+        start = int(addr, 0)
+        return Location(start, start + 1)
     except ValueError:
         borders = addr.split('-')
         try:
             check_or_fail(len(borders) == 2, "Wrong address format : " + addr)
-            ret = list(range(int(borders[0], 0), int(borders[1], 0) + 1))  # inclusive borders
+            ret = Location(int(borders[0], 0), int(borders[1], 0) + 1)  # inclusive borders
             check_or_fail(len(ret) > 0, "Address range empty : " + addr)
             return ret
         except ValueError:
@@ -0,0 +1,49 @@
+from unittest import TestCase
+from swifitool import api
+
+
+class TestApi(TestCase):
+
+    image = b'\x01\x02\x03\x04\x05\x06\x07\x08'
+
+    def test_api_01(self):
+        """Mutant returned in memory, the input is not modified."""
+        self.assertEqual(b'\x00\x02\x03\x04\x05\x06\x07\x88', api.inject(self.image, "Z1B 0 FLP 7 7"))
+        self.assertEqual(b'\x01\x02\x03\x04\x05\x06\x07\x08', self.image)
+
+    def test_api_02(self):
+        """Input given as a memoryview and fault models as a list of tokens."""
+        view = memoryview(bytearray(self.image))[2:6]
+        self.assertEqual(b'\x00\x00\x05\x06', api.inject(view, ["Z1W", "0-1"], word_length=2))
+
+    def test_api_03(self):
+        """Errors raised instead of exiting."""
+        injector = api.Injector(self.image)
+        for spec, msg in [("", "No fault models provided"), ("XYZ 0", "Unknown fault model : XYZ"),
+                          ("FLP 0", "Wrong number of parameters for FLP"),
+                          ("Z1B 8", "Address outside file content : byte 0x8"),
+                          ("Z1B 1 FLP 1 0", "Applying two fault models at the same place : byte 0x1")]:
+            with self.assertRaises(api.InjectionError) as cm:
+                injector.inject(spec)
+            self.assertEqual(msg, str(cm.exception))
+
+    def test_api_04(self):
+        """Fault model objects checked once and applied several times."""
+        injector = api.Injector(self.image)
+        fm_list = injector.faults("Z1B 1 FLP 3 0")
+        self.assertEqual(b'\x01\x00\x03\x05\x05\x06\x07\x08', injector.inject(fm_list))
+        self.assertEqual(b'\x01\x00\x03\x05\x05\x06\x07\x08', injector.inject(fm_list))
+        self.assertEqual([(1, b'\x00'), (3, b'\x05')], injector.patch(fm_list))
+
+    def test_api_05(self):
+        """Configurations and inputs rejected by the command line also raise errors."""
+        for kwargs, msg in [({'arch': 'mips'}, "Unknown architecture : mips"),
+                            ({'arch': 'X86'}, "Unknown architecture : X86"),
+                            ({'word_length': 0}, "Word size must be positive"),
+                            ({'virtual': True}, "Virtual addresses require an ELF or PE input file")]:
+            with self.assertRaises(api.InjectionError) as cm:
+                api.Injector(self.image, **kwargs)
+            self.assertEqual(msg, str(cm.exception))
+        with self.assertRaises(api.InjectionError) as cm:
+            api.inject(b'\x01\x02\xeb', "JMP 2 0", arch='x86')
+        self.assertEqual("Address outside file content : byte 0x3", str(cm.exception))
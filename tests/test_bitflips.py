@@ -0,0 +1,107 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import delta, faults_inject
+
+
+class TestBitflips(TestCase):
+
+    dir_out = None
+    file_in = None
+    content = bytes(range(1, 33))
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+        self.file_in = os.path.join(self.dir_out, 'in')
+        with open(self.file_in, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_out)
+
+    def read_out(self, name):
+        with open(os.path.join(self.dir_out, name), 'rb') as f:
+            return f.read()
+
+    def flipped(self, mutant):
+        """Positions of the bits flipped, numbered from the least significant bit of the first byte."""
+        return [8 * i + b for i, (x, y) in enumerate(zip(self.content, mutant)) for b in range(8) if (x ^ y) >> b & 1]
+
+    def test_bitflips_01(self):
+        """Mask flipped with XOR, on the bits not edited by the other models."""
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out"),
+                            "XOR", "0x10-0x12", "0x810001", "FLP", "0x11", "3", "FLP", "0x10", "1"])
+        self.assertEqual(self.content[:16] + b'\x92\x1A\x12' + self.content[19:], self.read_out("out"))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_bitflips_02(self, err):
+        """Wrong masks and overlapping bits."""
+        for args, msg in [(["XOR", "0x10-0x12", "0x8100"], "Mask of 2 bytes for 3 addresses"),
+                          (["XOR", "0x10", "0xZZ"], "Wrong mask format : 0xZZ"),
+                          (["XOR", "0x10", "0x81", "FLP", "0x10", "0"],
+                           "Applying two fault models at the same place : byte 0x10")]:
+            err.truncate(0)
+            err.seek(0)
+            with self.assertRaises(SystemExit):
+                faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out")] + args)
+            self.assertEqual(msg + "\n", err.getvalue())
+
+    def test_bitflips_03(self):
+        """Random distinct bits of a word and random burst, the same for the same seed."""
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out1"), "-w", "4",
+                            "MBF", "0x8-0xb", "5", "42", "BST", "0x10-0x1f", "11", "42"])
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out2"), "-w", "4",
+                            "MBF", "0x8-0xb", "5", "42", "BST", "0x10-0x1f", "11", "42"])
+        self.assertEqual(self.read_out("out1"), self.read_out("out2"))
+        bits = self.flipped(self.read_out("out1"))
+        word = [b for b in bits if b < 128]
+        burst = [b for b in bits if b >= 128]
+        self.assertEqual(5, len(word))
+        self.assertTrue(all(64 <= b < 96 for b in word))
+        self.assertEqual(list(range(burst[0], burst[0] + 11)), burst)
+
+    def test_bitflips_04(self):
+        """Random campaign written as copies or as patches flipped by batches, with the same mutants."""
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "m_{}"), "-w", "2",
+                            "--random", "MBF", "0x4-0x13", "--count", "20", "--bits", "3", "--seed", "5"])
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "m.dlt"), "-w", "2", "-d",
+                            "--random", "MBF", "0x4-0x13", "--count", "20", "--bits", "3", "--seed", "5"])
+        records = list(delta.read_deltas(os.path.join(self.dir_out, "m.dlt")))
+        self.assertEqual(list(range(1, 21)), [n for n, _ in records])
+        for n, chunks in records:
+            mutant = self.read_out("m_" + str(n))
+            self.assertEqual(bytes(delta.materialize(self.content, chunks)), mutant)
+            bits = self.flipped(mutant)
+            self.assertEqual(3, len(bits))
+            self.assertTrue(32 <= bits[0] and bits[-1] < 160 and bits[0] // 16 == bits[-1] // 16)
+
+    def test_bitflips_05(self):
+        """Random bursts split in shards."""
+        for shard in ["0/2", "1/2"]:
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "b" + shard[0] + ".dlt"), "-d",
+                                "--random", "BST", "0-0x1f", "--count", "9", "--bits", "12", "--shard", shard])
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "b.dlt"), "-d",
+                            "--random", "BST", "0-0x1f", "--count", "9", "--bits", "12"])
+        records = dict(delta.read_deltas(os.path.join(self.dir_out, "b.dlt")))
+        shards = [dict(delta.read_deltas(os.path.join(self.dir_out, "b" + i + ".dlt"))) for i in "01"]
+        self.assertEqual([1, 3, 5, 7, 9], sorted(shards[0]))
+        self.assertEqual(records, dict(list(shards[0].items()) + list(shards[1].items())))
+        for chunks in records.values():
+            bits = self.flipped(delta.materialize(self.content, chunks))
+            self.assertEqual(list(range(bits[0], bits[0] + 12)), bits)
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_bitflips_06(self, err):
+        """Random models or numbers of bits not supported."""
+        for args, msg in [(["--random", "FLP", "0-7"], "Fault model cannot be drawn at random : FLP"),
+                          (["--random", "MBF", "0-7", "--bits", "9"], "Number of bits must be between 1 and 8 : 9"),
+                          (["--random", "BST", "0-0x20"], "Region outside file content : 0x0-0x20"),
+                          (["MBF", "3", "0", "1"], "Number of bits must be between 1 and 8 : 0")]:
+            err.truncate(0)
+            err.seek(0)
+            with self.assertRaises(SystemExit):
+                faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "m_{}")] + args)
+            self.assertEqual(msg + "\n", err.getvalue())
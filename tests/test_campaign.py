@@ -0,0 +1,145 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import faults_inject, delta
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+
+class TestCampaign(TestCase):
+
+    file_in = None
+    file_cmd = None
+    dir_out = None
+
+    def setUp(self):
+        super().setUp()
+        self.file_in = tempfile.NamedTemporaryFile(delete=False)
+        self.file_in.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.file_in.flush()
+        self.file_cmd = tempfile.NamedTemporaryFile(delete=False)
+        self.dir_out = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.file_in.close()
+        os.unlink(self.file_in.name)
+        self.file_cmd.close()
+        os.unlink(self.file_cmd.name)
+        shutil.rmtree(self.dir_out)
+
+    def read_out(self, name):
+        with open(os.path.join(self.dir_out, name), 'rb') as f:
+            return f.read()
+
+    def test_campaign_01(self):
+        """One mutant per line, named after the line number."""
+        self.file_cmd.write(b'NOP 0x3\n\nZ1B 0x0-0x1 FLP 7 0\n')
+        self.file_cmd.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut_{}.bin"), "-a", "x86",
+                            "-c", self.file_cmd.name])
+        self.assertEqual(['mut_1.bin', 'mut_3.bin'], sorted(os.listdir(self.dir_out)))
+        self.assertEqual(b'\x01\x02\x03\x90\x05\x06\x07\x08', self.read_out('mut_1.bin'))
+        self.assertEqual(b'\x00\x00\x03\x04\x05\x06\x07\x09', self.read_out('mut_3.bin'))
+
+    def test_campaign_02(self):
+        """Mutant number appended when the pattern has no placeholder."""
+        self.file_cmd.write(b'FLP 0 0\nFLP 0 1')
+        self.file_cmd.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"), "-c", self.file_cmd.name])
+        self.assertEqual(b'\x00\x02\x03\x04\x05\x06\x07\x08', self.read_out('mut_1'))
+        self.assertEqual(b'\x03\x02\x03\x04\x05\x06\x07\x08', self.read_out('mut_2'))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_campaign_03(self, err):
+        """Fault models given both on the command line and in the campaign."""
+        self.file_cmd.write(b'FLP 0 0')
+        self.file_cmd.flush()
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"),
+                                "-c", self.file_cmd.name, "FLP", "0", "0"])
+        self.assertEqual('Fault models must be given in the campaign file\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_campaign_04(self, err):
+        """Invalid line in the campaign."""
+        self.file_cmd.write(b'FLP 0 0\nFLP 0 0 Z1B 0\n')
+        self.file_cmd.flush()
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"),
+                                "-c", self.file_cmd.name])
+        self.assertEqual('Applying two fault models at the same place : byte 0x0\n', err.getvalue())
+
+    def test_campaign_05(self):
+        """Several processes writing the mutants."""
+        self.file_cmd.write(b''.join(b'FLP %d %d\n' % (i % 8, i // 8) for i in range(64)))
+        self.file_cmd.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"), "-j", "3",
+                            "-c", self.file_cmd.name])
+        self.assertEqual(64, len(os.listdir(self.dir_out)))
+        for i in range(64):
+            expected = bytearray(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+            expected[i % 8] ^= 1 << (i // 8)
+            self.assertEqual(bytes(expected), self.read_out('mut_' + str(i + 1)))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_campaign_06(self, err):
+        """Invalid line with several processes: the previous mutants are written."""
+        self.file_cmd.write(b'FLP 0 0\nFLP 1 0\nFLP 100 0\nFLP 2 0\n')
+        self.file_cmd.flush()
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"), "-j", "2",
+                                "-c", self.file_cmd.name])
+        self.assertEqual('Address outside file content : byte 0x64\n', err.getvalue())
+        self.assertEqual(['mut_1', 'mut_2'], sorted(os.listdir(self.dir_out)))
+
+    def test_campaign_07(self):
+        """Enumerating the faults of a model over a range, one shard only."""
+        faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"), "-e", "Z1B", "2-6",
+                            "--shard", "1/2"])
+        self.assertEqual(['mut_2', 'mut_4'], sorted(os.listdir(self.dir_out)))
+        self.assertEqual(b'\x01\x02\x03\x00\x05\x06\x07\x08', self.read_out('mut_2'))
+        self.assertEqual(b'\x01\x02\x03\x04\x05\x00\x07\x08', self.read_out('mut_4'))
+
+    def test_campaign_08(self):
+        """Enumerating all the bit flips of a range."""
+        faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "flp.dlt"), "-d",
+                            "-e", "FLP", "6-7"])
+        records = list(delta.read_deltas(os.path.join(self.dir_out, "flp.dlt")))
+        self.assertEqual(16, len(records))
+        self.assertEqual((1, [(6, b'\x06')]), records[0])
+        self.assertEqual((16, [(7, b'\x88')]), records[15])
+
+    def test_campaign_09(self):
+        """Enumerating the NOP of every instruction slot of a section."""
+        faults_inject.main(["-i", os.path.join(EXAMPLES, "gcd"), "-o", os.path.join(self.dir_out, "nop.dlt"), "-d",
+                            "-a", "x86", "-e", "NOP", ".text", "--shard", "2/3"])
+        records = list(delta.read_deltas(os.path.join(self.dir_out, "nop.dlt")))
+        self.assertEqual(150, len(records))
+        self.assertEqual((3, [(0x4f2, b'\x90')]), records[0])
+        self.assertEqual((450, [(0x6b1, b'\x90')]), records[-1])
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_campaign_10(self, err):
+        """Enumerating a model that does not support it."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", os.path.join(self.dir_out, "mut"), "-a", "x86",
+                                "-e", "XYZ", "0-7"])
+        self.assertEqual('Fault model cannot be enumerated : XYZ\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_campaign_11(self, err):
+        """Mutants identical to the input file or to a previous mutant skipped."""
+        file_in = os.path.join(self.dir_out, "in")
+        with open(file_in, 'wb') as f:
+            f.write(b'\x00\x90\x03')
+        self.file_cmd.write(b'Z1B 0\nNOP 1\nFLP 2 0\nZ1B 0 Z1B 2\nFLP 2 1 FLP 2 0\n')
+        self.file_cmd.flush()
+        faults_inject.main(["-i", file_in, "-o", os.path.join(self.dir_out, "mut"), "-a", "x86", "--dedup",
+                            "-c", self.file_cmd.name])
+        self.assertEqual(['in', 'mut_3', 'mut_4'], sorted(os.listdir(self.dir_out)))
+        self.assertEqual(b'\x00\x90\x00', self.read_out('mut_4'))
+        self.assertEqual('Warning: mutant 1 is identical to the input file, skipped\n' +
+                         'Warning: mutant 2 is identical to the input file, skipped\n' +
+                         'Warning: mutant 5 is identical to mutant 4, skipped\n', err.getvalue())
@@ -0,0 +1,106 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import faults_inject, delta
+
+
+class TestDelta(TestCase):
+
+    file_in = None
+    file_cmd = None
+    dir_out = None
+
+    def setUp(self):
+        super().setUp()
+        self.file_in = tempfile.NamedTemporaryFile(delete=False)
+        self.file_in.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.file_in.flush()
+        self.file_cmd = tempfile.NamedTemporaryFile(delete=False)
+        self.file_cmd.write(b'NOP 0x3\n\nZ1B 0x0-0x1 FLP 2 0 FLP 7 0\n')
+        self.file_cmd.flush()
+        self.dir_out = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.file_in.close()
+        os.unlink(self.file_in.name)
+        self.file_cmd.close()
+        os.unlink(self.file_cmd.name)
+        shutil.rmtree(self.dir_out)
+
+    def path(self, name):
+        return os.path.join(self.dir_out, name)
+
+    def read_out(self, name):
+        with open(self.path(name), 'rb') as f:
+            return f.read()
+
+    def test_delta_01(self):
+        """Patch records of a campaign, merged when contiguous."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.path("campaign.dlt"), "-a", "x86", "-d",
+                            "-c", self.file_cmd.name])
+        self.assertEqual([(1, [(3, b'\x90')]), (3, [(0, b'\x00\x00\x02'), (7, b'\x09')])],
+                         list(delta.read_deltas(self.path("campaign.dlt"))))
+
+    def test_delta_02(self):
+        """Rebuilding all the mutants of a campaign."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.path("campaign.dlt"), "-a", "x86", "-d", "-j", "2",
+                            "-c", self.file_cmd.name])
+        delta.main(["-i", self.file_in.name, "-d", self.path("campaign.dlt"), "-o", self.path("mut_{}")])
+        self.assertEqual(['campaign.dlt', 'mut_1', 'mut_3'], sorted(os.listdir(self.dir_out)))
+        self.assertEqual(b'\x01\x02\x03\x90\x05\x06\x07\x08', self.read_out('mut_1'))
+        self.assertEqual(b'\x00\x00\x02\x04\x05\x06\x07\x09', self.read_out('mut_3'))
+
+    def test_delta_03(self):
+        """Rebuilding a single mutant."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.path("single.dlt"), "-a", "arm", "-d", "NOP", "0x4"])
+        delta.main(["-i", self.file_in.name, "-d", self.path("single.dlt"), "-o", self.path("mut"), "0"])
+        self.assertEqual(b'\x01\x02\x03\x04\x00\xbf\x07\x08', self.read_out('mut'))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_delta_04(self, err):
+        """Rebuilding from another input file."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.path("single.dlt"), "-d", "FLP", "0", "0"])
+        self.file_in.write(b'\x09')
+        self.file_in.flush()
+        with self.assertRaises(SystemExit):
+            delta.main(["-i", self.file_in.name, "-d", self.path("single.dlt"), "-o", self.path("mut"), "0"])
+        self.assertEqual('The delta file was not made from this input file\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_delta_05(self, err):
+        """Unknown mutant number."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.path("single.dlt"), "-d", "FLP", "0", "0"])
+        with self.assertRaises(SystemExit):
+            delta.main(["-i", self.file_in.name, "-d", self.path("single.dlt"), "-o", self.path("mut"), "0", "4", "2"])
+        self.assertEqual('Mutant not found in the delta file : 2, 4\n', err.getvalue())
+
+    def truncated(self, cut):
+        """Delta file of a single mutant with one chunk of 2 bytes, without its last bytes."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.path("single.dlt"), "-d", "-w", "2", "Z1W", "2-3"])
+        with open(self.path("single.dlt"), 'rb') as f:
+            content = f.read()
+        with open(self.path("truncated.dlt"), 'wb') as f:
+            f.write(content[:len(content) - cut])
+        return self.path("truncated.dlt")
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_delta_06(self, err):
+        """Delta file truncated in a chunk header."""
+        path = self.truncated(2 + 8)
+        with self.assertRaises(SystemExit):
+            delta.main(["-i", self.file_in.name, "-d", path, "-o", self.path("mut_{}")])
+        self.assertEqual('Truncated delta file : ' + path + '\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_delta_07(self, err):
+        """Delta file truncated in the bytes of a chunk, read or skipped."""
+        path = self.truncated(1)
+        with self.assertRaises(SystemExit):
+            delta.main(["-i", self.file_in.name, "-d", path, "-o", self.path("mut_{}")])
+        self.assertEqual('Truncated delta file : ' + path + '\n', err.getvalue())
+        with self.assertRaises(SystemExit):
+            delta.main(["-i", self.file_in.name, "-d", path, "-o", self.path("mut"), "1"])
+        self.assertEqual(('Truncated delta file : ' + path + '\n') * 2, err.getvalue())
+        self.assertEqual(['single.dlt', 'truncated.dlt'], sorted(os.listdir(self.dir_out)))
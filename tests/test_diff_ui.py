@@ -0,0 +1,67 @@
+import tempfile
+import os
+from unittest import TestCase
+from swifitool import diff_ui
+from swifitool.utils import Location
+
+
+class Fault:
+    """Fault model editing the given byte ranges."""
+
+    def __init__(self, name, ranges):
+        self.name = name
+        self.ranges = ranges
+
+    def edited_file_locations(self):
+        return [Location(start, stop) for start, stop in self.ranges]
+
+
+class TestDiffUI(TestCase):
+
+    def test_diff_ui_01(self):
+        """Rows of hex numbers read on demand."""
+        content = bytes(range(40))
+        self.assertEqual(['10 11 12 13 14 15 16 17 18 19 1A 1B 1C 1D 1E 1F', '20 21 22 23 24 25 26 27'],
+                         diff_ui.hex_rows(content, 1, 5))
+        self.assertEqual([], diff_ui.hex_rows(content, 3, 1))
+
+    def test_diff_ui_02(self):
+        """Whole file formatted for a text wrapped every 16 numbers."""
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(bytes(range(17)))
+        try:
+            self.assertEqual('00 01 02 03 04 05 06 07 08 09 0A 0B 0C 0D 0E 0F10', diff_ui.file_to_hex_col(f.name))
+        finally:
+            os.unlink(f.name)
+
+    def test_diff_ui_03(self):
+        """Highlighted ranges cut to the rows displayed."""
+        highlights = diff_ui.Highlights([Fault('NOP', [(14, 18)]), Fault('FLP', [(39, 40)]),
+                                         Fault('Z1B', [(100, 101)])])
+        self.assertEqual([('1.42', '1.47', 'NOP'), ('2.0', '2.5', 'NOP'), ('3.21', '3.23', 'FLP')],
+                         diff_ui.visible_spans(highlights, 0, 3))
+        self.assertEqual([('1.0', '1.5', 'NOP')], diff_ui.visible_spans(highlights, 1, 1))
+
+    def test_diff_ui_04(self):
+        """Ranges of the same model coalesced, bits of the same byte included."""
+        highlights = diff_ui.Highlights([Fault('FLP', [(3, 4)]), Fault('NOP', [(4, 6), (0, 2)]), Fault('FLP', [(3, 4)]),
+                                         Fault('NOP', [(2, 3), (8, 9)])])
+        self.assertEqual([(0, 3, 'NOP'), (3, 4, 'FLP'), (4, 6, 'NOP'), (8, 9, 'NOP')], highlights.spans)
+        self.assertEqual([(3, 4, 'FLP'), (4, 6, 'NOP')], highlights.between(3, 6))
+
+    def test_diff_ui_05(self):
+        """Next and previous faults."""
+        highlights = diff_ui.Highlights([Fault('JMP', [(0x20, 0x21)]), Fault('NOP', [(0x100, 0x102)])])
+        self.assertEqual(0x20, highlights.next(-1))
+        self.assertEqual(0x100, highlights.next(0x20))
+        self.assertIsNone(highlights.next(0x100))
+        self.assertEqual(0x20, highlights.previous(0x100))
+        self.assertIsNone(highlights.previous(0x20))
+
+    def test_diff_ui_06(self):
+        """Ranges of different models overlapping on different bits of the same bytes."""
+        highlights = diff_ui.Highlights([Fault('XOR', [(0, 40)]), Fault('FLP', [(2, 3)]), Fault('Z1B', [(50, 51)])])
+        self.assertEqual([(0, 40, 'XOR'), (2, 3, 'FLP'), (50, 51, 'Z1B')], highlights.spans)
+        self.assertEqual([(0, 40, 'XOR')], highlights.between(16, 48))
+        self.assertEqual([('1.0', '1.47', 'XOR')], diff_ui.visible_spans(highlights, 1, 1))
+        self.assertEqual([('1.0', '1.47', 'XOR'), ('1.6', '1.8', 'FLP')], diff_ui.visible_spans(highlights, 0, 1))
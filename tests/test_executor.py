@@ -0,0 +1,189 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import executor, faults_inject, results as results_db
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+
+class TestExecutor(TestCase):
+
+    dir_out = None
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_out)
+
+    def script(self, name, content):
+        path = os.path.join(self.dir_out, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\n' + content + '\n')
+        os.chmod(path, 0o755)
+        return path
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    def test_executor_01(self, out, err):
+        """Classification of the outcomes."""
+        golden = self.script('golden', 'echo 42')
+        mutants = [self.script('same', 'echo 42'), self.script('output', 'echo 43'),
+                   self.script('exit', 'echo 42; exit 3'), self.script('crash', 'kill -SEGV $$'),
+                   self.script('hang', 'sleep 10')]
+        executor.main(["-g", golden, "-t", "0.5", "-j", "5"] + mutants)
+        lines = [line.split('\t') for line in out.getvalue().splitlines()]
+        self.assertEqual(mutants, [line[0] for line in lines])
+        self.assertEqual(['no_effect', 'sdc', 'sdc', 'crash', 'hang'], [line[1] for line in lines])
+        self.assertEqual(['0', '0', '3', '-11'], [line[2] for line in lines[:4]])
+        self.assertEqual('crash : 1, hang : 1, sdc : 2, no_effect : 1\n', err.getvalue())
+
+    def test_executor_02(self):
+        """Arguments and standard input given to every run."""
+        golden = executor.run([self.script('golden', 'read a; echo $a $1'), 'y'], stdin=b'x\n')
+        mutants = [self.script('same', 'read a; echo $a $1'), self.script('stdin', 'echo z $1')]
+        results = list(executor.run_mutants(mutants, ['y'], golden, 5, b'x\n'))
+        self.assertEqual(['no_effect', 'sdc'], [outcome for _, _, outcome in results])
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    def test_executor_03(self, out, err):
+        """Mutants of the gcd example."""
+        mutants = [os.path.join(EXAMPLES, m) for m in ['gcd_flip', 'gcd_jmp', 'gcd_nop', 'gcd_zero']]
+        executor.main(["-g", os.path.join(EXAMPLES, 'gcd'), "-t", "5"] + mutants)
+        self.assertEqual(['sdc', 'crash', 'sdc', 'crash'], [line.split('\t')[1] for line in out.getvalue().splitlines()])
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_04(self, err):
+        """Campaign executed from memory, no mutant written."""
+        program = self.script('program', 'echo 42 # x')
+        campaign = os.path.join(self.dir_out, 'campaign')
+        with open(campaign, 'w') as f:
+            f.write('FLP 15 0\nZ1B 0\nFLP 20 0\n')
+        results = os.path.join(self.dir_out, 'results')
+        faults_inject.main(["-i", program, "-o", results, "-c", campaign, "-x", "-t", "5", "-j", "2"])
+        with open(results) as f:
+            lines = [line.split('\t') for line in f.read().splitlines()]
+        self.assertEqual([['1', 'sdc'], ['2', 'crash'], ['3', 'no_effect']], [line[:2] for line in lines])
+        self.assertEqual(['campaign', 'program', 'results'], sorted(os.listdir(self.dir_out)))
+        self.assertEqual('crash : 1, hang : 0, sdc : 1, no_effect : 1\n', err.getvalue())
+
+    def test_executor_05(self):
+        """Campaign of the gcd example executed from memory."""
+        campaign = os.path.join(self.dir_out, 'campaign')
+        with open(campaign, 'w') as f:
+            f.write('FLP 0x4f4 0\nNOP 0x617-0x619\nNOP 0x6b0\n')  # in _start, in gcd, the prefix of repz ret
+        results = os.path.join(self.dir_out, 'results')
+        with mock.patch('sys.stderr', new_callable=io.StringIO):
+            faults_inject.main(["-i", os.path.join(EXAMPLES, 'gcd'), "-o", results, "-a", "x86", "-c", campaign,
+                                "-x", "-t", "5"])
+        with open(results) as f:
+            self.assertEqual([['1', 'crash'], ['2', 'sdc'], ['3', 'no_effect']],
+                             [line.split('\t')[:2] for line in f.read().splitlines()])
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_06(self, err):
+        """Execution without a campaign."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.script('program', 'echo 42'), "-o", os.path.join(self.dir_out, 'out'),
+                                "-x", "FLP", "0", "0"])
+        self.assertEqual('Execution is only available for a campaign\n', err.getvalue())
+
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_07(self, err, out):
+        """Outcomes recorded in a database and campaign resumed."""
+        program = self.script('program', 'echo 42 # x')
+        campaign = os.path.join(self.dir_out, 'campaign')
+        results = os.path.join(self.dir_out, 'results')
+        db = os.path.join(self.dir_out, 'results.db')
+        with open(campaign, 'w') as f:
+            f.write('FLP 15 0\nFLP 20 0\n')
+        faults_inject.main(["-i", program, "-o", results, "-c", campaign, "-x", "-t", "5", "--db", db])
+        with open(campaign, 'a') as f:
+            f.write('Z1B 0 FLP 15 1\n')
+        faults_inject.main(["-i", program, "-o", results, "-c", campaign, "-x", "-t", "5", "--db", db, "--resume"])
+        with open(results) as f:
+            self.assertEqual(['1', '2', '3'], [line.split('\t')[0] for line in f.read().splitlines()])
+        self.assertEqual('crash : 0, hang : 0, sdc : 1, no_effect : 1\ncrash : 1, hang : 0, sdc : 0, no_effect : 0\n',
+                         err.getvalue())
+        results_db.main([db, "-m", "FLP", "-r", "0-0xf"])
+        lines = [line.split('\t') for line in out.getvalue().splitlines()]
+        self.assertEqual([['1', 'sdc'], ['3', 'crash']], [line[:2] for line in lines])
+        self.assertEqual('Z1B 0 FLP 15 1', lines[1][6])
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_08(self, err):
+        """Resuming without a database, or with the database of another input."""
+        program = self.script('program', 'echo 42 # x')
+        campaign = os.path.join(self.dir_out, 'campaign')
+        db = os.path.join(self.dir_out, 'results.db')
+        with open(campaign, 'w') as f:
+            f.write('FLP 15 0\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", program, "-o", os.path.join(self.dir_out, 'out'), "-c", campaign, "-x",
+                                "--resume"])
+        self.assertEqual('Resuming requires a results database\n', err.getvalue())
+        faults_inject.main(["-i", program, "-o", os.path.join(self.dir_out, 'out'), "-c", campaign, "-x", "--db", db])
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.script('other', 'echo 43'), "-o", os.path.join(self.dir_out, 'out'),
+                                "-c", campaign, "-x", "--db", db, "--resume"])
+        self.assertTrue(err.getvalue().endswith('The results database was made from another input file\n'))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_09(self, err):
+        """Identical mutants executed once."""
+        program = self.script('program', 'echo 42 # x')
+        campaign = os.path.join(self.dir_out, 'campaign')
+        results = os.path.join(self.dir_out, 'results')
+        with open(campaign, 'w') as f:
+            f.write('FLP 15 0\nFLP 0xf 0\nFLP 15 2 FLP 15 0 FLP 15 3\nFLP 15 0\n')
+        faults_inject.main(["-i", program, "-o", results, "-c", campaign, "-x", "-t", "5", "-j", "2", "--dedup"])
+        with open(results) as f:
+            lines = [line.split('\t') for line in f.read().splitlines()]
+        self.assertEqual(['sdc', 'sdc', 'sdc', 'sdc'], [line[1] for line in lines])
+        self.assertEqual(lines[0][2:], lines[1][2:])
+        self.assertEqual(lines[0][2:], lines[3][2:])
+        self.assertEqual('crash : 0, hang : 0, sdc : 4, no_effect : 0\nIdentical mutants not executed : 2\n',
+                         err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_10(self, err):
+        """Golden program that cannot be started."""
+        with self.assertRaises(SystemExit):
+            executor.main(["-g", os.path.join(self.dir_out, 'missing'), self.script('program', 'echo 42')])
+        self.assertEqual('The golden program could not be executed\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_11(self, err):
+        """Campaign executed on an input that is not a program."""
+        program = os.path.join(self.dir_out, 'program')
+        with open(program, 'wb') as f:
+            f.write(bytes(64))
+        campaign = os.path.join(self.dir_out, 'campaign')
+        with open(campaign, 'w') as f:
+            f.write('Z1B 0\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", program, "-o", os.path.join(self.dir_out, 'results'), "-c", campaign, "-x"])
+        self.assertEqual('The input program could not be executed\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_executor_12(self, err):
+        """Results written after the last transaction of the database removed when resuming."""
+        program = self.script('program', 'echo 42 # x')
+        campaign = os.path.join(self.dir_out, 'campaign')
+        results = os.path.join(self.dir_out, 'results')
+        db = os.path.join(self.dir_out, 'results.db')
+        with open(campaign, 'w') as f:
+            f.write('FLP 15 0\nFLP 20 0\n')
+        faults_inject.main(["-i", program, "-o", results, "-c", campaign, "-x", "-t", "5", "--db", db])
+        with open(campaign, 'a') as f:
+            f.write('Z1B 0\n')
+        with open(results, 'a') as f:
+            f.write('3\tcrash\tNone\t0.000000\n4\tcr')  # lost by a crash before being recorded
+        faults_inject.main(["-i", program, "-o", results, "-c", campaign, "-x", "-t", "5", "--db", db, "--resume"])
+        with open(results) as f:
+            self.assertEqual(['1', '2', '3'], [line.split('\t')[0] for line in f.read().splitlines()])
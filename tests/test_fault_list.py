@@ -0,0 +1,96 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import faults_inject
+
+
+class TestFaultList(TestCase):
+
+    dir_out = None
+    file_in = None
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+        self.file_in = os.path.join(self.dir_out, 'in')
+        with open(self.file_in, 'wb') as f:
+            f.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_out)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir_out, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def read_out(self, name):
+        with open(os.path.join(self.dir_out, name), 'rb') as f:
+            return f.read()
+
+    def test_fault_list_01(self):
+        """JSONL fault list, one fault or one set of faults per record."""
+        path = self.write('faults.jsonl', '{"model": "FLP", "args": ["0", 1]}\n\n' +
+                          '{"faults": [{"model": "NOP", "args": ["3"]}, {"model": "Z1B", "args": ["5-6"]}]}\n')
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-a", "x86", "-f", path])
+        self.assertEqual(b'\x03\x02\x03\x90\x05\x00\x00\x08', self.read_out('out'))
+
+    def test_fault_list_02(self):
+        """CSV fault list with comments, models given on the command line too."""
+        path = self.write('faults.csv', '# model,addr,param\nFLP,0,1\nZ1B,5-6,\n')
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-a", "x86", "-f", path,
+                            "NOP", "3"])
+        self.assertEqual(b'\x03\x02\x03\x90\x05\x00\x00\x08', self.read_out('out'))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_fault_list_03(self, err):
+        """Invalid records reported with their line."""
+        path = self.write('faults.csv', 'FLP,0,1\n\nXYZ,5\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-f", path])
+        self.assertEqual('Unknown fault model : XYZ (line 3 of ' + path + ')\n', err.getvalue())
+        path = self.write('faults.jsonl', '{"model": "Z1B", "args": ["0"]}\n{"model": "FLP", "args": ["0"]\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-f", path])
+        self.assertTrue(err.getvalue().endswith('(line 2 of ' + path + ')\n'))
+        self.assertIn('Invalid JSON record', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_fault_list_04(self, err):
+        """Errors of the fault models followed by the lines of their records."""
+        path = self.write('faults.jsonl', '{"model": "Z1B", "args": ["0"]}\n{"model": "Z1B", "args": ["100"]}\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-f", path])
+        self.assertEqual('Address outside file content : byte 0x64 (line 2 of ' + path + ')\n', err.getvalue())
+        path = self.write('faults.csv', 'FLP,0,1\nFLP,0,9\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-f", path])
+        self.assertTrue(err.getvalue().endswith(' (line 2 of ' + path + ')\n'))
+        path = self.write('faults.csv', 'Z1B,1\n\nFLP,1,0\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'out'), "-f", path, "Z1B", "3"])
+        self.assertTrue(err.getvalue().endswith('Applying two fault models at the same place : byte 0x1 (line 1 of ' +
+                                                path + ', line 3 of ' + path + ')\n'))
+
+    def test_fault_list_05(self):
+        """CSV campaign, the consecutive records with the same mutant number forming one mutant."""
+        path = self.write('campaign.csv', '1,FLP,0,0\n1,NOP,3\n2,Z1B,1\nZ1B,2\n')
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'mut_{}'), "-a", "x86",
+                            "-c", path])
+        self.assertEqual(['campaign.csv', 'in', 'mut_1', 'mut_2', 'mut_4'], sorted(os.listdir(self.dir_out)))
+        self.assertEqual(b'\x00\x02\x03\x90\x05\x06\x07\x08', self.read_out('mut_1'))
+        self.assertEqual(b'\x01\x00\x03\x04\x05\x06\x07\x08', self.read_out('mut_2'))
+        self.assertEqual(b'\x01\x02\x00\x04\x05\x06\x07\x08', self.read_out('mut_4'))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_fault_list_06(self, err):
+        """Records of a mutant separated by another mutant."""
+        path = self.write('campaign.csv', '1,FLP,0,0\n2,Z1B,1\n1,NOP,3\n')
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, 'mut_{}'), "-a", "x86", "-d",
+                                "-c", path])
+        self.assertEqual('Mutant number already used by non-contiguous records : 1 (line 3 of ' + path + ')\n',
+                         err.getvalue())
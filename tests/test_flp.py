@@ -69,3 +69,16 @@ class TestFLP(TestCase):
         with self.assertRaises(SystemExit):
             faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "FLP", "1", "abc"])
         self.assertEqual('Wrong significance format : abc\n', err.getvalue())
+
+    def test_flp_08(self):
+        """Two different bits of the same byte."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "FLP", "1", "1", "FLP", "1", "7"])
+        self.assertEqual(b'\x01\x80\x03\x04\x05\x06\x07\x08', self.file_out.read())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_flp_09(self, err):
+        """Same bit flipped twice."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name,
+                                "FLP", "1", "1", "FLP", "1", "7", "FLP", "1", "1"])
+        self.assertEqual('Applying two fault models at the same place : byte 0x1\n', err.getvalue())
@@ -119,9 +119,9 @@ class TestJCC(TestCase):
         """Jump address outside the file."""
         self.file_in.write(b'\x00\x01\x02\x03\x04\x05\x06\x07')
         self.file_in.flush()
-        with self.assertRaises(Exception):
+        with self.assertRaises(SystemExit):
             faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86", "JCC", "0x1000", "0x0"])
-        # TODO should print a user friendly message in this case
+        self.assertEqual('Address outside file content : byte 0x1000\n', err.getvalue())
 
     @mock.patch('sys.stderr', new_callable=io.StringIO)
     def test_jcc_06(self, err):
@@ -185,3 +185,10 @@ class TestJCC(TestCase):
         with self.assertRaises(SystemExit):
             faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "arm", "JCC", "0x0", "0x0"])
         self.assertEqual('Unknow opcode at JCC address : 0x3\n', err.getvalue())
+
+    def test_jcc_13(self):
+        """Short JCC in the last two bytes of the file."""
+        self.file_in.write(b'\x31\xc0\x74\x00')
+        self.file_in.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86", "JCC", "0x2", "0x0"])
+        self.assertEqual(b'\x31\xc0\x74\xfc', self.file_out.read())
@@ -3,6 +3,8 @@ import os
 import io
 from unittest import TestCase, mock
 from swifitool import faults_inject
+from swifitool.config import ExecConfig
+from swifitool.faults.jmp import JMP
 
 
 # The binary is generated using nasm and decompiled using objdump
@@ -119,9 +121,9 @@ class TestJMP(TestCase):
         """Jump address outside the file."""
         self.file_in.write(b'\x00\x01\x02\x03\x04\x05\x06\x07')
         self.file_in.flush()
-        with self.assertRaises(Exception):
+        with self.assertRaises(SystemExit):
             faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86", "JMP", "0x1000", "0x0"])
-        # TODO should print a more user friendly message in this case
+        self.assertEqual('Address outside file content : byte 0x1000\n', err.getvalue())
 
     @mock.patch('sys.stderr', new_callable=io.StringIO)
     def test_jmp_06(self, err):
@@ -185,3 +187,13 @@ class TestJMP(TestCase):
         with self.assertRaises(SystemExit):
             faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "arm", "JMP", "0x0", "0x0"])
         self.assertEqual('Unknow opcode at JMP address : 0x3\n', err.getvalue())
+
+    def test_jmp_13(self):
+        """Decoding from a content given in memory, without input file."""
+        config = ExecConfig(None, None, "x86", None, image=b'\x31\xc0\x31\xdb\x31\xc9\xeb\xfa\x31\xd2')
+        self.assertEqual([(7, b'\x00')], JMP(config, ["0x6", "0x8"]).edits(config.image))
+
+    def test_jmp_14(self):
+        """Short JMP in the last two bytes of the content."""
+        config = ExecConfig(None, None, "x86", None, image=b'\x90\xeb\x00')
+        self.assertEqual([(2, b'\xfd')], JMP(config, ["0x1", "0x0"]).edits(config.image))
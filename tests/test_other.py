@@ -1,6 +1,7 @@
 import tempfile
 import os
-from unittest import TestCase
+import io
+from unittest import TestCase, mock
 from swifitool import faults_inject
 
 
@@ -42,3 +43,28 @@ class TestOther(TestCase):
     #     self.file_cmd.flush()
     #     faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86", "-g", "NOP", "0x3"])
     #     self.assertEqual(b'\x01\x02\x03\x90\x05\x06\x07\x08' + b'\x01\x02\x03\x04\x05\x06\x07\x08' * 9, self.file_out.read())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_other_03(self, err):
+        """Overlapping faults that are not neighbours once sorted."""
+        self.file_in.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.file_in.flush()
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86",
+                                "FLP", "0x5", "1", "NOP", "0x1-0x6", "Z1B", "0x3"])
+        self.assertEqual('Applying two fault models at the same place : byte 0x3\n', err.getvalue())
+
+    def test_other_04(self):
+        """Large range of addresses."""
+        self.file_in.write(b'\x01' * 0x100000)
+        self.file_in.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "Z1B", "0x0-0xFFFFE"])
+        self.assertEqual(b'\x00' * 0xFFFFF + b'\x01', self.file_out.read())
+
+    def test_other_05(self):
+        """Contiguous faults, two of them on the same byte."""
+        self.file_in.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.file_in.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86",
+                            "NOP", "3", "FLP", "2", "0", "NOP", "0-1", "FLP", "2", "7"])
+        self.assertEqual(b'\x90\x90\x82\x90\x05\x06\x07\x08', self.file_out.read())
@@ -0,0 +1,74 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import faults_inject, report
+
+
+class TestReport(TestCase):
+
+    dir_out = None
+    file_in = None
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+        self.file_in = os.path.join(self.dir_out, 'in')
+        with open(self.file_in, 'wb') as f:
+            f.write(bytes(range(256)))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_out)
+
+    def read_out(self, name):
+        with open(os.path.join(self.dir_out, name), 'r') as f:
+            return f.read()
+
+    def test_report_01(self):
+        """Plain text report of the rows changed, with their context."""
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out"), "-a", "x86",
+                            "-r", os.path.join(self.dir_out, "report.txt"), "--context", "1",
+                            "NOP", "0x21", "FLP", "0x6f", "0"])
+        lines = self.read_out("report.txt").splitlines()
+        self.assertEqual(['0x00000010', '0x00000020', '', '0x00000030', '...', '0x00000050', '0x00000060', '',
+                          '0x00000070'], [line[:10].strip() for line in lines])
+        self.assertEqual('0x00000020  20 21 22 23 24 25 26 27 28 29 2A 2B 2C 2D 2E 2F   ' +
+                         '20 90 22 23 24 25 26 27 28 29 2A 2B 2C 2D 2E 2F   NOP', lines[1])
+        self.assertEqual(' ' * 15 + '^^' + ' ' * 48 + '^^', lines[2])
+
+    def test_report_02(self):
+        """HTML report with the colors of the models."""
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out"), "-a", "x86",
+                            "-r", os.path.join(self.dir_out, "report.html"), "JCC", "0x72", "0x74"])
+        html = self.read_out("report.html")
+        self.assertIn('<td>0x00000070</td><td>70 71 72 <span style="background: tomato">73</span> 74', html)
+        self.assertIn('</td><td>70 71 72 <span style="background: tomato">00</span> 74', html)
+        self.assertEqual(7, html.count('<tr><td>0x'))
+
+    def test_report_03(self):
+        """Mutant compared without its fault models, with a different size."""
+        with open(os.path.join(self.dir_out, 'mutant'), 'wb') as f:
+            f.write(bytes(range(250)) + b'\xff\xfe')
+        report.main(["-i", self.file_in, "-m", os.path.join(self.dir_out, 'mutant'), "-o",
+                     os.path.join(self.dir_out, "report.txt"), "-C", "0"])
+        self.assertEqual('0x000000F0  F0 F1 F2 F3 F4 F5 F6 F7 F8 F9 FA FB FC FD FE FF   ' +
+                         'F0 F1 F2 F3 F4 F5 F6 F7 F8 F9 FF FE\n' +
+                         ' ' * 42 + '^^ ^^ ^^ ^^ ^^ ^^' + ' ' * 33 + '^^ ^^ ^^ ^^ ^^ ^^\n', self.read_out("report.txt"))
+
+    def test_report_04(self):
+        """Rows changed found by splitting the chunks."""
+        content = bytes(1000)
+        mutant = bytearray(content)
+        mutant[17] = 1
+        mutant[500] = 1
+        mutant[999] = 1
+        self.assertEqual([1, 31, 62], list(report.changed_rows(content, bytes(mutant), 256)))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_report_05(self, err):
+        """Report for a campaign."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out"), "-e", "Z1B", "0-3",
+                                "-r", os.path.join(self.dir_out, "report.txt")])
+        self.assertEqual('Reports are not available for a campaign (see report.py)\n', err.getvalue())
@@ -0,0 +1,93 @@
+import tempfile
+import os
+import io
+import shutil
+from unittest import TestCase, mock
+from swifitool import delta, faults_inject, sampler
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+
+class TestSampler(TestCase):
+
+    dir_out = None
+    file_in = None
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+        self.file_in = os.path.join(self.dir_out, 'in')
+        with open(self.file_in, 'wb') as f:
+            f.write(bytes(64))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_out)
+
+    def sample(self, infile, args):
+        out = os.path.join(self.dir_out, "sample.dlt")
+        with mock.patch('sys.stderr', new_callable=io.StringIO) as err:
+            faults_inject.main(["-i", infile, "-o", out, "-d"] + args)
+        return [n for n, _ in delta.read_deltas(out)], err.getvalue()
+
+    def test_sampler_01(self):
+        """Faults drawn without replacement, the same for the same seed."""
+        first, err = self.sample(self.file_in, ["--sample", "Z1B", "0-0x3f", "--count", "20", "--seed", "1"])
+        second, _ = self.sample(self.file_in, ["--sample", "Z1B", "0-0x3f", "--count", "20", "--seed", "1"])
+        other, _ = self.sample(self.file_in, ["--sample", "Z1B", "0-0x3f", "--count", "20", "--seed", "2"])
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(20, len(set(first)))
+        self.assertTrue(all(1 <= n <= 64 for n in first))
+        self.assertEqual("Faults sampled : 20 of 64 in 1 strata (region : 20)\n", err)
+        every, _ = self.sample(self.file_in, ["--sample", "Z1B", "0-0x3f", "--count", "100"])
+        self.assertEqual(list(range(1, 65)), sorted(every))
+
+    def test_sampler_02(self):
+        """Strata of the sections and of the functions, sampled in proportion to their size."""
+        gcd = os.path.join(EXAMPLES, 'gcd')
+        numbers, err = self.sample(gcd, ["-a", "x86", "--sample", "NOP", "0x4f0-0x6b1", "--count", "100"])
+        self.assertEqual("Faults sampled : 100 of 450 in 1 strata (.text : 100)\n", err)
+        numbers, err = self.sample(gcd, ["-a", "x86", "--sample", "NOP", "0x4f0-0x6b1", "--count", "90",
+                                         "--strata", "function"])
+        self.assertEqual("Faults sampled : 90 of 450 in 6 strata (_start : 9, gcd : 9, main : 4, " +
+                         "__libc_csu_init : 20, __libc_csu_fini : 1, other : 47)\n", err)
+        self.assertEqual(9, len([n for n in numbers if 0x5fa <= 0x4f0 + n - 1 < 0x628]))
+
+    def test_sampler_03(self):
+        """Sampling stopped when the interval of every outcome is narrow enough."""
+        program = os.path.join(self.dir_out, 'program')
+        with open(program, 'w') as f:
+            f.write('#!/bin/sh\necho 42 # xxxxxxxxxxxxxxxx\n')
+        os.chmod(program, 0o755)
+        results = os.path.join(self.dir_out, 'results')
+        with mock.patch('sys.stderr', new_callable=io.StringIO) as err:
+            faults_inject.main(["-i", program, "-o", results, "--sample", "FLP", "0x14-0x23", "-x", "-t", "5",
+                                "--margin", "0.1", "--count", "100"])
+        with open(results) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(17, len(lines))  # one mutant drawn ahead of the last outcome
+        self.assertEqual('crash : 0, hang : 0, sdc : 0, no_effect : 17', err.getvalue().splitlines()[0])
+        self.assertEqual('Rate of no_effect : 1.0000 (0.8157-1.0000)', err.getvalue().splitlines()[-1])
+
+    def test_sampler_04(self):
+        """Wilson interval and normal quantile."""
+        self.assertAlmostEqual(1.959964, sampler.normal_quantile(0.95), places=5)
+        low, high = sampler.wilson_interval(0, 10, 1.959964)
+        self.assertEqual(0.0, low)
+        self.assertAlmostEqual(0.277533, high, places=5)
+        low, high = sampler.wilson_interval(5, 10, 1.959964)
+        self.assertAlmostEqual(0.236593, low, places=5)
+        self.assertAlmostEqual(0.763407, high, places=5)
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_sampler_05(self, err):
+        """Margin without execution, functions of a raw binary."""
+        for args, msg in [(["--sample", "Z1B", "0-7", "--margin", "0.1"], "A margin requires executing the mutants"),
+                          (["--enumerate", "Z1B", "0-7", "--margin", "0.1"], "A margin requires sampling the faults"),
+                          (["--sample", "Z1B", "0-7", "--strata", "function"],
+                           "No functions in the symbol table of the input file")]:
+            err.truncate(0)
+            err.seek(0)
+            with self.assertRaises(SystemExit):
+                faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "m_{}")] + args)
+            self.assertEqual(msg + "\n", err.getvalue())
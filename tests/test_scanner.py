@@ -0,0 +1,101 @@
+import tempfile
+import os
+import io
+from unittest import TestCase, mock
+from swifitool import faults_inject, scanner, delta, utils
+
+# Every kind of relative branch decoded by the JMP and JCC models
+#    0:  31 c0                  xor    eax,eax
+#    2:  74 fc                  je     0x0
+#    4:  eb 00                  jmp    0x6
+#    6:  e9 05 00 00 00         jmp    0x10
+#    b:  66 e9 fd ff            jmpw   0xc
+#    f:  0f 85 f7 ff ff ff      jne    0xc
+#   15:  66 0f 84 02 00         je     0x1c
+#   1a:  90                     nop
+#   1b:  90                     nop
+BRANCHES = b'\x31\xc0\x74\xfc\xeb\x00\xe9\x05\x00\x00\x00\x66\xe9\xfd\xff\x0f\x85\xf7\xff\xff\xff' + \
+           b'\x66\x0f\x84\x02\x00\x90\x90'
+
+
+class TestScanner(TestCase):
+
+    file_in = None
+    file_out = None
+
+    def setUp(self):
+        super().setUp()
+        self.file_in = tempfile.NamedTemporaryFile(delete=False)
+        self.file_in.write(BRANCHES)
+        self.file_in.flush()
+        self.file_out = tempfile.NamedTemporaryFile(delete=False)
+
+    def tearDown(self):
+        self.file_in.close()
+        os.unlink(self.file_in.name)
+        self.file_out.close()
+        os.unlink(self.file_out.name)
+
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    def test_scanner_01(self, out):
+        """Every branch redirected to its fall-through, except the one already targeting it."""
+        scanner.main(["-i", self.file_in.name, "-a", "x86", "0-0x1b"])
+        self.assertEqual('JCC 0x2 0x4\nJMP 0x6 0xb\nJMP 0xb 0xf\nJCC 0xf 0x15\nJCC 0x15 0x1a\n', out.getvalue())
+
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    def test_scanner_02(self, out):
+        """Only the branches entirely in the region, prefix included."""
+        scanner.main(["-i", self.file_in.name, "-a", "x86", "-m", "JCC", "0xc-0x18"])
+        self.assertEqual('JCC 0xf 0x15\n', out.getvalue())
+
+    def test_scanner_03(self):
+        """Current targets of the sites."""
+        sites = scanner.scan_x86(BRANCHES, utils.parse_addr("0-0x1b"))
+        self.assertEqual([0x2, 0x4, 0x6, 0xb, 0xf, 0x15], sites.offsets.tolist())
+        self.assertEqual([0x0, 0x6, 0x10, 0xc, 0xc, 0x1c], sites.targets.tolist())
+        self.assertEqual([True, False, False, False, True, True], sites.conditional.tolist())
+
+    def test_scanner_04(self):
+        """Enumerating the JCC faults of a region."""
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86", "-d",
+                            "-e", "JCC", "0-0x1b"])
+        self.assertEqual([(1, [(0x3, b'\x00')]), (2, [(0x11, b'\x00\x00\x00\x00')]), (3, [(0x18, b'\x00\x00')])],
+                         list(delta.read_deltas(self.file_out.name)))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_scanner_05(self, err):
+        """Scanning without architecture."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-e", "JMP", "0-0x1b"])
+        self.assertEqual('Architecture required when scanning the branches\n', err.getvalue())
+
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    def test_scanner_06(self, out):
+        """B and BL on ARM, only the aligned words in the region."""
+        #    0:  e3a00000   mov  r0, #0
+        #    4:  0a000001   beq  0x10
+        #    8:  eb000000   bl   0x10
+        #    c:  eafffffe   b    0xc
+        #   10:  1afffffd   bne  0xc
+        #   14:  eaffffff   b    0x18
+        #   18:  e12fff1e   bx   lr
+        self.file_in.seek(0)
+        self.file_in.truncate()
+        self.file_in.write(b'\x00\x00\xa0\xe3\x01\x00\x00\x0a\x00\x00\x00\xeb\xfe\xff\xff\xea' +
+                           b'\xfd\xff\xff\x1a\xff\xff\xff\xea\x1e\xff\x2f\xe1')
+        self.file_in.flush()
+        scanner.main(["-i", self.file_in.name, "-a", "arm", "0-0x1b"])
+        scanner.main(["-i", self.file_in.name, "-a", "arm", "-m", "JMP", "0x5-0xf"])
+        self.assertEqual('JCC 0x4 0x8\nJMP 0x8 0xc\nJMP 0xc 0x10\nJCC 0x10 0x14\n' +
+                         'JMP 0x8 0xc\nJMP 0xc 0x10\n', out.getvalue())
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "arm", "-d",
+                            "-e", "JMP", "0-0x1b"])
+        self.assertEqual([(1, [(0x8, b'\xff\xff\xff')]), (2, [(0xc, b'\xff\xff\xff')])],
+                         list(delta.read_deltas(self.file_out.name)))
+
+    def test_scanner_07(self):
+        """Displacement range of the sites."""
+        sites = scanner.scan_arm(b'\x00\x00\x00\xea' * 2, utils.parse_addr("0-7"))
+        self.assertEqual([8, 12], sites.targets.tolist())
+        self.assertEqual([True, False], sites.in_range(sites.targets + [2 ** 25 - 1, 2 ** 25]).tolist())
+        self.assertEqual([True, False], sites.in_range(sites.targets - [2 ** 25, 2 ** 25 + 1]).tolist())
@@ -0,0 +1,98 @@
+import tempfile
+import os
+import io
+import struct
+from unittest import TestCase, mock
+from swifitool import faults_inject
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+
+def pe_image():
+    """A minimal PE32 file with a single code section (RVA 0x1000, image base 0x400000) at offset 0x200."""
+    content = bytearray(0x400)
+    content[0:2] = b'MZ'
+    struct.pack_into('<I', content, 0x3C, 0x40)
+    content[0x40:0x44] = b'PE\x00\x00'
+    struct.pack_into('<HH', content, 0x44, 0x14C, 1)  # machine, number of sections
+    struct.pack_into('<H', content, 0x54, 0xE0)  # size of the optional header
+    struct.pack_into('<H', content, 0x58, 0x10B)  # PE32
+    struct.pack_into('<I', content, 0x58 + 28, 0x400000)  # image base
+    section = 0x58 + 0xE0
+    content[section:section + 8] = b'.text\x00\x00\x00'
+    struct.pack_into('<IIII', content, section + 8, 0x100, 0x1000, 0x200, 0x200)
+    struct.pack_into('<I', content, section + 36, 0x60000020)
+    content[0x200:0x20A] = b'\x31\xc0\x31\xdb\x31\xc9\xeb\xfa\x31\xd2'
+    return bytes(content)
+
+
+class TestSections(TestCase):
+
+    file_in = None
+    file_out = None
+
+    def setUp(self):
+        super().setUp()
+        self.file_in = tempfile.NamedTemporaryFile(delete=False)
+        self.file_out = tempfile.NamedTemporaryFile(delete=False)
+
+    def tearDown(self):
+        self.file_in.close()
+        os.unlink(self.file_in.name)
+        self.file_out.close()
+        os.unlink(self.file_out.name)
+
+    def test_sections_01(self):
+        """Virtual addresses of jumps in the code of an ELF file."""
+        gcd = os.path.join(EXAMPLES, 'gcd')
+        faults_inject.main(["-i", gcd, "-o", self.file_out.name, "-a", "x86", "-v",
+                            "JMP", "0x611", "0x600", "JCC", "0x60c", "0x600"])
+        with open(os.path.join(EXAMPLES, 'gcd_jmp'), 'rb') as f:
+            self.assertEqual(f.read(), self.file_out.read())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_sections_02(self, err):
+        """Virtual address of the data of an ELF file, translated to its offset."""
+        gcd = os.path.join(EXAMPLES, 'gcd')
+        faults_inject.main(["-i", gcd, "-o", self.file_out.name, "-a", "x86", "-v", "NOP", "0x201008"])
+        with open(gcd, 'rb') as f:
+            expected = bytearray(f.read())
+        expected[0x1008] = 0x90
+        self.assertEqual(bytes(expected), self.file_out.read())
+        self.assertEqual('Warning: NOP outside executable sections : byte 0x1008\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_sections_03(self, err):
+        """Virtual address not mapped from the file (.bss)."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", os.path.join(EXAMPLES, 'gcd'), "-o", self.file_out.name, "-v",
+                                "Z1B", "0x201010"])
+        self.assertEqual('Virtual address not mapped from the file : 0x201010\n', err.getvalue())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_sections_04(self, err):
+        """Virtual addresses with a raw binary."""
+        self.file_in.write(b'\x31\xc0\x31\xdb\x31\xc9\xeb\xfa\x31\xd2')
+        self.file_in.flush()
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-v", "Z1B", "0x0"])
+        self.assertEqual('Virtual addresses require an ELF or PE input file\n', err.getvalue())
+
+    def test_sections_05(self):
+        """Virtual address of a jump in a PE file."""
+        self.file_in.write(pe_image())
+        self.file_in.flush()
+        faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-a", "x86", "-v",
+                            "JMP", "0x401006", "0x401008"])
+        expected = bytearray(pe_image())
+        expected[0x207] = 0x00
+        self.assertEqual(bytes(expected), self.file_out.read())
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_sections_06(self, err):
+        """Range of virtual addresses going out of its section."""
+        self.file_in.write(pe_image())
+        self.file_in.flush()
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in.name, "-o", self.file_out.name, "-v", "Z1B", "0x4010f0-0x401110"])
+        self.assertEqual('Range of virtual addresses across several sections : 0x4010f0-0x401110\n', err.getvalue())
@@ -0,0 +1,87 @@
+import tempfile
+import os
+import shutil
+import threading
+from unittest import TestCase, mock
+from swifitool import server
+
+
+class TestServer(TestCase):
+
+    dir_out = None
+    file_in = None
+    daemon = None
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+        self.file_in = os.path.join(self.dir_out, 'in')
+        with open(self.file_in, 'wb') as f:
+            f.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+        self.daemon = server.InjectionServer(os.path.join(self.dir_out, 'socket'))
+        threading.Thread(target=self.daemon.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        shutil.rmtree(self.dir_out)
+
+    def test_server_01(self):
+        """Mutants returned on one connection, errors reported without closing it."""
+        with server.Client(os.path.join(self.dir_out, 'socket')) as client:
+            self.assertEqual(b'\x00\x02\x03\x04\x05\x06\x07\x88', client.inject(self.file_in, "Z1B 0 FLP 7 7"))
+            with self.assertRaises(server.InjectionError) as cm:
+                client.inject(self.file_in, "Z1B 8")
+            self.assertEqual("Address outside file content : byte 0x8", str(cm.exception))
+            with self.assertRaises(server.InjectionError) as cm:
+                client.inject(self.file_in, ["Z1W", "0"])
+            self.assertEqual("Word size required when using Z1W", str(cm.exception))
+            self.assertEqual(b'\x01\x02\x00\x00\x05\x06\x07\x08',
+                             client.inject(self.file_in, ["Z1W", "2"], word_length=2))
+
+    def test_server_02(self):
+        """Mutant written by the daemon, the input file being read again when it changes."""
+        out = os.path.join(self.dir_out, 'out')
+        with server.Client(os.path.join(self.dir_out, 'socket')) as client:
+            self.assertIsNone(client.inject(self.file_in, "NOP 1", arch='x86', outfile=out))
+            with open(out, 'rb') as f:
+                self.assertEqual(b'\x01\x90\x03\x04\x05\x06\x07\x08', f.read())
+            with open(self.file_in, 'wb') as f:
+                f.write(b'\x11\x12\x13')
+            os.utime(self.file_in, ns=(0, 0))
+            self.assertEqual(b'\x11\x90\x13', client.inject(self.file_in, "NOP 1", arch='x86'))
+
+    def test_server_03(self):
+        """Least recently used inputs evicted when the cache is full."""
+        cache = server.ImageCache(20)
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(self.dir_out, str(i)))
+            with open(paths[i], 'wb') as f:
+                f.write(bytes(8))
+        first = cache.injector(paths[0])
+        cache.injector(paths[1])
+        self.assertIs(first, cache.injector(paths[0]))
+        cache.injector(paths[2])
+        self.assertEqual([os.path.abspath(paths[0]), os.path.abspath(paths[2])], list(cache.entries))
+        self.assertEqual(16, cache.size)
+
+    def test_server_04(self):
+        """Unexpected errors and invalid configurations reported without closing the connection."""
+        cache = self.daemon.cache
+        injector = cache.injector
+
+        def failing(path, *args):
+            if path.endswith('broken'):
+                raise RuntimeError("unexpected")
+            return injector(path, *args)
+
+        with server.Client(os.path.join(self.dir_out, 'socket')) as client, \
+                mock.patch.object(cache, 'injector', side_effect=failing), mock.patch('traceback.print_exc'):
+            with self.assertRaises(server.InjectionError) as cm:
+                client.inject(os.path.join(self.dir_out, 'broken'), "Z1B 0")
+            self.assertEqual("Internal error : RuntimeError unexpected", str(cm.exception))
+            with self.assertRaises(server.InjectionError) as cm:
+                client.inject(self.file_in, "NOP 0", arch='mips')
+            self.assertEqual("Unknown architecture : mips", str(cm.exception))
+            self.assertEqual(b'\x00\x02\x03\x04\x05\x06\x07\x08', client.inject(self.file_in, "Z1B 0"))
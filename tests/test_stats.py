@@ -0,0 +1,60 @@
+import tempfile
+import os
+import io
+import json
+import shutil
+from unittest import TestCase, mock
+from swifitool import api, faults_inject, stats
+
+
+class TestStats(TestCase):
+
+    dir_out = None
+    file_in = None
+
+    def setUp(self):
+        super().setUp()
+        self.dir_out = tempfile.mkdtemp()
+        self.file_in = os.path.join(self.dir_out, 'in')
+        with open(self.file_in, 'wb') as f:
+            f.write(b'\x01\x02\x03\x04\x05\x06\x07\x08')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_out)
+
+    def test_stats_01(self):
+        """Phases and counters of a single mutant written in a file."""
+        faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out"), "-w", "2",
+                            "--stats", os.path.join(self.dir_out, "stats.json"), "FLP", "0", "1", "Z1W", "2-5"])
+        with open(os.path.join(self.dir_out, "stats.json"), 'r') as f:
+            res = json.load(f)
+        self.assertEqual(['parse_args', 'construct', 'check', 'copy', 'apply'],
+                         [p for p in res['phases'] if p != 'sections'])
+        self.assertEqual(1, res['phases']['apply']['calls'])
+        self.assertGreaterEqual(res['phases']['apply']['wall'], 0)
+        self.assertEqual({'models': 2, 'locations_checked': 2, 'bits_checked': 33, 'bytes_patched': 5},
+                         dict((k, v) for k, v in res['counters'].items() if k in ['models', 'locations_checked',
+                                                                                 'bits_checked', 'bytes_patched']))
+
+    @mock.patch('sys.stderr', new_callable=io.StringIO)
+    def test_stats_02(self, err):
+        """Statistics on stderr, also written when the run fails."""
+        with self.assertRaises(SystemExit):
+            faults_inject.main(["-i", self.file_in, "-o", os.path.join(self.dir_out, "out"), "--stats", "-",
+                                "Z1B", "8"])
+        res, end = json.JSONDecoder().raw_decode(err.getvalue())
+        self.assertEqual({'models': 1}, dict((k, v) for k, v in res['counters'].items() if k == 'models'))
+        self.assertEqual("\nAddress outside file content : byte 0x8\n", err.getvalue()[end:])
+
+    def test_stats_03(self):
+        """Statistics of the API, accumulated over several mutants."""
+        s = stats.Stats()
+        injector = api.Injector(b'\x01\x02\x03\x04', stats=s)
+        fm_list = injector.faults("Z1B 0 FLP 1 0")
+        injector.inject(fm_list)
+        injector.inject(fm_list)
+        res = s.as_dict()
+        self.assertEqual(2, res['phases']['apply']['calls'])
+        self.assertEqual(1, res['phases']['construct']['calls'])
+        self.assertEqual(4, res['counters']['bytes_patched'])
+        self.assertEqual({'phases': {}, 'counters': {}}, stats.Stats(enabled=False).as_dict())